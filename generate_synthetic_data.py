@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic course (config.json + data/) for trying the scripts without
+real student exports.
+
+    python3 generate_synthetic_data.py /tmp/fake-course --students 5000 --assignments 9
+"""
+
+import argparse
+
+from grade_importer.synthetic import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Canvas and Codepath exports")
+    parser.add_argument("base_dir", help="directory to write config.json and data/ into")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--assignments", type=int, default=8)
+    parser.add_argument("--preamble", type=int, default=5, help="junk lines before the Codepath header row")
+    parser.add_argument("--snapshots", type=int, default=2, help="number of export timestamps to write")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    config = generate_dataset(args.base_dir, students=args.students, assignments=args.assignments,
+                              preamble_lines=args.preamble, snapshots=args.snapshots, seed=args.seed)
+    print(f"Wrote {args.snapshots} snapshot(s) of {args.students} students for "
+          f"{config['CanvasCsvPattern']} to {args.base_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared helpers for the Codepath -> Canvas grade importer scripts."""
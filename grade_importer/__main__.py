@@ -0,0 +1,5 @@
+"""python -m grade_importer <command>; see grade_importer/cli.py"""
+
+from grade_importer.cli import main
+
+main()
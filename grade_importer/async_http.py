@@ -0,0 +1,256 @@
+"""
+Small asyncio HTTP/1.1 client for fetching exports (see grade_importer/ingest.py).
+
+The standard library has no asyncio HTTP client and the ingestion only needs
+JSON requests and file downloads, so this speaks HTTP/1.1 over asyncio streams:
+
+  - connections are kept alive and reused, at most max_connections per host
+    in use at a time;
+  - requests to one host start at most rate per second;
+  - bodies are read by Content-Length or chunked encoding, and a download is
+    written to disk chunk by chunk as it arrives;
+  - redirects are followed (Canvas file downloads redirect to file storage),
+    without the Authorization header once they leave the original host;
+  - connection errors, 429 and 5xx answers are retried with exponential
+    backoff, honouring Retry-After; other errors raise HttpError.
+"""
+
+import asyncio
+import json
+import ssl
+import time
+import urllib.parse
+
+MAX_CONNECTIONS = 4
+RETRIES = 3
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 300
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+
+
+class HttpError(Exception):
+    """A request that failed for good"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart (no limit when rate is falsy)"""
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _read_headers(reader):
+    """(status, {lower-case name: value}, keep-alive) of a response"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed before the response")
+    version, status = status_line.decode("latin-1").split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return int(status), headers, keep_alive
+
+
+async def _body_chunks(reader, headers, status):
+    """Yield a response body as it arrives"""
+    if status in (204, 304):
+        return
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailers, then the blank line ending the body
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            remaining = size
+            while remaining:
+                data = await reader.read(min(remaining, CHUNK_SIZE))
+                if not data:
+                    raise ConnectionError("connection closed mid-body")
+                remaining -= len(data)
+                yield data
+            await reader.readline()
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            data = await reader.read(min(remaining, CHUNK_SIZE))
+            if not data:
+                raise ConnectionError("connection closed mid-body")
+            remaining -= len(data)
+            yield data
+    else:
+        while True:
+            data = await reader.read(CHUNK_SIZE)
+            if not data:
+                return
+            yield data
+
+
+class HostPool:
+    """Keep-alive connections to one scheme://host:port"""
+
+    def __init__(self, scheme, netloc, max_connections=MAX_CONNECTIONS, rate=None):
+        parsed = urllib.parse.urlsplit(f"{scheme}://{netloc}")
+        self.scheme = scheme
+        self.netloc = netloc
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if scheme == "https" else 80)
+        self.limiter = RateLimiter(rate)
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.connections = 0
+
+    async def _connect(self):
+        ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+        connection = await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
+        self.connections += 1
+        return connection
+
+    async def send(self, method, target, headers, body=None, destination=None):
+        """One attempt: returns (status, headers, body bytes), or the bytes written when a
+        2xx body was streamed to the open file destination"""
+        async with self._slots:
+            await self.limiter.wait()
+            reader, writer = self._idle.pop() if self._idle else await self._connect()
+            try:
+                lines = [f"{method} {target} HTTP/1.1", f"Host: {self.netloc}"]
+                lines.extend(f"{name}: {value}" for name, value in headers.items())
+                if body is not None:
+                    lines.append(f"Content-Length: {len(body)}")
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+                await writer.drain()
+                status, response_headers, keep_alive = await _read_headers(reader)
+                if destination is not None and status < 300:
+                    data = 0
+                    async for chunk in _body_chunks(reader, response_headers, status):
+                        destination.write(chunk)
+                        data += len(chunk)
+                else:
+                    data = b"".join([chunk async for chunk in _body_chunks(reader, response_headers, status)])
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive and ("content-length" in response_headers or "transfer-encoding" in response_headers):
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, response_headers, data
+
+    def close(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+class AsyncHttpClient:
+    """Pooled, rate-limited requests to any number of hosts"""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, rate=None, retries=RETRIES,
+                 backoff=BACKOFF_SECONDS, timeout=TIMEOUT_SECONDS):
+        self.max_connections = max_connections
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.pools = {}
+        self.requests = 0
+
+    def _pool(self, scheme, netloc):
+        key = (scheme, netloc)
+        if key not in self.pools:
+            self.pools[key] = HostPool(scheme, netloc, self.max_connections, self.rate)
+        return self.pools[key]
+
+    async def _attempts(self, method, url, headers, body, destination):
+        """Send with retries; returns (status, headers, data) of the final answer"""
+        parsed = urllib.parse.urlsplit(url)
+        pool = self._pool(parsed.scheme or "http", parsed.netloc)
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            if destination is not None:
+                destination.seek(0)
+                destination.truncate()
+            try:
+                status, response_headers, data = await asyncio.wait_for(
+                    pool.send(method, target, headers, body, destination), self.timeout)
+                self.requests += 1
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                error = HttpError(f"{method} {url} failed: {e!r}")
+            else:
+                if status != 429 and status < 500:
+                    return status, response_headers, data
+                error = HttpError(f"{method} {url} returned {status}", status)
+                try:
+                    delay = max(delay, float(response_headers.get("retry-after") or 0))
+                except ValueError:
+                    pass
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+        raise error
+
+    async def request(self, method, url, headers=None, form=None, destination=None):
+        """Send a request, following redirects; returns (status, headers, data) of a 2xx answer"""
+        headers = dict(headers or {})
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        origin = urllib.parse.urlsplit(url).netloc
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, data = await self._attempts(method, url, headers, body, destination)
+            if status in (301, 302, 303, 307, 308) and "location" in response_headers:
+                url = urllib.parse.urljoin(url, response_headers["location"])
+                if status == 303 or (status in (301, 302) and method == "POST"):
+                    method, body = "GET", None
+                    headers.pop("Content-Type", None)
+                if urllib.parse.urlsplit(url).netloc != origin:
+                    headers.pop("Authorization", None)
+                continue
+            if status >= 300:
+                detail = data[:200].decode(errors="replace") if isinstance(data, bytes) else ""
+                raise HttpError(f"{method} {url} returned {status}: {detail}", status)
+            return status, response_headers, data
+        raise HttpError(f"{method} {url}: too many redirects")
+
+    async def json(self, method, url, headers=None, form=None):
+        _, _, data = await self.request(method, url, dict(headers or {}, Accept="application/json"), form)
+        return json.loads(data) if data else None
+
+    async def download(self, url, path, headers=None):
+        """Stream url's body into the file at path; returns the bytes written"""
+        with open(path, "wb") as destination:
+            _, _, written = await self.request("GET", url, headers, destination=destination)
+        return written
+
+    @property
+    def connections(self):
+        return sum(pool.connections for pool in self.pools.values())
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
@@ -0,0 +1,111 @@
+"""
+Batch mode: run the update -> compare -> unsubmitted pipeline for many courses.
+
+config.json may list several courses under "Courses". Top-level keys (for
+example HeadersToLookFor) are defaults that each course entry can override:
+
+    {
+        "HeadersToLookFor": ["Member ID", "Full Name"],
+        "Courses": [
+            {
+                "Name": "COP4808-001",
+                "CanvasCsvPattern": "Canvas-COP4808_001_13815",
+                "CodepathCsvPattern": "Codepath-COP4808_001_13815",
+                "ColumnMapping": { ... }
+            },
+            ...
+        ]
+    }
+
+The courses are independent, so each one runs in its own worker process. The
+console output of every course is captured to a per-course log next to its
+other outputs in data/, and one combined summary with timings is written at
+the end.
+"""
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from grade_importer.context import PROJECT_DIR, PipelineContext, course_configs, course_name
+from grade_importer.instrumentation import RunRecorder, write_run_record
+from grade_importer.scheduler import PIPELINE_STEPS, run_steps
+
+
+def run_course(course_config, base_dir=PROJECT_DIR, options=None):
+    """Run every pipeline step for one course and return its status, timings and console output"""
+    result = {"course": course_name(course_config), "ok": True, "steps": []}
+    log = io.StringIO()
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(log):
+        context = PipelineContext(base_dir, config=course_config, options=options)
+        context.recorder = RunRecorder(result["course"])
+        # Steps run in dependency order; see grade_importer/scheduler.py
+        result["steps"] = run_steps(context)
+        result["ok"] = all(step["status"] == "ok" for step in result["steps"])
+
+        print()
+        for line in context.recorder.format_table():
+            print(line)
+        result["run_record"] = write_run_record(context)
+
+    result["seconds"] = time.perf_counter() - start
+    result["output"] = log.getvalue()
+    return result
+
+
+def format_batch_summary(results, wall_seconds):
+    """Build the combined summary table for a batch run"""
+    step_names = [step.name for step in PIPELINE_STEPS]
+    header = f"{'Course':<32} | " + " | ".join(f"{name:<12}" for name in step_names) + f" | {'Total':>8}"
+    lines = ["=== Batch Summary ===", "-" * len(header), header, "-" * len(header)]
+    for result in results:
+        cells = {step["step"]: f"{step['status']} {step['seconds']:.2f}s" for step in result["steps"]}
+        line = f"{result['course']:<32} | " + " | ".join(f"{cells.get(name, 'skipped'):<12}" for name in step_names)
+        lines.append(line + f" | {result['seconds']:>7.2f}s")
+    lines.append("-" * len(header))
+
+    failed = [result["course"] for result in results if not result["ok"]]
+    course_seconds = sum(result["seconds"] for result in results)
+    lines.append(f"Courses: {len(results)}  Failed: {len(failed)}")
+    lines.append(f"Wall time: {wall_seconds:.2f}s  (sum of course times: {course_seconds:.2f}s)")
+    if failed:
+        lines.append("Failed courses: " + ", ".join(failed))
+    return lines
+
+
+def run_batch(config, base_dir=PROJECT_DIR, max_workers=None, options=None):
+    """Run the pipeline for every course in config on a process pool; returns the per-course results"""
+    courses = course_configs(config)
+    data_dir = os.path.join(base_dir, "data")
+    timestamp = datetime.now().strftime("%Y-%m-%dT%H%M")
+    print(f"Running {len(courses)} course(s) with up to {max_workers or os.cpu_count()} worker(s)")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_course, course, base_dir, options) for course in courses]
+        # Results are collected in config order so the summary is stable
+        results = [future.result() for future in futures]
+    wall_seconds = time.perf_counter() - start
+
+    for result in results:
+        log_filename = os.path.join(data_dir, f"{timestamp}_{result['course']}-batch.log")
+        with open(log_filename, "w") as log_file:
+            log_file.write(result["output"])
+        status = "✓" if result["ok"] else "✗"
+        print(f"{status} {result['course']}: log written to {log_filename}")
+
+    summary = format_batch_summary(results, wall_seconds)
+    summary_filename = os.path.join(data_dir, f"{timestamp}_batch-summary.out")
+    with open(summary_filename, "w") as summary_file:
+        summary_file.write("\n".join(summary) + "\n")
+
+    print()
+    for line in summary:
+        print(line)
+    print(f"\nSummary written to {summary_filename}")
+    return results
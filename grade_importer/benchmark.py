@@ -0,0 +1,195 @@
+"""
+Scaling benchmarks for the grade pipeline stages.
+
+Each stage runs on a synthetic dataset (see grade_importer.synthetic) in a
+fresh spawned process, so one stage's memory can't leak into the next
+measurement. A stage reports the rows it processed and the wall time of its
+timed section. Peak memory is how far the process's max RSS grew while the
+stage ran, including any untimed setup such as parsing the inputs for the join.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from grade_importer.codepath_csv import load_codepath_snapshot, open_codepath_csv
+from grade_importer.context import PipelineContext
+from grade_importer.manifest import latest_snapshots
+from grade_importer.parse_cache import load_snapshot
+from grade_importer.scheduler import PIPELINE_STEPS, load_step_module, run_steps
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the per-student console output of the steps while timing them"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _step(name):
+    return load_step_module(next(step.module for step in PIPELINE_STEPS if step.name == name))
+
+
+def _latest(context, key, kind="export", count=1):
+    return latest_snapshots(context.data_dir, context.config[key], kind, count)
+
+
+def stage_header_strip(context):
+    """Skip the Codepath preamble and parse every row"""
+    start = time.perf_counter()
+    with open_codepath_csv(_latest(context, "CodepathCsvPattern")[0], context.config["HeadersToLookFor"]) as reader:
+        rows = sum(1 for _ in reader)
+    return rows, time.perf_counter() - start
+
+
+def stage_join(context):
+    """Index Canvas by login and look up every Codepath row (inputs parsed outside the timing)"""
+    updater = _step("update")
+    canvas_path = _latest(context, "CanvasCsvPattern")[0]
+    canvas_rows = load_snapshot(canvas_path)
+    codepath_rows = load_codepath_snapshot(_latest(context, "CodepathCsvPattern")[0], context.config["HeadersToLookFor"])
+
+    login_column = context.config["ColumnMapping"]["SIS Login ID"]
+    start = time.perf_counter()
+    canvas_index, _ = updater.build_canvas_index(canvas_rows, login_column)
+    for row in codepath_rows:
+        canvas_index.get(updater.normalize_email(row.login))
+    return len(codepath_rows), time.perf_counter() - start
+
+
+def stage_update(context):
+    """Step 1 end to end: discover, parse, join, write -updated.csv and the summary"""
+    start = time.perf_counter()
+    with _quiet():
+        _step("update").main(context)
+    return len(context.tables.get("codepath_rows", [])), time.perf_counter() - start
+
+
+def stage_update_stream(context):
+    """Step 1 run on its own (grade-importer update): no table is kept for later steps"""
+    context.table_consumers = set()
+    start = time.perf_counter()
+    with _quiet():
+        _step("update").main(context)
+    seconds = time.perf_counter() - start
+    # Nothing is kept to count, so count the rows written
+    with open(context.paths["updated_csv"], "r") as csv_file:
+        rows = sum(1 for _ in csv_file) - 1
+    return rows, seconds
+
+
+def stage_compare(context):
+    """compare_grades on the two newest -updated.csv files"""
+    new_file, old_file = _latest(context, "CanvasCsvPattern", "updated", 2)
+    columns = list(context.config["ColumnMapping"]["Assignments"].keys())
+    with open(new_file, "r") as csv_file:
+        rows = sum(1 for _ in csv_file) - 1
+    start = time.perf_counter()
+    with _quiet():
+        _step("compare").compare_grades(old_file, new_file, columns)
+    return rows, time.perf_counter() - start
+
+
+def stage_unsubmitted(context):
+    """Parse the Codepath export and run find_missing_submissions"""
+    finder = _step("unsubmitted")
+    start = time.perf_counter()
+    with _quiet():
+        data, headers = finder.parse_csv(_latest(context, "CodepathCsvPattern")[0], context.config)
+        finder.find_missing_submissions(data, headers, context.config)
+    return len(data), time.perf_counter() - start
+
+
+def stage_alerts(context):
+    """grade-importer alerts: the submission bitmap, section rates and both early-alert queries"""
+    finder = _step("unsubmitted")
+    start = time.perf_counter()
+    with _quiet():
+        students = finder.alerts_main(context.base_dir)
+    return students, time.perf_counter() - start
+
+
+def stage_pipeline(context):
+    """The full 0-updater.py run (scheduled steps) sharing one PipelineContext"""
+    start = time.perf_counter()
+    with _quiet():
+        run_steps(context)
+    return len(context.tables.get("codepath_rows", [])), time.perf_counter() - start
+
+
+def stage_push(context):
+    """Push the grades step 1 changed to a local mock Canvas (grade_importer.mock_canvas)"""
+    from grade_importer.canvas_api import CanvasClient
+    from grade_importer.mapping import compile_mapping
+    from grade_importer.mock_canvas import start_mock_canvas
+
+    push = _step("push")
+    canvas_path = _latest(context, "CanvasCsvPattern")[0]
+    canvas_rows = load_snapshot(canvas_path)
+    updated_rows = load_snapshot(canvas_path.replace(".csv", "-updated.csv"))
+    changes = push.changed_grades(canvas_rows, updated_rows, compile_mapping(context.config["ColumnMapping"]))
+    server = start_mock_canvas(latency=0.002, job_seconds=0.01)
+    client = CanvasClient(server.url, "benchmark", max_connections=push.WORKERS)
+    try:
+        start = time.perf_counter()
+        push.push_grades(client, "benchmark", changes, poll_interval=0.01)
+        seconds = time.perf_counter() - start
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    return sum(len(grades) for grades in changes.values()), seconds
+
+
+# Run in this order: compare and push need the -updated.csv written by update
+STAGES = {
+    "header-strip": stage_header_strip,
+    "join": stage_join,
+    "update": stage_update,
+    "update-stream": stage_update_stream,
+    "compare": stage_compare,
+    "unsubmitted": stage_unsubmitted,
+    "alerts": stage_alerts,
+    "pipeline": stage_pipeline,
+    "push": stage_push,
+}
+
+
+def _run_stage(name, base_dir):
+    """Worker entry point: run one stage and report rows, seconds and memory growth"""
+    rss_before = _max_rss_mb()
+    context = PipelineContext(base_dir)
+    rows, seconds = STAGES[name](context)
+    return {
+        "stage": name,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+        "peak_mb": _max_rss_mb() - rss_before,
+    }
+
+
+def run_stage(name, base_dir):
+    """Run a stage in a fresh spawned process"""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_run_stage, (name, base_dir))
+
+
+def format_results(results):
+    header = f"{'Students':>10} | {'Stage':<13} | {'Rows':>10} | {'Seconds':>9} | {'Rows/sec':>12} | {'Peak MB':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result['students']:>10} | {result['stage']:<13} | {result['rows']:>10} | "
+            f"{result['seconds']:>9.3f} | {result['rows_per_second']:>12,.0f} | {result['peak_mb']:>8.1f}"
+        )
+    return lines
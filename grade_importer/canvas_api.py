@@ -0,0 +1,144 @@
+"""
+Minimal Canvas REST API client for pushing grades (see grade_importer/push.py).
+
+Only the two endpoints the push needs are wrapped:
+
+    POST /api/v1/courses/:course/assignments/:assignment/submissions/update_grades
+        grade_data[<user id>][posted_grade]=<grade> for many students at once;
+        Canvas answers with a Progress object for the job doing the update
+    GET  /api/v1/progress/:id
+        the job's workflow_state: queued, running, completed or failed
+
+Requests go over a pool of keep-alive connections (http.client) shared by the
+threads using the client, at most max_connections at a time. Connection
+errors, 429 and 5xx answers are retried with exponential backoff, honouring a
+Retry-After header; other errors raise CanvasError straight away. Setting a
+grade is idempotent, so a bulk update is safe to send again after a
+connection error.
+"""
+
+import http.client
+import json
+import queue
+import threading
+import time
+import urllib.parse
+
+MAX_CONNECTIONS = 8
+RETRIES = 5
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 30
+POLL_SECONDS = 0.5
+
+
+class CanvasError(Exception):
+    """A Canvas API request that failed for good"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CanvasClient:
+    """Canvas API requests for one instance (base_url) and access token"""
+
+    def __init__(self, base_url, token, max_connections=MAX_CONNECTIONS, retries=RETRIES,
+                 backoff=BACKOFF_SECONDS, timeout=TIMEOUT_SECONDS):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.netloc
+        self.prefix = parsed.path.rstrip("/")
+        self.token = token
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Idle keep-alive connections; the semaphore bounds how many are in use
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # Answered requests; the push's worker threads count them under the lock
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, timeout=self.timeout)
+
+    def _send(self, method, path, body, headers):
+        """One attempt over a pooled connection; returns (status, headers, body bytes)"""
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+            return response.status, response.headers, data
+
+    def request(self, method, path, form=None):
+        """Send a request (form-encoded when form is given) and return the decoded JSON answer"""
+        if not path.startswith(self.prefix + "/"):
+            path = self.prefix + path
+        body = urllib.parse.urlencode(form) if form is not None else None
+        headers = {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                status, response_headers, data = self._send(method, path, body, headers)
+                with self._lock:
+                    self.requests += 1
+            except (OSError, http.client.HTTPException) as e:
+                error = CanvasError(f"{method} {path} failed: {e}")
+            else:
+                if status < 300:
+                    return json.loads(data) if data else None
+                error = CanvasError(f"{method} {path} returned {status}: {data[:200].decode(errors='replace')}", status)
+                if status != 429 and status < 500:
+                    raise error
+                retry_after = response_headers.get("Retry-After")
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+            if attempt < self.retries:
+                time.sleep(delay)
+        raise error
+
+    def update_grades(self, course_id, assignment_id, grades):
+        """Start a bulk grade update for one assignment; grades maps Canvas user id -> grade. Returns the Progress"""
+        form = {f"grade_data[{user_id}][posted_grade]": grade for user_id, grade in grades.items()}
+        return self.request(
+            "POST", f"/api/v1/courses/{course_id}/assignments/{assignment_id}/submissions/update_grades", form
+        )
+
+    def progress(self, progress_id):
+        return self.request("GET", f"/api/v1/progress/{progress_id}")
+
+    def wait_for(self, progress, interval=POLL_SECONDS, timeout=300):
+        """Poll a Progress until its job has completed or failed; returns the final Progress"""
+        deadline = time.monotonic() + timeout
+        while progress.get("workflow_state") not in ("completed", "failed"):
+            if time.monotonic() > deadline:
+                raise CanvasError(f"Progress {progress.get('id')} still {progress.get('workflow_state')} after {timeout}s")
+            time.sleep(interval)
+            progress = self.progress(progress["id"])
+        return progress
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,196 @@
+"""
+Command line entry point: grade-importer <command> (or python -m grade_importer).
+
+    grade-importer run            the whole pipeline (0-updater.py)
+    grade-importer fetch          download every course's Canvas and Codepath exports into data/
+    grade-importer update         step 1: Codepath grades into the Canvas export
+    grade-importer compare        step 2: grade changes between the two newest -updated.csv files
+    grade-importer unsubmitted    step 3: assignments not submitted
+    grade-importer alerts         students missing several or the latest projects, by section
+    grade-importer completers     the CodePath completers list against the roster
+    grade-importer returning      students returning across Canvas rosters
+    grade-importer final-compare  final grades against a later Canvas export
+    grade-importer push           send the grades the update changed to Canvas
+    grade-importer report         tables from the latest run's report, e.g. zero_last_project
+
+Commands work on the config.json and data/ of the current directory (or --dir).
+Only this module and argparse load before the arguments are parsed; each
+command then imports just the module it runs, so a quick query such as
+`grade-importer report zero_last_project` starts without loading the
+pipeline, and NumPy is only imported by the grade comparison when it diffs.
+The numbered scripts in the repository root call main() with their command.
+"""
+
+import argparse
+import os
+import sys
+
+
+def _context(args):
+    from grade_importer.context import PipelineContext
+    return PipelineContext(args.dir)
+
+
+def run_pipeline(args):
+    from grade_importer import pipeline
+    pipeline.main(args.dir, batch=args.batch, workers=args.workers, incremental=args.incremental,
+                  sequential=args.sequential, watch=args.watch, poll=args.poll, push=args.push,
+                  fetch=args.fetch)
+
+
+def run_fetch(args):
+    from grade_importer import ingest
+    results = ingest.main(args.dir, args.course, tuple(args.only or ingest.KINDS))
+    if any(result["status"] == "failed" for result in results):
+        sys.exit(1)
+
+
+def run_update(args):
+    from grade_importer import updater
+    context = _context(args)
+    # Run on its own, no later step reads the update's tables, so its rows stream straight to the file
+    context.table_consumers = set()
+    updater.main(context, incremental=args.incremental)
+
+
+def run_compare(args):
+    from grade_importer import compare
+    if args.history:
+        compare.history_main(args, args.dir)
+    else:
+        compare.main(_context(args))
+
+
+def run_unsubmitted(args):
+    from grade_importer import unsubmitted
+    unsubmitted.main(_context(args))
+
+
+def run_alerts(args):
+    from grade_importer import unsubmitted
+    unsubmitted.alerts_main(args.dir, args.course, args.missing_at_least, args.missing_last)
+
+
+def run_completers(args):
+    from grade_importer import completers
+    completers.main(_context(args))
+
+
+def run_returning(args):
+    from grade_importer import returning
+    returning.main(args.files, args.then, args.min_courses, args.dir)
+
+
+def run_final_compare(args):
+    from grade_importer import final_compare
+    final_compare.main(args.old_file or final_compare.DEFAULT_OLD_FILE,
+                       args.new_file or final_compare.DEFAULT_NEW_FILE, args.dir)
+
+
+def run_push(args):
+    from grade_importer import push
+    try:
+        push.main(_context(args), dry_run=args.dry_run)
+    except push.CanvasError as e:
+        sys.exit(f"Push incomplete: {e}")
+
+
+def run_report(args):
+    from grade_importer import report
+    report.main(args.table, args.csv, args.dir)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="grade-importer", description="Codepath -> Canvas grade importer")
+    parser.add_argument("--dir", default=os.getcwd(),
+                        help="directory holding config.json and data/ (default: the current directory)")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    command = commands.add_parser("run", help="run the whole pipeline")
+    command.add_argument("--batch", action="store_true",
+                         help="run every course in config.json in parallel worker processes")
+    command.add_argument("--workers", type=int, default=None,
+                         help="maximum number of worker processes in batch mode (default: CPU count)")
+    command.add_argument("--incremental", action="store_true",
+                         help="only recompute students whose Codepath row changed since the last run")
+    command.add_argument("--sequential", action="store_true",
+                         help="run the steps one at a time instead of running independent steps concurrently")
+    command.add_argument("--watch", action="store_true",
+                         help="keep running and re-run the pipeline when new exports land in data/")
+    command.add_argument("--poll", action="store_true",
+                         help="with --watch, poll data/ instead of using inotify")
+    command.add_argument("--fetch", action="store_true",
+                         help="download the exports first (see Ingest in config.json)")
+    command.add_argument("--push", action="store_true",
+                         help="send the changed grades to Canvas through its API (see CanvasApi in config.json)")
+    command.set_defaults(handler=run_pipeline)
+
+    command = commands.add_parser("fetch", help="download the configured exports into data/")
+    command.add_argument("--course", action="append",
+                         help="only this course (its Name or Canvas pattern); may be repeated")
+    command.add_argument("--only", action="append", choices=["canvas", "codepath"],
+                         help="only this kind of export")
+    command.set_defaults(handler=run_fetch)
+
+    command = commands.add_parser("update", help="update the Canvas export with the Codepath grades")
+    command.add_argument("--incremental", action="store_true",
+                         help="only recompute students whose Codepath row changed since the last run")
+    command.set_defaults(handler=run_update)
+
+    command = commands.add_parser("compare", help="compare Canvas grade snapshots")
+    command.add_argument("--history", action="store_true",
+                         help="query every snapshot of the course instead of comparing the latest two")
+    command.add_argument("--kind", default="updated", choices=["updated", "export"],
+                         help="snapshots to use in history mode: -updated.csv files or raw Canvas exports")
+    command.add_argument("--student", help="history: every grade change for this student")
+    command.add_argument("--assignment", help="history: when this assignment's submissions jumped")
+    command.add_argument("--between", nargs=2, metavar=("START", "END"),
+                         help="history: what changed between two dates (e.g. 2025-10-01 2025-10-20T2058)")
+    command.set_defaults(handler=run_compare)
+
+    command = commands.add_parser("unsubmitted", help="report assignments not submitted")
+    command.set_defaults(handler=run_unsubmitted)
+
+    command = commands.add_parser("alerts", help="early alerts from every course's latest Codepath export")
+    command.add_argument("--course", action="append",
+                         help="only this course (its Name or Canvas pattern); may be repeated")
+    command.add_argument("--missing-at-least", type=int, default=2, metavar="N",
+                         help="list students missing at least N projects (default 2)")
+    command.add_argument("--missing-last", type=int, default=2, metavar="K",
+                         help="list students missing each of the last K projects (default 2)")
+    command.set_defaults(handler=run_alerts)
+
+    command = commands.add_parser("completers", help="check the CodePath completers list against the roster")
+    command.set_defaults(handler=run_completers)
+
+    command = commands.add_parser("returning", help="find students returning across Canvas roster exports")
+    command.add_argument("files", nargs="*",
+                         help="Canvas exports (FILE or FILE=TERM) or directories of them; "
+                              "default data/ and next-semester/")
+    command.add_argument("--then", nargs=2, metavar=("PREVIOUS", "NEW"),
+                         help="only compare these two courses (code like COP4655 or a full course key)")
+    command.add_argument("--min-courses", type=int, default=3,
+                         help="list students seen in at least this many courses (default 3)")
+    command.set_defaults(handler=run_returning)
+
+    command = commands.add_parser("final-compare", help="compare submitted final grades with a later Canvas export")
+    command.add_argument("old_file", nargs="?", help="the final grades as submitted")
+    command.add_argument("new_file", nargs="?", help="the later Canvas export")
+    command.set_defaults(handler=run_final_compare)
+
+    command = commands.add_parser("push", help="send the grades the latest update changed to Canvas")
+    command.add_argument("--dry-run", action="store_true", help="only list what would be sent")
+    command.set_defaults(handler=run_push)
+
+    command = commands.add_parser("report", help="show a table from the latest run's report")
+    command.add_argument("table", nargs="?",
+                         help="table name, e.g. zero_last_project or update/missing_students (default: list them)")
+    command.add_argument("--csv", action="store_true", help="print the table as CSV")
+    command.set_defaults(handler=run_report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.dir = os.path.abspath(args.dir)
+    args.handler(args)
@@ -0,0 +1,132 @@
+"""
+Streaming reader for Codepath gradebook exports.
+
+The Codepath CSV download starts with a few junk lines (sheet title, notes,
+blank rows) before the real header row, and every row carries an empty first
+column. open_codepath_csv() memory-maps the export, finds the header row by
+searching the first HEADER_SEARCH_BYTES for the HeadersToLookFor byte
+patterns, and decodes one line at a time straight out of the mapping - from
+the header row on, starting one byte later on lines with the empty leading
+column - so csv.DictReader sees a clean CSV. The export is never read into a
+list of lines, copied with the column stripped or written to a temporary
+file; beyond the mapping itself only the current line is held.
+
+find_header_line() and iter_lines_from_headers() do the same over any
+iterable of text lines. load_codepath_snapshot() reads a whole export into a
+records.Snapshot.
+"""
+
+import csv
+import mmap
+from contextlib import contextmanager
+
+from grade_importer.records import Snapshot
+
+# The header row is expected within the first megabyte of the export
+HEADER_SEARCH_BYTES = 1024 * 1024
+ENCODING = "utf-8"
+
+
+def find_header_line(lines, headers):
+    """Consume lines until one contains every header; return it, or None if never found"""
+    for line in lines:
+        if all(header in line for header in headers):
+            return line
+    return None
+
+
+def iter_lines_from_headers(lines, headers, source_name="<input>"):
+    """Yield the header row and every following line, minus the empty first column"""
+    lines = iter(lines)
+    header_line = find_header_line(lines, headers)
+    if header_line is None:
+        raise ValueError(f"Headers {headers} not found in the file {source_name}.")
+
+    # Only strip the leading column when the header row actually has an empty one
+    if header_line.startswith(","):
+        yield header_line[1:]
+        for line in lines:
+            yield line[1:] if line.startswith(",") else line
+    else:
+        yield header_line
+        yield from lines
+
+
+def find_header_offset(buffer, headers, limit=HEADER_SEARCH_BYTES):
+    """Byte offset of the first line starting within limit that contains every header, or -1"""
+    patterns = [header.encode(ENCODING) for header in headers]
+    end = min(len(buffer), limit)
+    position = 0
+    while position < end:
+        # Candidate lines are the ones holding the first header
+        hit = buffer.find(patterns[0], position, end)
+        if hit == -1:
+            return -1
+        line_start = buffer.rfind(b"\n", 0, hit) + 1
+        line_end = buffer.find(b"\n", hit)
+        if line_end == -1:
+            line_end = len(buffer)
+        if all(buffer.find(pattern, line_start, line_end) != -1 for pattern in patterns[1:]):
+            return line_start
+        position = line_end + 1
+    return -1
+
+
+def iter_mapped_lines(buffer, offset, strip_leading_comma):
+    """Decode the lines of a mapped file from offset, skipping a leading ',' when asked"""
+    view = memoryview(buffer)
+    try:
+        size = len(buffer)
+        position = offset
+        while position < size:
+            line_end = buffer.find(b"\n", position)
+            line_end = size if line_end == -1 else line_end + 1
+            start = position
+            if strip_leading_comma and buffer[start:start + 1] == b",":
+                start += 1
+            # Decoding a memoryview slice doesn't copy the bytes first
+            yield str(view[start:line_end], ENCODING)
+            position = line_end
+    finally:
+        view.release()
+
+
+@contextmanager
+def open_codepath_csv(file_path, headers):
+    """Open a Codepath export and yield a csv.DictReader positioned at the header row"""
+    with open(file_path, "rb") as csv_file:
+        try:
+            buffer = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped
+            raise ValueError(f"Headers {headers} not found in the file {file_path}.")
+        lines = None
+        try:
+            offset = find_header_offset(buffer, headers)
+            if offset == -1:
+                raise ValueError(f"Headers {headers} not found in the file {file_path}.")
+            # Only strip the leading column when the header row actually has an empty one
+            lines = iter_mapped_lines(buffer, offset, buffer[offset:offset + 1] == b",")
+            reader = csv.DictReader(lines)
+            # Read the header row now so a missing header fails before any rows are used
+            reader.fieldnames
+            yield reader
+        finally:
+            # The line generator holds a view of the mapping; release it before unmapping
+            if lines is not None:
+                lines.close()
+            buffer.close()
+
+
+def codepath_snapshot(fieldnames):
+    """An empty Snapshot for Codepath rows: the identity fields are Full Name, Email and Status"""
+    return Snapshot(fieldnames, name_column="Full Name", login_column="Email", section_column=None,
+                    status_column="Status")
+
+
+def load_codepath_snapshot(file_path, headers):
+    """Every row of a Codepath export (from the header row on) as a Snapshot"""
+    with open_codepath_csv(file_path, headers) as reader:
+        snapshot = codepath_snapshot(reader.fieldnames)
+        snapshot.extend(reader.reader)
+        return snapshot
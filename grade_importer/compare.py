@@ -0,0 +1,284 @@
+"""
+Step 2: compare the two newest -updated.csv files, or query the grade history (grade-importer compare).
+"""
+
+import os
+from collections import defaultdict
+
+from grade_importer.context import PROJECT_DIR, load_config
+from grade_importer.grade_matrix import GradeMatrix, diff_grade_matrices
+from grade_importer.grade_values import describe_score
+from grade_importer.history import load_history
+from grade_importer.instrumentation import stage
+from grade_importer.mapping import compile_mapping, display_name
+from grade_importer.manifest import latest_snapshots, record_snapshots
+from grade_importer.parse_cache import load_grade_matrix, load_snapshot
+from grade_importer.report import Section, publish_section
+
+def rows_by_student(rows):
+    """Key already-parsed Canvas rows (records or dicts) by the Student column"""
+    data = {}
+    for row in rows:
+        # Use Student column since that's what's in the CSV
+        student_name = row.get('Student', '')
+        if student_name:
+            data[student_name] = row
+    return data
+
+def parse_csv(file_path):
+    # The rows are records of a Snapshot (see grade_importer/records.py); headers are in snapshot.header
+    return rows_by_student(load_snapshot(file_path))
+
+def compare_grades(old_file, new_file, columns_to_compare, old_data=None, new_data=None, context=None,
+                   display_names=None, data_dir=None):
+    """Compare two Canvas files as grade matrices.
+
+    old_data/new_data are Snapshots already in memory (e.g. step 1's output) and skip
+    re-reading that file. Files that are read go through data_dir's parse cache
+    when data_dir is given. display_names maps columns to report names (from the
+    compiled mapping). Returns the printable updates and the full GradeDiff.
+    """
+    if display_names is None:
+        display_names = {column: display_name(column) for column in columns_to_compare}
+    with stage(context, "parse") as record:
+        if old_data is not None:
+            old_matrix = GradeMatrix.from_snapshot(old_data, columns_to_compare)
+        else:
+            old_matrix = load_grade_matrix(old_file, columns_to_compare, data_dir)
+            record.read_file(old_file)
+        if new_data is not None:
+            new_matrix = GradeMatrix.from_snapshot(new_data, columns_to_compare)
+        else:
+            new_matrix = load_grade_matrix(new_file, columns_to_compare, data_dir)
+            record.read_file(new_file)
+        record.rows = len(old_matrix.students) + len(new_matrix.students)
+
+    with stage(context, "diff") as record:
+        diff = diff_grade_matrices(old_matrix, new_matrix, columns_to_compare)
+        record.rows = len(new_matrix.students)
+
+    for column in diff.dropped_columns:
+        print(f"\nWarning: Column '{column}' not found in new file")
+
+    updates = []
+    for student, column, old_value, new_value in diff.changes:
+        assignment_name = display_names[column]
+        new_value = describe_score(new_value)
+        old_value = old_value if old_value is None else describe_score(old_value)
+        if old_value is None:
+            # Column doesn't exist in old file, show new grade
+            print(f"{student} - {assignment_name} -> {new_value}")
+            updates.append((student, column, "N/A", new_value))
+        else:
+            print(f"{student} - {assignment_name} - {old_value} -> {new_value}")
+            updates.append((student, column, old_value, new_value))
+
+    return updates, diff
+
+def get_latest_csv_files(root_directory, config=None):
+    if config is None:
+        config = load_config()
+    canvas_pattern = config['CanvasCsvPattern']
+    
+    # Two newest -updated.csv files for this course, newest first
+    latest_files = latest_snapshots(root_directory, canvas_pattern, 'updated', 2)
+    return latest_files if len(latest_files) >= 2 else None
+
+def summarize_submissions_by_project(file_path, config):
+    # Parse the CSV file
+    snapshot = load_snapshot(file_path)
+    data = rows_by_student(snapshot)
+    
+    # Get assignment columns and their project numbers from the compiled mapping
+    mapping = compile_mapping(config['ColumnMapping'])
+    canvas_columns = mapping.canvas_columns
+    project_numbers = mapping.project_numbers
+    
+    # Initialize counters for each project
+    project_submissions = defaultdict(int)
+    project_total = defaultdict(int)
+    
+    # Count total students (excluding withdrawn/dropped)
+    total_students = len(data)
+    
+    # Count submissions for each project: a normalized grade that isn't blank, missing or 0
+    # (see grade_importer/grade_values.py)
+    rows = list(data.values())
+    for canvas_col, project_num in zip(canvas_columns, project_numbers):
+        project_total[project_num] += total_students
+        column = snapshot.grade_column(canvas_col)
+        project_submissions[project_num] += sum(
+            1 for row in rows if not column.is_unsubmitted(row.position)
+        )
+    
+    # Sort projects by number (handling non-numeric project names)
+    def sort_key(x):
+        try:
+            return (0, int(x))  # Numeric projects first, sorted by number
+        except ValueError:
+            return (1, x)  # Non-numeric projects after, sorted alphabetically
+    
+    sorted_projects = sorted(project_total.keys(), key=sort_key)
+    
+    # Create summary
+    summary = []
+    for project in sorted_projects:
+        submitted = project_submissions[project]
+        total = project_total[project]
+        unsubmitted = total - submitted
+        percentage = (submitted / total * 100) if total > 0 else 0
+        summary.append({
+            'project': project,
+            'submitted': submitted,
+            'unsubmitted': unsubmitted,
+            'total': total,
+            'percentage': percentage
+        })
+    
+    return summary, total_students
+
+def main(context=None):
+    """Compare the two newest -updated.csv files; reuses step 1's output when given a PipelineContext"""
+    config = context.config if context is not None else load_config()
+    # Use Canvas assignment names (keys) instead of Codepath column names (values)
+    mapping = compile_mapping(config['ColumnMapping'])
+    columns_to_compare = mapping.canvas_columns
+
+    if context is not None:
+        data_directory = context.data_dir
+    else:
+        data_directory = os.path.join(PROJECT_DIR, 'data')
+    with stage(context, "discover"):
+        latest_files = get_latest_csv_files(data_directory, config)
+
+    if not latest_files:
+        print(f"Error: Could not find two Canvas CSV files in the {data_directory}/ directory or its subdirectories.")
+        return
+
+    new_file, old_file = latest_files
+    print(f"\nComparing files:")
+    print(f"Old file: {old_file}")
+    print(f"New file: {new_file}\n")
+
+    # Step 1 already has the newest file's rows in memory
+    new_data = None
+    if context is not None and context.paths.get('updated_csv') == new_file and 'updated_rows' in context.tables:
+        new_data = context.tables['updated_rows']
+    # In watch mode the previous run wrote the old file and still holds its rows
+    old_data = context.reuse_table('updated_rows', old_file) if context is not None else None
+
+    updates, diff = compare_grades(old_file, new_file, columns_to_compare, old_data=old_data, new_data=new_data,
+                                   context=context, display_names=mapping.display_name_of,
+                                   data_dir=data_directory)
+
+    section = Section("compare", "GRADE COMPARISON")
+    section.fields.update({"old_file": old_file, "new_file": new_file, "changes": len(updates)})
+    section.add_table("changes", ["student", "assignment", "old", "new"], [
+        (student, mapping.display_name_of[column], None if old_value == "N/A" else old_value, new_value)
+        for student, column, old_value, new_value in updates
+    ])
+    section.add_table("added_students", ["student"], [(student,) for student in diff.added_students])
+    section.add_table("dropped_students", ["student"], [(student,) for student in diff.dropped_students])
+
+    # Roster changes between the two files
+    roster_lines = []
+    if diff.added_students:
+        roster_lines.append(f"Students added since old file: {len(diff.added_students)}")
+        roster_lines.extend(f"  + {student}" for student in diff.added_students)
+    if diff.dropped_students:
+        roster_lines.append(f"Students no longer in new file: {len(diff.dropped_students)}")
+        roster_lines.extend(f"  - {student}" for student in diff.dropped_students)
+    for line in roster_lines:
+        print(line)
+
+    # The report goes next to the new Canvas file
+    output_filename = new_file.rsplit('.', 1)[0] + '.out'
+
+    if updates:
+        section.write("Updates found between:")
+        section.write(f"  Old: {os.path.basename(old_file)}")
+        section.write(f"  New: {os.path.basename(new_file)}", "")
+        for student, assignment, old_value, new_value in section.tables["changes"]["rows"]:
+            if old_value is None:
+                section.write(f"{student} - {assignment} -> {new_value}")
+            else:
+                section.write(f"{student} - {assignment} - {old_value} -> {new_value}")
+    else:
+        print("No updates found between the files.")
+        section.write("No updates found in the specified columns.")
+    if roster_lines:
+        section.write("", *roster_lines)
+
+    with stage(context, "write-report") as report_record:
+        written = publish_section(context, output_filename, section, report_record)
+    if updates:
+        print(f"Updates have been added to {output_filename}")
+    else:
+        print(f"No updates found. Result added to {output_filename}")
+    if written:
+        record_snapshots(data_directory, *written)
+
+def format_change(student, column, old_value, new_value, when=None):
+    """One line of grade-change output, matching the comparison report format"""
+    assignment_name = display_name(column)
+    prefix = f"{when}  " if when else ""
+    if old_value is None:
+        return f"{prefix}{student} - {assignment_name} -> {describe_score(new_value)}"
+    return f"{prefix}{student} - {assignment_name} - {describe_score(old_value)} -> {describe_score(new_value)}"
+
+def find_column(columns, name):
+    """Match an assignment by its full Canvas column name or the part before the '(' id"""
+    for column in columns:
+        if name == column or name == display_name(column):
+            return column
+    raise ValueError(f"Assignment '{name}' is not in the ColumnMapping")
+
+def history_main(args, base_dir=PROJECT_DIR):
+    """Answer questions across every snapshot of the course instead of just the latest two.
+
+    args has the history options of grade-importer compare: kind, student, assignment and between.
+    """
+    config = load_config(base_dir)
+    columns = list(config['ColumnMapping']['Assignments'].keys())
+    data_directory = os.path.join(base_dir, 'data')
+
+    column = None
+    if args.assignment:
+        try:
+            column = find_column(columns, args.assignment)
+        except ValueError as e:
+            print(f"Error: {e}. Valid assignments:")
+            for name in columns:
+                print(f"  {display_name(name)}")
+            return
+
+    history = load_history(data_directory, config['CanvasCsvPattern'], columns, args.kind)
+    print(f"History: {len(history.snapshots)} snapshots, {len(history.students)} students, "
+          f"{len(history.event_new)} recorded cell changes")
+    if history.snapshots:
+        print(f"From {history.snapshots[0][1]} to {history.snapshots[-1][1]}")
+
+    if args.student:
+        print(f"\nGrade changes for {args.student}:")
+        changes = history.student_changes(args.student)
+        for when, student, column, old_value, new_value in changes:
+            print("  " + format_change(student, column, old_value, new_value, when))
+        if not changes:
+            print("  None")
+
+    if column is not None:
+        print(f"\nSubmission count changes for {column} (largest first):")
+        jumps = history.submission_jumps(column)
+        for before_date, after_date, before, after, delta in jumps:
+            print(f"  {before_date} -> {after_date}: {before} -> {after} ({delta:+d})")
+        if not jumps:
+            print("  None")
+
+    if args.between:
+        start, end = args.between
+        print(f"\nChanges between {start} and {end}:")
+        changes = history.changes_between(start, end)
+        for student, column, old_value, new_value in changes:
+            print("  " + format_change(student, column, old_value, new_value))
+        if not changes:
+            print("  None")
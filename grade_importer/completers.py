@@ -0,0 +1,168 @@
+"""
+Check the CodePath completers list against the Codepath roster (grade-importer completers).
+"""
+
+import csv
+import os
+
+from grade_importer.codepath_csv import load_codepath_snapshot
+from grade_importer.context import PROJECT_DIR, load_config
+from grade_importer.manifest import latest_snapshots
+from grade_importer.name_matching import NameIndex
+from grade_importer.parse_cache import load_snapshot
+
+def parse_csv(file_path, config):
+    """Parse a CSV file and return data as a dictionary"""
+    data = {}
+    
+    # The reader skips the lines before the headers as it streams the file
+    snapshot = load_codepath_snapshot(file_path, config["HeadersToLookFor"])
+    print(f"\nHeaders in {os.path.basename(file_path)}:")
+    print(list(snapshot.header))
+
+    for row in snapshot:
+        student_name = row.name
+        # Skip students who have dropped
+        certificate_status = row.get('CodePath Certificate Status', '').strip()
+        if student_name and certificate_status != 'Dropped':
+            data[student_name] = row
+    
+    return data
+
+def parse_completers_csv(file_path):
+    """Parse the CodePath_Completers_with_Selections.csv file"""
+    data = {}
+    
+    # Assuming 'Name' is the field containing student names
+    snapshot = load_snapshot(file_path, name_column='Name', login_column='Email')
+    print(f"\nHeaders in {os.path.basename(file_path)}:")
+    print(list(snapshot.header))
+    
+    for row in snapshot:
+        if row.name:
+            data[row.name] = row
+    
+    return data
+
+def get_latest_csv_file(root_directory, config):
+    """Get the latest CodePath export from the data directory manifest"""
+    pattern = config.get('CodepathCsvPattern', '')
+    if not pattern:
+        raise ValueError("CodepathCsvPattern not found in config.json")
+        
+    latest_files = latest_snapshots(root_directory, pattern, 'export')
+    if not latest_files:
+        raise FileNotFoundError(f"No CSV files matching pattern '{pattern}' found in the directory")
+        
+    # Get the most recent file
+    latest_file = latest_files[0]
+    print(f"Found latest Codepath file: {os.path.basename(latest_file)}")
+    return latest_file
+
+def active_students(rows):
+    """Codepath rows keyed by Full Name, without students who have dropped"""
+    return {
+        row['Full Name']: row
+        for row in rows
+        if row.get('Full Name') and row.get('CodePath Certificate Status', '').strip() != 'Dropped'
+    }
+
+def main(context=None):
+    """Check the CodePath completers list against the Codepath roster.
+
+    When run as a pipeline step, the config, data directory and the Codepath
+    export step 1 already parsed are taken from the context.
+    """
+    # Load configuration
+    config = context.config if context is not None else load_config()
+    
+    # Get the script directory and data directory
+    script_dir = context.base_dir if context is not None else PROJECT_DIR
+    data_dir = os.path.join(script_dir, 'data')
+    if not os.path.exists(data_dir):
+        raise FileNotFoundError(f"Data directory not found at: {data_dir}")
+    
+    # Get the latest CodePath CSV file
+    if context is not None and 'codepath' in context.paths:
+        latest_codepath_file = context.paths['codepath']
+    else:
+        latest_codepath_file = get_latest_csv_file(data_dir, config)
+    print(f"\nUsing latest CodePath roster file: {os.path.basename(latest_codepath_file)}")
+    
+    # Parse the latest CodePath CSV file (step 1 has usually parsed it already)
+    if context is not None and 'codepath_rows' in context.tables:
+        codepath_data = active_students(context.tables['codepath_rows'])
+    else:
+        codepath_data = parse_csv(latest_codepath_file, config)
+    print(f"Found {len(codepath_data)} active students in the CodePath roster")
+    
+    # Path to the CodePath Completers CSV file
+    completers_file = os.path.join(data_dir, 'CodePath_Completers_with_Selections.csv')
+    if not os.path.exists(completers_file):
+        raise FileNotFoundError(f"CodePath Completers file not found at: {completers_file}")
+    
+    # Parse the CodePath Completers CSV file
+    completers_data = parse_completers_csv(completers_file)
+    print(f"Found {len(completers_data)} students in the CodePath Completers file")
+    
+    # Find students who are in both files: by email when both sides have one,
+    # otherwise by normalized name (accents, case, word order). A fuzzy match may
+    # be a different person ("Danielle Lee" / "Daniel Lee"), so it needs a review
+    roster_index = NameIndex(
+        codepath_data.keys(),
+        {name: row.get('Email', '') for name, row in codepath_data.items()},
+    )
+    matches = {}
+    students_in_both = []
+    students_to_review = []
+    students_not_in_roster = []
+    
+    for student_name, row in completers_data.items():
+        match = roster_index.match(student_name, row.get('Email', ''))
+        matches[student_name] = match
+        if match is None:
+            students_not_in_roster.append(student_name)
+        elif match.method == 'fuzzy':
+            students_to_review.append(student_name)
+        else:
+            students_in_both.append(student_name)
+    
+    # Print results
+    print("\nResults:")
+    print(f"Total students in CodePath Completers file: {len(completers_data)}")
+    print(f"Students from Completers file who are in your CodePath roster: {len(students_in_both)}")
+    print(f"Students from Completers file with a similar name to review: {len(students_to_review)}")
+    
+    print("\nStudents from Completers file who are in your CodePath roster:")
+    for i, student in enumerate(sorted(students_in_both), 1):
+        match = matches[student]
+        if match.key == student:
+            print(f"{i}. {student}")
+        else:
+            print(f"{i}. {student} -> {match.key} ({match.method})")
+    
+    if students_to_review:
+        print("\nStudents from Completers file with a similar name in your CodePath roster (needs review):")
+        for i, student in enumerate(sorted(students_to_review), 1):
+            match = matches[student]
+            print(f"{i}. {student} -> {match.key}? ({match.confidence:.0%})")
+    
+    print("\nStudents from Completers file who are NOT in your CodePath roster:")
+    for i, student in enumerate(sorted(students_not_in_roster), 1):
+        print(f"{i}. {student}")
+    
+    # Write results to a CSV file
+    output_file = os.path.join(script_dir, 'codepath_completers_comparison.csv')
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Student Name', 'In CodePath Roster', 'Roster Name', 'Confidence', 'Matched By'])
+        
+        for student in sorted(completers_data.keys()):
+            match = matches[student]
+            if match is None:
+                writer.writerow([student, 'No', '', '', ''])
+            else:
+                in_roster = 'Needs review' if match.method == 'fuzzy' else 'Yes'
+                writer.writerow([student, in_roster, match.key, f"{match.confidence:.2f}", match.method])
+    
+    print(f"\nResults have been written to: {os.path.basename(output_file)}")
@@ -0,0 +1,117 @@
+"""
+Pipeline context shared between the grade processing steps.
+
+0-updater.py builds one PipelineContext and hands it to each step's main().
+Step 1 records the files it picked and the tables it parsed; later steps read
+them from the context instead of reloading config.json, rescanning data/ and
+re-parsing the same CSVs. Each step still works standalone with no context.
+"""
+
+import json
+import os
+import threading
+
+# The repository root (config.json and data/ live here)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_config(base_dir=PROJECT_DIR):
+    """Load configuration from config.json file"""
+    with open(os.path.join(base_dir, "config.json"), "r") as config_file:
+        return json.load(config_file)
+
+
+def course_configs(config):
+    """Expand a config into one config per course; a single-course config is returned as is"""
+    courses = config.get("Courses")
+    if not courses:
+        return [config]
+    defaults = {key: value for key, value in config.items() if key != "Courses"}
+    return [{**defaults, **course} for course in courses]
+
+
+def course_name(course_config):
+    """Display name for a course: its Name, falling back to the Canvas pattern"""
+    return course_config.get("Name") or course_config["CanvasCsvPattern"]
+
+
+def snapshot_key(path):
+    """(size, mtime) of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class PipelineContext:
+    """Loaded config, resolved file paths and parsed tables for one pipeline run.
+
+    paths keys used by the steps:
+        canvas, codepath      - input exports picked by step 1
+        updated_csv, summary  - the -updated.csv and the -updated.out report started by step 1
+
+    tables keys used by the steps, each a records.Snapshot (header plus one record per row):
+        canvas_rows   - the parsed Canvas export
+        codepath_rows - the Codepath export with headers cleaned
+        updated_rows  - rows written to the -updated.csv
+
+    table_consumers is the set of tables the scheduled steps read (set by
+    scheduler.run_steps(); None keeps every table). A step only keeps a table
+    in memory when wants_table() says a later step reads it.
+
+    snapshots records the (size, mtime) of the files the tables were parsed
+    from or written to; in watch mode previous is the last run's context and
+    reuse_table() hands back its tables for files that haven't changed.
+
+    options holds run-wide switches from the command line (e.g. "incremental").
+    recorder is an optional instrumentation.RunRecorder timing the steps.
+    report_sections is set by the step scheduler while steps run concurrently
+    (see report.publish_section()); current_step is the step running on this thread.
+    """
+
+    def __init__(self, base_dir=PROJECT_DIR, config=None, options=None):
+        self.base_dir = base_dir
+        self.config = config if config is not None else load_config(base_dir)
+        self.data_dir = os.path.join(base_dir, "data")
+        self.paths = {}
+        self.tables = {}
+        self.options = dict(options or {})
+        self.recorder = None
+        self.report_sections = None
+        self.table_consumers = None
+        self.snapshots = {}
+        self.previous = None
+        self._local = threading.local()
+
+    @property
+    def current_step(self):
+        return getattr(self._local, "step", None)
+
+    @current_step.setter
+    def current_step(self, name):
+        self._local.step = name
+
+    def get_table(self, name, loader):
+        """Return a parsed table, calling loader() only the first time it is requested"""
+        if name not in self.tables:
+            self.tables[name] = loader()
+        return self.tables[name]
+
+    def wants_table(self, name):
+        """Whether a step of this run reads the table (always, when no step list is known)"""
+        return self.table_consumers is None or name in self.table_consumers
+
+    def note_snapshot(self, path):
+        """Remember the state of a file a table was parsed from or written to"""
+        self.snapshots[path] = snapshot_key(path)
+
+    def reuse_table(self, name, path):
+        """The previous run's table for path if the file is unchanged since, otherwise None"""
+        previous = self.previous
+        if previous is None or name not in previous.tables:
+            return None
+        if previous.snapshots.get(path) != snapshot_key(path):
+            return None
+        return previous.tables[name]
+
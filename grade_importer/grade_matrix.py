@@ -0,0 +1,190 @@
+"""
+Student x assignment grade matrices and a vectorized diff between two snapshots.
+
+A Canvas snapshot is loaded once into one array('d') column per assignment,
+aligned by student position and normalized in one pass per column by
+grade_values.normalize_column() ("8/10" and "80%" become points). Diffing two
+snapshots then works on whole columns: with NumPy installed the arrays are
+viewed zero-copy and compared in a single masked operation; without it the
+same column-wise comparison runs over the raw arrays. Blank cells count as 0.0 (as the compare script always did);
+cells that aren't scores (excused, missing, unreadable) are NaN and only
+count as a change when the other side is a number.
+"""
+
+import csv
+from array import array
+
+from grade_importer.grade_values import normalize_column, normalize_value
+
+
+class GradeMatrix:
+    """Numeric grades for one snapshot: students (row order), columns and one array('d') per column"""
+
+    def __init__(self, students, columns, data):
+        self.students = students
+        self.columns = columns
+        self.data = data
+        self.index = {student: position for position, student in enumerate(students)}
+
+    @classmethod
+    def from_rows(cls, rows, columns, key_column="Student"):
+        """Build a matrix from parsed rows (lists of strings with a header, or dicts)"""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return cls([], [], [])
+        if isinstance(first, dict):
+            header = list(first.keys())
+            rows = (list(row.values()) for row in _chain(first, rows))
+        else:
+            header = first
+
+        key_position = header.index(key_column)
+        present = [column for column in columns if column in header]
+        positions = [header.index(column) for column in present]
+
+        # Later rows for the same student replace earlier ones (like a dict keyed by student)
+        by_student = {}
+        points = [0.0] * len(present)
+        for row in rows:
+            student = row[key_position] if key_position < len(row) else ""
+            cells = [row[p] if p < len(row) else "" for p in positions]
+            # Canvas exports carry a "Points Possible" row that isn't a student
+            if student.strip() == "Points Possible":
+                points = [normalize_value(cell)[0] for cell in cells]
+            elif student:
+                by_student[student] = cells
+
+        students = list(by_student)
+        values = list(by_student.values())
+        data = [
+            normalize_column([cells[j] for cells in values], points[j] if points[j] > 0 else None, blank=0.0).values
+            for j in range(len(present))
+        ]
+        return cls(students, present, data)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, columns):
+        """Build a matrix from a records.Snapshot of a Canvas export, reusing its grade columns"""
+        present = [column for column in columns if column in snapshot.positions]
+        points = snapshot.points_possible(present)
+        # Later rows for the same student replace earlier ones, as in from_rows()
+        by_student = {}
+        for record in snapshot:
+            if record.name and record.name.strip() != "Points Possible":
+                by_student[record.name] = record.position
+        positions = list(by_student.values())
+        data = []
+        for column in present:
+            values = snapshot.grade_column(column, points.get(column), blank=0.0).values
+            data.append(array("d", [values[position] for position in positions]))
+        return cls(list(by_student), present, data)
+
+    @classmethod
+    def from_csv(cls, file_path, columns, key_column="Student"):
+        """Load the given assignment columns of a Canvas CSV"""
+        with open(file_path, "r", newline="") as csvfile:
+            return cls.from_rows(csv.reader(csvfile), columns, key_column)
+
+    def column(self, name):
+        return self.data[self.columns.index(name)]
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+class GradeDiff:
+    """Structured result of diffing two GradeMatrix snapshots.
+
+    changes          - (student, column, old value or None for a new column, new value),
+                       in new-file student order then column order
+    new_columns      - columns only present in the new snapshot
+    dropped_columns  - requested columns missing from the new snapshot
+    added_students   - students only in the new snapshot
+    dropped_students - students only in the old snapshot
+    """
+
+    def __init__(self, changes, new_columns, dropped_columns, added_students, dropped_students):
+        self.changes = changes
+        self.new_columns = new_columns
+        self.dropped_columns = dropped_columns
+        self.added_students = added_students
+        self.dropped_students = dropped_students
+
+
+def _changed_cells_numpy(numpy, old, new, old_rows, new_rows, shared, epsilon):
+    """Return (row, column) pairs of changed cells using one masked NumPy comparison"""
+    old_block = numpy.column_stack([numpy.frombuffer(old.column(c), dtype=numpy.float64) for c in shared])[old_rows]
+    new_block = numpy.column_stack([numpy.frombuffer(new.column(c), dtype=numpy.float64) for c in shared])[new_rows]
+    with numpy.errstate(invalid="ignore"):
+        changed = numpy.abs(new_block - old_block) > epsilon
+    changed |= numpy.isnan(old_block) != numpy.isnan(new_block)
+    rows, cols = numpy.nonzero(changed)
+    return list(zip(rows.tolist(), cols.tolist()))
+
+
+def _changed_cells_arrays(old, new, old_rows, new_rows, shared, epsilon):
+    """Return (row, column) pairs of changed cells comparing whole array columns"""
+    cells = []
+    for j, column in enumerate(shared):
+        old_column = old.column(column)
+        new_column = new.column(column)
+        old_values = [old_column[i] for i in old_rows]
+        new_values = [new_column[i] for i in new_rows]
+        cells.extend(
+            (i, j)
+            for i, (a, b) in enumerate(zip(old_values, new_values))
+            if abs(b - a) > epsilon or (a != a) != (b != b)
+        )
+    cells.sort()
+    return cells
+
+
+def diff_grade_matrices(old, new, columns, epsilon=0.01, use_numpy=True):
+    """Diff two snapshots over the requested columns"""
+    numpy = None
+    if use_numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+    common = [student for student in new.students if student in old.index]
+    added_students = [student for student in new.students if student not in old.index]
+    dropped_students = [student for student in old.students if student not in new.index]
+
+    shared = [column for column in columns if column in new.columns and column in old.columns]
+    new_columns = [column for column in columns if column in new.columns and column not in old.columns]
+    dropped_columns = [column for column in columns if column not in new.columns]
+
+    old_rows = [old.index[student] for student in common]
+    new_rows = [new.index[student] for student in common]
+
+    changes = []
+    if common and shared:
+        if numpy is not None:
+            cells = _changed_cells_numpy(numpy, old, new, old_rows, new_rows, shared, epsilon)
+        else:
+            cells = _changed_cells_arrays(old, new, old_rows, new_rows, shared, epsilon)
+        shared_data_old = [old.column(column) for column in shared]
+        shared_data_new = [new.column(column) for column in shared]
+        changes = [
+            (common[i], shared[j], shared_data_old[j][old_rows[i]], shared_data_new[j][new_rows[i]])
+            for i, j in cells
+        ]
+
+    if new_columns and common:
+        # A column the old file didn't have: every common student gets its new value reported
+        new_data = [new.column(column) for column in new_columns]
+        changes.extend(
+            (common[i], column, None, new_data[k][new_rows[i]])
+            for i in range(len(common))
+            for k, column in enumerate(new_columns)
+        )
+        order = {column: position for position, column in enumerate(columns)}
+        position = {student: i for i, student in enumerate(common)}
+        changes.sort(key=lambda change: (position[change[0]], order[change[1]]))
+
+    return GradeDiff(changes, new_columns, dropped_columns, added_students, dropped_students)
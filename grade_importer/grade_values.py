@@ -0,0 +1,157 @@
+"""
+Column-wise normalization of grade cells.
+
+Grade cells come in several shapes: "8", "8/10", "80%", "Excused", "Missing"
+or blank. normalize_column() classifies and converts a whole assignment column
+in one pass and returns a GradeColumn: an array('d') of scores plus a status
+byte per cell, and the text to write to Canvas for each cell. Grade columns
+repeat the same few strings thousands of times, so each distinct string is
+classified once (precompiled patterns, cached) and the column is then built by
+lookup.
+
+Statuses:
+    NUMERIC   "8", "8.5", "8 pts"        the number
+    FRACTION  "8/10", "8 / 10"            scaled to the column's points possible
+                                          (the numerator when points are unknown)
+    PERCENT   "80%"                       that share of the points possible
+                                          (INVALID when points are unknown)
+    BLANK     ""                          the column's blank value (NaN by default)
+    EXCUSED   "EX", "Excused"             NaN; written to Canvas as "EX"
+    MISSING   "Missing", "MI", "-"        NaN; written to Canvas as blank
+    INVALID   anything else               NaN; written to Canvas unchanged
+"""
+
+import math
+import re
+from array import array
+from functools import lru_cache
+
+NUMERIC, FRACTION, PERCENT, BLANK, EXCUSED, MISSING, INVALID = range(7)
+STATUS_NAMES = ("numeric", "fraction", "percent", "blank", "excused", "missing", "invalid")
+SCORED = frozenset((NUMERIC, FRACTION, PERCENT))
+
+_NUMBER = r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)"
+NUMBER_PATTERN = re.compile(rf"^({_NUMBER})(?:\s*(?:pts?|points?))?$", re.IGNORECASE)
+FRACTION_PATTERN = re.compile(rf"^({_NUMBER})\s*/\s*({_NUMBER})$")
+PERCENT_PATTERN = re.compile(rf"^({_NUMBER})\s*%$")
+EXCUSED_WORDS = frozenset(("ex", "excused"))
+MISSING_WORDS = frozenset(("missing", "mi", "-", "not submitted"))
+
+
+@lru_cache(maxsize=4096)
+def classify(text):
+    """(status, number, denominator) of a stripped grade string"""
+    if not text:
+        return BLANK, None, None
+    match = NUMBER_PATTERN.match(text)
+    if match:
+        return NUMERIC, float(match.group(1)), None
+    match = FRACTION_PATTERN.match(text)
+    if match:
+        denominator = float(match.group(2))
+        if denominator:
+            return FRACTION, float(match.group(1)), denominator
+        return INVALID, None, None
+    match = PERCENT_PATTERN.match(text)
+    if match:
+        return PERCENT, float(match.group(1)), None
+    word = text.lower()
+    if word in EXCUSED_WORDS:
+        return EXCUSED, None, None
+    if word in MISSING_WORDS:
+        return MISSING, None, None
+    return INVALID, None, None
+
+
+def format_score(value):
+    """A score as Canvas takes it: '8', '8.5', '7.3333'"""
+    text = f"{value:.4f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def describe_score(value):
+    """A matrix score for reports: the float as before, or "no score" for excused/missing/unreadable (NaN)"""
+    return "no score" if value != value else str(value)
+
+
+def normalize_value(raw, points_possible=None, blank=math.nan):
+    """(score, status, Canvas text) of one cell"""
+    text = (raw or "").strip() if not isinstance(raw, (int, float)) else str(raw)
+    status, number, denominator = classify(text)
+    if status == NUMERIC:
+        value = number
+    elif status == FRACTION:
+        value = number / denominator * points_possible if points_possible else number
+    elif status == PERCENT:
+        if not points_possible:
+            return math.nan, INVALID, text
+        value = number / 100 * points_possible
+    elif status == BLANK:
+        return blank, BLANK, ""
+    elif status == EXCUSED:
+        return math.nan, EXCUSED, "EX"
+    elif status == MISSING:
+        return math.nan, MISSING, ""
+    else:
+        return math.nan, INVALID, text
+    return value, status, format_score(value)
+
+
+def _is_unsubmitted(value, status):
+    """Blank, missing or a score of 0"""
+    return status == BLANK or status == MISSING or (status in SCORED and value == 0.0)
+
+
+class GradeColumn:
+    """One normalized assignment column: scores, a status byte and the Canvas text per cell,
+    plus a 0/1 byte per cell marking the ones not submitted (see is_unsubmitted())
+    """
+
+    def __init__(self, values, status, texts, unsubmitted=None):
+        self.values = values
+        self.status = status
+        self.texts = texts
+        if unsubmitted is None:
+            unsubmitted = bytearray(self.is_unsubmitted(i) for i in range(len(values)))
+        self.unsubmitted = unsubmitted
+
+    def __len__(self):
+        return len(self.values)
+
+    def is_zero(self, i):
+        return self.status[i] in SCORED and self.values[i] == 0.0
+
+    def is_unsubmitted(self, i):
+        """Blank, missing or a score of 0"""
+        return _is_unsubmitted(self.values[i], self.status[i])
+
+    def counts(self):
+        """{status name: cells}"""
+        return {STATUS_NAMES[status]: self.status.count(status) for status in set(self.status)}
+
+
+def normalize_column(raw_values, points_possible=None, blank=math.nan):
+    """Normalize a column of raw cells (strings or None) in one pass"""
+    raw_values = raw_values if isinstance(raw_values, list) else list(raw_values)
+    lookup = {raw: normalize_value(raw, points_possible, blank) for raw in set(raw_values)}
+    entries = [lookup[raw] for raw in raw_values]
+    unsubmitted = {raw: _is_unsubmitted(value, status) for raw, (value, status, _) in lookup.items()}
+    return GradeColumn(
+        array("d", [entry[0] for entry in entries]),
+        bytearray(entry[1] for entry in entries),
+        [entry[2] for entry in entries],
+        bytearray(map(unsubmitted.__getitem__, raw_values)),
+    )
+
+
+def points_possible(rows, columns, key_column="Student"):
+    """{column: points} from a Canvas export's "Points Possible" row (empty when there is none)"""
+    for row in rows:
+        if (row.get(key_column) or "").strip() == "Points Possible":
+            points = {}
+            for column in columns:
+                value, status, _ = normalize_value(row.get(column))
+                if status == NUMERIC and value > 0:
+                    points[column] = value
+            return points
+    return {}
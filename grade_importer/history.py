@@ -0,0 +1,189 @@
+"""
+Grade history across every snapshot of a course.
+
+All snapshots of one kind (by default the -updated.csv files) are loaded once,
+oldest first, into a compact columnar change log: parallel arrays of
+(snapshot, student, column, old value, new value) holding only the cells that
+changed from one snapshot to the next, plus per-snapshot submission counts for
+each assignment. Queries - a student's grade changes, when an assignment's
+submissions jumped, what changed between two dates - scan those arrays rather
+than re-parsing CSVs.
+
+The store is pickled to data/.cache/ and extended with only the snapshots that
+arrived since it was written. If an older snapshot is added or rewritten, the
+store is rebuilt from scratch.
+"""
+
+import math
+import os
+import pickle
+from array import array
+
+from grade_importer.grade_matrix import GradeMatrix
+from grade_importer.manifest import open_manifest
+from grade_importer.parse_cache import open_parse_cache
+
+HISTORY_VERSION = 1
+
+
+def _same(a, b):
+    """Float equality where NaN equals NaN"""
+    return a == b or (a != a and b != b)
+
+
+class GradeHistory:
+    """Columnar time series of grade changes for one course"""
+
+    def __init__(self, pattern, kind, columns):
+        self.version = HISTORY_VERSION
+        self.pattern = pattern
+        self.kind = kind
+        self.columns = list(columns)
+        # (path, exported_at, mtime, size) per snapshot, oldest first
+        self.snapshots = []
+        self.students = []
+        self.student_index = {}
+        # Last known value of every student in every column (NaN = never seen)
+        self.latest = [array("d") for _ in self.columns]
+        # The change log, one entry per changed cell
+        self.event_snapshot = array("i")
+        self.event_student = array("i")
+        self.event_column = array("i")
+        self.event_old = array("d")
+        self.event_new = array("d")
+        # Submitted (non-zero) cells per column, one array per snapshot
+        self.submitted = []
+
+    def _student_id(self, student):
+        student_id = self.student_index.get(student)
+        if student_id is None:
+            student_id = len(self.students)
+            self.students.append(student)
+            self.student_index[student] = student_id
+            for column_values in self.latest:
+                column_values.append(math.nan)
+        return student_id
+
+    def add_snapshot(self, path, exported_at, mtime, size, matrix=None):
+        """Append one snapshot, recording only the cells that differ from the previous state"""
+        if matrix is None:
+            matrix = GradeMatrix.from_csv(path, self.columns)
+        snapshot_id = len(self.snapshots)
+        student_ids = [self._student_id(student) for student in matrix.students]
+        counts = array("i", [0] * len(self.columns))
+
+        for column, values in zip(matrix.columns, matrix.data):
+            column_id = self.columns.index(column)
+            latest = self.latest[column_id]
+            counts[column_id] = sum(1 for value in values if value > 0)
+            for student_id, value in zip(student_ids, values):
+                previous = latest[student_id]
+                if not _same(previous, value):
+                    self.event_snapshot.append(snapshot_id)
+                    self.event_student.append(student_id)
+                    self.event_column.append(column_id)
+                    self.event_old.append(previous)
+                    self.event_new.append(value)
+                    latest[student_id] = value
+
+        self.submitted.append(counts)
+        self.snapshots.append((path, exported_at, mtime, size))
+
+    def _events(self, positions):
+        for k in positions:
+            old = self.event_old[k]
+            yield (
+                self.snapshots[self.event_snapshot[k]][1],
+                self.students[self.event_student[k]],
+                self.columns[self.event_column[k]],
+                None if old != old else old,
+                self.event_new[k],
+            )
+
+    def student_changes(self, student):
+        """Every grade change for a student: (exported_at, student, column, old or None, new)"""
+        student_id = self.student_index.get(student)
+        if student_id is None:
+            return []
+        positions = [k for k, value in enumerate(self.event_student) if value == student_id]
+        return list(self._events(positions))
+
+    def submission_jumps(self, column):
+        """Change in submitted count for a column between consecutive snapshots, biggest first"""
+        column_id = self.columns.index(column)
+        jumps = []
+        for s in range(1, len(self.snapshots)):
+            before = self.submitted[s - 1][column_id]
+            after = self.submitted[s][column_id]
+            if after != before:
+                jumps.append((self.snapshots[s - 1][1], self.snapshots[s][1], before, after, after - before))
+        jumps.sort(key=lambda jump: -abs(jump[4]))
+        return jumps
+
+    def snapshot_at(self, date):
+        """Index of the last snapshot exported on or before date (a prefix such as 2025-10-20); -1 if none"""
+        index = -1
+        for s, snapshot in enumerate(self.snapshots):
+            if snapshot[1][: len(date)] <= date:
+                index = s
+        return index
+
+    def changes_between(self, start, end):
+        """Net cell changes from the snapshot at start to the snapshot at end: (student, column, old, new)"""
+        first = self.snapshot_at(start)
+        last = self.snapshot_at(end)
+        net = {}
+        for k, snapshot_id in enumerate(self.event_snapshot):
+            if first < snapshot_id <= last:
+                key = (self.event_student[k], self.event_column[k])
+                old = net[key][0] if key in net else self.event_old[k]
+                net[key] = (old, self.event_new[k])
+        changes = [
+            (self.students[student_id], self.columns[column_id], None if old != old else old, new)
+            for (student_id, column_id), (old, new) in sorted(net.items())
+            if not _same(old, new)
+        ]
+        return changes
+
+
+def history_cache_path(data_dir, pattern, kind):
+    return os.path.join(data_dir, ".cache", f"history-{pattern}-{kind}.pickle")
+
+
+def load_history(data_dir, pattern, columns, kind="updated"):
+    """Load the cached history for a course and extend it with any new snapshots"""
+    snapshots = [
+        (row["path"], row["exported_at"], row["mtime"], row["size"])
+        for row in open_manifest(data_dir).snapshots(pattern, kind)
+    ]
+    cache_path = history_cache_path(data_dir, pattern, kind)
+
+    history = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as cache_file:
+                history = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"Ignoring unreadable history cache {cache_path}: {e}")
+    # Only reuse the cache when it is an unchanged prefix of today's snapshot list
+    if (
+        history is None
+        or history.version != HISTORY_VERSION
+        or history.columns != list(columns)
+        or history.snapshots != snapshots[: len(history.snapshots)]
+    ):
+        history = GradeHistory(pattern, kind, columns)
+
+    added = snapshots[len(history.snapshots):]
+    # A rebuild re-reads every snapshot; the parse cache makes that cheap
+    parse_cache = open_parse_cache(data_dir)
+    for snapshot in added:
+        history.add_snapshot(*snapshot, matrix=parse_cache.grade_matrix(snapshot[0], history.columns))
+
+    if added:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "wb") as cache_file:
+            pickle.dump(history, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    return history
@@ -0,0 +1,98 @@
+"""
+Incremental re-runs of the Canvas updater.
+
+A fingerprint of every student's Codepath row (identity, status and the mapped
+assignment values) is stored per course after each run. On the next run a
+student whose fingerprint is unchanged reuses the stored outcome - the grades
+copied into Canvas and whether they belong in the missing / zero-last-project
+lists - so only the changed rows are recomputed. The changed rows are also
+written to a -changed.csv, which is all that needs to be uploaded to Canvas.
+"""
+
+import hashlib
+import json
+import os
+
+STATE_VERSION = 2
+
+# Codepath columns that, besides the mapped assignments, decide a student's outcome
+IDENTITY_COLUMNS = ["Email", "Full Name", "Status", "CodePath Certificate Status"]
+
+
+def state_path(data_dir, canvas_pattern):
+    """Location of a course's fingerprint state file"""
+    return os.path.join(data_dir, ".state", f"{canvas_pattern}-incremental.json")
+
+
+def mapping_fingerprint(column_mapping, points=None):
+    """Hash of the column mapping and the Canvas points possible per column.
+
+    State recorded under a different mapping, or before a column's points
+    changed (they scale "8/10" and "80%" cells), is discarded.
+    """
+    encoded = json.dumps({"mapping": column_mapping, "points": points or {}}, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class IncrementalState:
+    """Previous run's per-student fingerprints and outcomes, plus the ones recorded this run"""
+
+    def __init__(self, path, column_mapping, points=None):
+        self.path = path
+        self.mapping_key = mapping_fingerprint(column_mapping, points)
+        self.columns = IDENTITY_COLUMNS + list(column_mapping["Assignments"].values())
+        self.previous = self._load()
+        self.current = {}
+        self.changed = 0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable incremental state {self.path}: {e}")
+            return {}
+        if state.get("version") != STATE_VERSION:
+            print(f"Incremental state is version {state.get('version')}, expected {STATE_VERSION}; "
+                  "recomputing every student")
+            return {}
+        if state.get("mapping") != self.mapping_key:
+            print("Column mapping or points possible changed since the last run; recomputing every student")
+            return {}
+        return state.get("students", {})
+
+    def fingerprint(self, row, in_canvas):
+        """Hash the fields of a Codepath row that affect the result, plus Canvas membership"""
+        digest = hashlib.blake2b(digest_size=16)
+        for column in self.columns:
+            digest.update((row.get(column) or "").encode("utf-8"))
+            digest.update(b"\x1f")
+        digest.update(b"1" if in_canvas else b"0")
+        return digest.hexdigest()
+
+    def lookup(self, email, fingerprint):
+        """Return the stored outcome for an unchanged student, or None if it must be recomputed"""
+        previous = self.previous.get(email)
+        if previous is not None and previous["fingerprint"] == fingerprint:
+            return previous
+        return None
+
+    def record(self, email, fingerprint, entry, changed):
+        """Remember this run's outcome for a student"""
+        entry["fingerprint"] = fingerprint
+        self.current[email] = entry
+        if changed:
+            self.changed += 1
+
+    def save(self):
+        """Write the state atomically so an interrupted run leaves the old state intact"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump(
+                {"version": STATE_VERSION, "mapping": self.mapping_key, "students": self.current},
+                state_file,
+            )
+        os.replace(temp_path, self.path)
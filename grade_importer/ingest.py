@@ -0,0 +1,235 @@
+"""
+Fetch every configured course's Canvas and Codepath exports into data/
+(grade-importer fetch, or run --fetch) instead of downloading them by hand.
+
+Where each kind of export comes from is set under "Ingest" in config.json:
+
+    "Ingest": {
+        "Canvas": {"Source": "canvas", "BaseUrl": "https://fau.instructure.com"},
+        "Codepath": {"Source": "http", "Url": "https://example.org/exports/{pattern}.csv"},
+        "MaxConnections": 12,
+        "RequestsPerSecond": 10
+    }
+
+Sources:
+    canvas     Canvas's gradebook CSV export for the course's CanvasApi.CourseId
+               (BaseUrl and TokenEnv default to the CanvasApi settings)
+    http       a GET of Url, optionally with a bearer token from TokenEnv
+    directory  the newest file matching Glob (default "*{pattern}*.csv") in Path,
+               e.g. the browser's download folder
+Url and Glob may use {pattern} (the course's CanvasCsvPattern or
+CodepathCsvPattern), {name} and {course_id}.
+
+All downloads of all courses run concurrently on one asyncio loop, sharing
+keep-alive connections and a per-host rate limit (grade_importer/async_http.py),
+so refreshing every course takes about as long as the slowest download. Each
+file is streamed to a hidden temporary file in data/ and renamed to
+<timestamp>_<Pattern>.csv when complete, so watch mode and the other steps
+never see half a file. A download identical to the course's latest export is
+dropped rather than stored as a new snapshot, and one whose snapshot name was
+already taken by a fetch earlier in the same minute is skipped.
+
+python3 -m grade_importer.mock_canvas --exports-dir DIR serves a local
+stand-in for the canvas and http sources.
+"""
+
+import asyncio
+import filecmp
+import glob
+import os
+import shutil
+import time
+from datetime import datetime
+
+from grade_importer.async_http import AsyncHttpClient, HttpError
+from grade_importer.context import PROJECT_DIR, course_configs, course_name, load_config
+from grade_importer.manifest import latest_snapshots, record_snapshots
+
+KINDS = {"canvas": "CanvasCsvPattern", "codepath": "CodepathCsvPattern"}
+# Per host: enough for a dozen courses' exports to download side by side
+MAX_CONNECTIONS = 12
+POLL_SECONDS = 0.5
+EXPORT_TIMEOUT_SECONDS = 300
+
+
+class IngestError(Exception):
+    """An export that could not be fetched"""
+
+
+def _placeholders(course_config, pattern):
+    return {"pattern": pattern, "name": course_name(course_config),
+            "course_id": (course_config.get("CanvasApi") or {}).get("CourseId", "")}
+
+
+def _bearer(token_env):
+    if not token_env:
+        return {}
+    token = os.environ.get(token_env)
+    if not token:
+        raise IngestError(f"Set the access token in the {token_env} environment variable")
+    return {"Authorization": f"Bearer {token}"}
+
+
+class DirectorySource:
+    """The newest matching file in a local directory"""
+
+    def __init__(self, settings):
+        self.path = os.path.expanduser(settings["Path"])
+        self.glob = settings.get("Glob", "*{pattern}*.csv")
+
+    def describe(self, course_config, pattern):
+        return os.path.join(self.path, self.glob.format(**_placeholders(course_config, pattern)))
+
+    async def fetch(self, client, course_config, pattern, destination):
+        matches = glob.glob(self.describe(course_config, pattern))
+        if not matches:
+            raise IngestError(f"nothing matches {self.describe(course_config, pattern)}")
+        newest = max(matches, key=os.path.getmtime)
+        await asyncio.to_thread(shutil.copyfile, newest, destination)
+        return newest
+
+
+class HttpSource:
+    """A GET of a URL"""
+
+    def __init__(self, settings):
+        self.url = settings["Url"]
+        self.token_env = settings.get("TokenEnv")
+
+    async def fetch(self, client, course_config, pattern, destination):
+        url = self.url.format(**_placeholders(course_config, pattern))
+        await client.download(url, destination, _bearer(self.token_env))
+        return url
+
+
+class CanvasExportSource:
+    """Canvas's gradebook CSV export: start the export job, wait for it, download its attachment"""
+
+    def __init__(self, settings):
+        self.base_url = settings.get("BaseUrl", "").rstrip("/")
+        self.token_env = settings.get("TokenEnv", "CANVAS_API_TOKEN")
+        self.course_id = settings.get("CourseId")
+        if not self.base_url:
+            raise IngestError("the canvas source needs a BaseUrl")
+
+    async def fetch(self, client, course_config, pattern, destination):
+        course_id = (course_config.get("CanvasApi") or {}).get("CourseId") or self.course_id
+        if not course_id:
+            raise IngestError("no CanvasApi.CourseId for the course")
+        headers = _bearer(self.token_env)
+        export = await client.json("POST", f"{self.base_url}/courses/{course_id}/gradebook_csv", headers, {})
+        deadline = time.monotonic() + EXPORT_TIMEOUT_SECONDS
+        while True:
+            progress = await client.json("GET", f"{self.base_url}/api/v1/progress/{export['progress_id']}", headers)
+            state = progress.get("workflow_state")
+            if state == "completed":
+                break
+            if state == "failed":
+                raise IngestError(f"gradebook export failed: {progress.get('message')}")
+            if time.monotonic() > deadline:
+                raise IngestError(f"gradebook export still {state} after {EXPORT_TIMEOUT_SECONDS}s")
+            await asyncio.sleep(POLL_SECONDS)
+        attachment = await client.json("GET", f"{self.base_url}/api/v1/files/{export['attachment_id']}", headers)
+        await client.download(attachment["url"], destination, headers)
+        return f"{self.base_url}/courses/{course_id}/gradebook_csv"
+
+
+SOURCES = {"directory": DirectorySource, "http": HttpSource, "canvas": CanvasExportSource}
+
+
+def build_source(settings, config):
+    """A source object for one "Ingest" entry"""
+    kind = settings.get("Source")
+    if kind not in SOURCES:
+        raise IngestError(f"unknown source {kind!r}; use one of {', '.join(SOURCES)}")
+    if kind == "canvas":
+        settings = {**(config.get("CanvasApi") or {}), **settings}
+    return SOURCES[kind](settings)
+
+
+async def fetch_export(client, source, course_config, kind, data_dir, timestamp):
+    """Fetch one export into data/; returns a result dict (status fetched, unchanged, skipped or failed)"""
+    pattern = course_config[KINDS[kind]]
+    result = {"course": course_name(course_config), "kind": kind, "path": None, "bytes": 0, "origin": ""}
+    temp_path = os.path.join(data_dir, f".{pattern}.{os.getpid()}.download")
+    start = time.perf_counter()
+    try:
+        result["origin"] = await source.fetch(client, course_config, pattern, temp_path)
+        result["bytes"] = os.path.getsize(temp_path)
+        latest = latest_snapshots(data_dir, pattern)
+        path = os.path.join(data_dir, f"{timestamp}_{pattern}.csv")
+        if latest and filecmp.cmp(latest[0], temp_path, shallow=False):
+            os.remove(temp_path)
+            result.update(status="unchanged", path=latest[0])
+        elif os.path.exists(path):
+            # Snapshot names have minute resolution; never replace one fetched earlier this minute
+            os.remove(temp_path)
+            result.update(status="skipped", path=path,
+                          error=f"{os.path.basename(path)} already exists; fetch again in a minute")
+        else:
+            os.replace(temp_path, path)
+            result.update(status="fetched", path=path)
+    except (HttpError, IngestError, OSError, KeyError, ValueError) as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        result.update(status="failed", error=str(e))
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+async def fetch_all(config, data_dir, courses=None, kinds=tuple(KINDS)):
+    """Fetch the exports of every course (or those named in courses) concurrently"""
+    ingest = config.get("Ingest") or {}
+    sources = {}
+    for kind in kinds:
+        settings = ingest.get(kind.capitalize())
+        if settings:
+            sources[kind] = build_source(settings, config)
+
+    client = AsyncHttpClient(max_connections=ingest.get("MaxConnections", MAX_CONNECTIONS),
+                             rate=ingest.get("RequestsPerSecond"))
+    timestamp = datetime.now().strftime("%Y-%m-%dT%H%M")
+    jobs = [
+        fetch_export(client, sources[kind], course_config, kind, data_dir, timestamp)
+        for course_config in course_configs(config)
+        if not courses or course_name(course_config) in courses
+        for kind in kinds if kind in sources and course_config.get(KINDS[kind])
+    ]
+    try:
+        results = await asyncio.gather(*jobs)
+    finally:
+        client.close()
+    return results, client
+
+
+def main(base_dir=PROJECT_DIR, courses=None, kinds=tuple(KINDS)):
+    """Fetch the configured exports into data/ and print what came in; returns the results"""
+    config = load_config(base_dir)
+    data_dir = os.path.join(base_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    if not config.get("Ingest"):
+        print("No \"Ingest\" sources in config.json; see grade_importer/ingest.py.")
+        return []
+
+    start = time.perf_counter()
+    try:
+        results, client = asyncio.run(fetch_all(config, data_dir, courses, kinds))
+    except IngestError as e:
+        print(f"Not fetching: {e}")
+        return []
+    wall = time.perf_counter() - start
+
+    for result in results:
+        detail = result.get("error") or os.path.basename(result["path"])
+        print(f"{result['course']:<28} {result['kind']:<9} {result['status']:<9} "
+              f"{result['bytes'] / 1024:>9.1f} KB {result['seconds']:>7.2f}s  {detail}")
+    fetched = [result["path"] for result in results if result["status"] == "fetched"]
+    if fetched:
+        record_snapshots(data_dir, *fetched)
+    slowest = max((result["seconds"] for result in results), default=0.0)
+    print(f"\nFetched {len(fetched)} new, {sum(r['status'] == 'unchanged' for r in results)} unchanged, "
+          f"{sum(r['status'] == 'skipped' for r in results)} skipped, "
+          f"{sum(r['status'] == 'failed' for r in results)} failed in {wall:.2f}s "
+          f"(slowest single export {slowest:.2f}s, {client.requests} requests over "
+          f"{client.connections} connections)")
+    return results
@@ -0,0 +1,167 @@
+"""
+Timing and throughput records for pipeline runs.
+
+The orchestrator attaches a RunRecorder to the PipelineContext and wraps each
+step in recorder.step(); inside the steps, stage(context, name) wraps the
+substages (file discovery, header cleanup, CSV parse, join, report writing).
+Each record holds wall time, CPU time, rows processed and bytes read/written.
+At the end the run is written as JSON next to the course's .out file and
+summarised as a compact console table.
+
+stage() is a no-op recorder when a step runs standalone without a context, so
+the steps can be instrumented unconditionally. The current step is tracked per
+thread, so steps the scheduler runs concurrently keep their substages apart
+(CPU time is per process, so concurrent steps' CPU figures overlap).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class StageRecord:
+    """Measurements for one step or substage"""
+
+    def __init__(self, step, stage):
+        self.step = step
+        self.stage = stage
+        self.status = "ok"
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def read_file(self, path):
+        """Count a whole input file as read"""
+        self.bytes_read += os.path.getsize(path)
+
+    def wrote_file(self, path, size_before=0):
+        """Count what was written to path (pass the size before appending)"""
+        self.bytes_written += os.path.getsize(path) - size_before
+
+    def to_dict(self):
+        return {
+            "step": self.step,
+            "stage": self.stage,
+            "status": self.status,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows": self.rows,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class RunRecorder:
+    """Collects StageRecords for one course's pipeline run"""
+
+    def __init__(self, course=None):
+        self.course = course
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current_step(self):
+        return getattr(self._local, "step", None)
+
+    @contextmanager
+    def measure(self, step, stage_name):
+        record = StageRecord(step, stage_name)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        except BaseException:
+            record.status = "failed"
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            with self._lock:
+                self.records.append(record)
+
+    @contextmanager
+    def step(self, name):
+        """Measure a whole step; substages recorded inside it are attributed to it"""
+        self._local.step = name
+        try:
+            with self.measure(name, "total") as record:
+                yield record
+                # Roll the substages' row and byte counts up into the step total
+                with self._lock:
+                    substages = [sub for sub in self.records if sub.step == name]
+                for sub in substages:
+                    record.rows = max(record.rows, sub.rows)
+                    record.bytes_read += sub.bytes_read
+                    record.bytes_written += sub.bytes_written
+        finally:
+            self._local.step = None
+
+    def stage(self, name):
+        return self.measure(self.current_step, name)
+
+    def to_dict(self, paths=None):
+        return {
+            "course": self.course,
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "files": dict(paths or {}),
+            "stages": [record.to_dict() for record in self.records],
+        }
+
+    def write_json(self, path, paths=None):
+        with open(path, "w") as json_file:
+            json.dump(self.to_dict(paths), json_file, indent=2)
+
+    def format_table(self):
+        header = f"{'Stage':<28} | {'Wall s':>8} | {'CPU s':>8} | {'Rows':>9} | {'Read KB':>9} | {'Written KB':>10}"
+        lines = [header, "-" * len(header)]
+        # Concurrent steps record their stages interleaved; list each step's stages together
+        steps = []
+        for record in self.records:
+            if record.step not in steps:
+                steps.append(record.step)
+        for record in sorted(self.records, key=lambda record: steps.index(record.step)):
+            name = f"{record.step}/{record.stage}"
+            if record.status != "ok":
+                name += " (failed)"
+            lines.append(
+                f"{name:<28} | {record.wall_seconds:>8.3f} | {record.cpu_seconds:>8.3f} | {record.rows:>9} | "
+                f"{record.bytes_read / 1024:>9.1f} | {record.bytes_written / 1024:>10.1f}"
+            )
+        return lines
+
+
+@contextmanager
+def _unrecorded(name):
+    yield StageRecord(None, name)
+
+
+def stage(context, name):
+    """Measure a substage on the context's recorder; a throwaway record when not instrumented"""
+    recorder = getattr(context, "recorder", None)
+    if recorder is None:
+        return _unrecorded(name)
+    return recorder.stage(name)
+
+
+def run_record_path(context):
+    """The JSON run record lives next to the course's -updated.out (or in data/ if none was written)"""
+    summary = context.paths.get("summary")
+    if summary:
+        return summary[: -len("-updated.out")] + "-run.json"
+    timestamp = datetime.now().strftime("%Y-%m-%dT%H%M")
+    return os.path.join(context.data_dir, f"{timestamp}_{context.config.get('CanvasCsvPattern', 'course')}-run.json")
+
+
+def write_run_record(context):
+    """Write the context's run record as JSON and return its path"""
+    path = run_record_path(context)
+    context.recorder.write_json(path, context.paths)
+    return path
@@ -0,0 +1,261 @@
+"""
+Manifest of the grade snapshots kept under data/.
+
+Every export and derived output follows the naming used throughout the repo:
+
+    <timestamp>_<Source>-<Course>[-<suffix>].<ext>
+    2025-10-20T2058_Canvas-COP4808_001_13815.csv          export
+    2025-10-20T2058_Canvas-COP4808_001_13815-updated.csv  updated
+    2025-10-20T2058_Canvas-COP4808_001_13815-updated.out  report
+    2025-10-20T2058_Canvas-COP4808_001_13815-report.json  report-json
+
+The manifest records each snapshot's name (everything between the timestamp
+and the extension), course, source, export timestamp (parsed from the
+filename), size, mtime, kind and the export it was derived from in a small
+SQLite database (data/.manifest.sqlite3). Directory mtimes are stored as well,
+so a refresh only lists directories whose contents changed and only re-stats
+the files of those directories, instead of walking and stat-ing years of
+snapshots. Files rewritten in place don't change their directory's mtime, so
+scripts that write outputs register them with record() straight away.
+
+All scripts look files up the same way - by the configured pattern, newest
+export timestamp first, ties broken by mtime - through latest_snapshots().
+Course patterns may contain '-' (Canvas-CAP-4104), so lookups match the name
+as <pattern>[-<suffix>] exactly instead of relying on how a name splits.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+
+MANIFEST_FILENAME = ".manifest.sqlite3"
+# Bumped when the schema changes; an older manifest is rebuilt from a rescan
+MANIFEST_VERSION = 2
+
+SNAPSHOT_NAME = re.compile(
+    r"(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{4})_(?P<name>(?P<source>[A-Za-z]+)-.+?)\.(?P<ext>[A-Za-z]+)$"
+)
+# A derived output's lowercase suffix (-updated, -report, -changed, -run)
+SUFFIX = re.compile(r"-(?P<suffix>[a-z]+)$")
+
+# (suffix, extension) -> kind; anything else is recorded as "<suffix>.<ext>"
+KINDS = {
+    ("", "csv"): "export",
+    ("", "xlsx"): "xlsx",
+    ("updated", "csv"): "updated",
+    ("updated", "out"): "report",
+    ("report", "json"): "report-json",
+    ("report", "csv"): "report-csv",
+    ("changed", "csv"): "changed",
+}
+KIND_PARTS = {kind: parts for parts, kind in KINDS.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    source TEXT NOT NULL,
+    course TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    exported_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    derived_from TEXT
+);
+CREATE INDEX IF NOT EXISTS snapshots_lookup ON snapshots (name, ext, exported_at);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime REAL NOT NULL
+);
+"""
+
+
+def parse_snapshot_name(filename):
+    """Split a snapshot filename into its parts; returns None for files that aren't snapshots.
+
+    The course is what follows the source once a lowercase -suffix is taken off;
+    lookups by a configured pattern use the name instead (see name_parts()).
+    """
+    match = SNAPSHOT_NAME.search(filename)
+    if not match:
+        return None
+    name = match.group("name")
+    ext = match.group("ext").lower()
+    source = match.group("source")
+    suffix_match = SUFFIX.search(name)
+    suffix = suffix_match.group("suffix") if suffix_match else ""
+    course = name[len(source) + 1:suffix_match.start() if suffix_match else len(name)]
+    if not course:
+        return None
+    return {
+        "name": name,
+        "ext": ext,
+        "pattern": f"{source}-{course}",
+        "source": source,
+        "course": course,
+        "kind": KINDS.get((suffix, ext), f"{suffix}.{ext}"),
+        "exported_at": match.group("timestamp"),
+        # The export a derived output was produced from
+        "derived_from": None if (suffix, ext) == ("", "csv") else f"{match.group('timestamp')}_{source}-{course}.csv",
+    }
+
+
+def name_parts(pattern, kind="export"):
+    """(name, ext) of the snapshots of a kind for a course pattern, e.g. ('Canvas-X-updated', 'csv')"""
+    suffix, ext = KIND_PARTS.get(kind) or kind.split(".", 1)
+    return (f"{pattern}-{suffix}" if suffix else pattern), ext
+
+
+def is_snapshot_of(filename, pattern, kind="export"):
+    """Whether a filename is a dated snapshot of a kind for a course pattern"""
+    info = parse_snapshot_name(filename)
+    return info is not None and (info["name"], info["ext"]) == name_parts(pattern, kind)
+
+
+class SnapshotManifest:
+    """SQLite-backed index of the snapshot files under one data directory"""
+
+    def __init__(self, data_dir, db_path=None):
+        self.data_dir = os.path.abspath(data_dir)
+        self.db_path = db_path or os.path.join(self.data_dir, MANIFEST_FILENAME)
+        # Batch workers share the database, so wait for locks instead of failing
+        self.db = sqlite3.connect(self.db_path, timeout=30)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != MANIFEST_VERSION:
+            with self.db:
+                self.db.execute("DROP TABLE IF EXISTS snapshots")
+                self.db.execute("DROP TABLE IF EXISTS directories")
+                self.db.execute(f"PRAGMA user_version = {MANIFEST_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def refresh(self):
+        """Bring the manifest up to date, listing only directories whose mtime changed"""
+        known = dict(self.db.execute("SELECT path, mtime FROM directories"))
+        seen = set()
+        with self.db:
+            self._refresh_directory(self.data_dir, None, known, seen)
+            for path in set(known) - seen:
+                self.db.execute("DELETE FROM directories WHERE path = ?", (path,))
+                self.db.execute("DELETE FROM snapshots WHERE directory = ?", (path,))
+
+    def _refresh_directory(self, dirpath, parent, known, seen):
+        try:
+            mtime = os.stat(dirpath).st_mtime
+        except FileNotFoundError:
+            return
+        seen.add(dirpath)
+
+        if known.get(dirpath) == mtime:
+            # Nothing was added or removed here; only the subdirectories need checking
+            subdirs = [row[0] for row in self.db.execute("SELECT path FROM directories WHERE parent = ?", (dirpath,))]
+        else:
+            subdirs = []
+            files = []
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    # Skip the manifest itself and cache/state directories
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.path)
+            # Vanished files are dropped; new files and ones replaced in place
+            # (a different size or mtime) are (re-)indexed
+            indexed = {
+                row[0]: (row[1], row[2])
+                for row in self.db.execute("SELECT path, size, mtime FROM snapshots WHERE directory = ?", (dirpath,))
+            }
+            for path in set(indexed) - set(files):
+                self.db.execute("DELETE FROM snapshots WHERE path = ?", (path,))
+            for path in files:
+                if path not in indexed:
+                    self._upsert(path)
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if (stat.st_size, stat.st_mtime) != indexed[path]:
+                    self._upsert(path)
+            self.db.execute(
+                "INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)",
+                (dirpath, parent, mtime),
+            )
+
+        for subdir in subdirs:
+            self._refresh_directory(subdir, dirpath, known, seen)
+
+    def _upsert(self, path):
+        info = parse_snapshot_name(os.path.basename(path))
+        if info is None:
+            return
+        stat = os.stat(path)
+        directory = os.path.dirname(path)
+        derived_from = os.path.join(directory, info["derived_from"]) if info["derived_from"] else None
+        self.db.execute(
+            "INSERT OR REPLACE INTO snapshots "
+            "(path, directory, name, ext, pattern, source, course, kind, exported_at, size, mtime, derived_from) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, directory, info["name"], info["ext"], info["pattern"], info["source"], info["course"],
+             info["kind"], info["exported_at"], stat.st_size, stat.st_mtime, derived_from),
+        )
+
+    def record(self, *paths):
+        """Register files that were just written (e.g. an -updated.csv) without rescanning"""
+        with self.db:
+            for path in paths:
+                if os.path.exists(path):
+                    self._upsert(os.path.abspath(path))
+
+    def latest(self, pattern, kind="export", count=1):
+        """Paths of the newest `count` snapshots of `kind` for a course pattern, newest first"""
+        rows = self.db.execute(
+            "SELECT path FROM snapshots WHERE name = ? AND ext = ? "
+            "ORDER BY exported_at DESC, mtime DESC LIMIT ?",
+            (*name_parts(pattern, kind), count),
+        )
+        return [row[0] for row in rows]
+
+    def snapshots(self, pattern, kind="export"):
+        """Every snapshot of `kind` for a course pattern as dicts, oldest first"""
+        cursor = self.db.execute(
+            "SELECT * FROM snapshots WHERE name = ? AND ext = ? ORDER BY exported_at, mtime",
+            name_parts(pattern, kind),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+# One refreshed manifest per data directory per process, shared by every step
+# SQLite connections can't be shared between threads, so each thread (e.g. the
+# scheduler's concurrent steps) keeps its own
+_local = threading.local()
+
+
+def open_manifest(data_dir):
+    """Return this thread's manifest for data_dir, refreshing it the first time it is opened"""
+    manifests = _local.__dict__.setdefault("manifests", {})
+    key = os.path.abspath(data_dir)
+    if key not in manifests:
+        manifest = SnapshotManifest(key)
+        manifest.refresh()
+        manifests[key] = manifest
+    return manifests[key]
+
+
+def latest_snapshots(data_dir, pattern, kind="export", count=1):
+    """Latest `count` snapshots of `kind` for a course pattern, newest first"""
+    return open_manifest(data_dir).latest(pattern, kind, count)
+
+
+def record_snapshots(data_dir, *paths):
+    """Register freshly written outputs in the data directory's manifest"""
+    open_manifest(data_dir).record(*paths)
@@ -0,0 +1,94 @@
+"""
+Compiled form of config.json's ColumnMapping.
+
+Every script needs the same facts about the assignment columns: the Canvas and
+Codepath names in both directions, the display name before the "(id)", the
+project label before the ":", the project number used in the submission
+summaries, and the Canvas assignment id. CompiledMapping works these out once,
+as lists indexed by assignment position, so the per-student loops only index
+into them. Header positions for an input file are resolved once per header
+row with positions().
+"""
+
+import re
+
+ASSIGNMENT_ID = re.compile(r"\((\d+)\)\s*$")
+
+
+def normalize_email(value):
+    """Normalize an email / SIS Login ID so it can be used as a join key"""
+    return (value or "").strip().lower()
+
+
+def display_name(canvas_column):
+    """'Proj-1 (2570578)' -> 'Proj-1'"""
+    return canvas_column.split("(")[0].strip()
+
+
+def project_label(canvas_column):
+    """'Project 1: Scavenger Hunt (2033669)' -> 'Project 1' (the whole name when there's no ':')"""
+    return canvas_column.split(":")[0].strip()
+
+
+def project_number(canvas_column):
+    """'Project 1: Scavenger Hunt (2033669)' -> '1'; any 'Final Project:' column -> 'Final'"""
+    name = display_name(canvas_column)
+    if "Final Project:" in name:
+        return "Final"
+    return name.split(":")[0].split()[-1]
+
+
+class CompiledMapping:
+    """ColumnMapping with every derived name precomputed, indexed by assignment position"""
+
+    def __init__(self, column_mapping):
+        assignments = column_mapping["Assignments"]
+        self.email_column = column_mapping.get("Email", "Email")
+        self.status_column = column_mapping.get("Status", "Status")
+        self.login_column = column_mapping.get("SIS Login ID", "SIS Login ID")
+
+        self.canvas_columns = list(assignments.keys())
+        self.codepath_columns = list(assignments.values())
+        self.canvas_to_codepath = dict(assignments)
+        self.codepath_to_canvas = {codepath: canvas for canvas, codepath in assignments.items()}
+
+        self.display_names = [display_name(column) for column in self.canvas_columns]
+        self.project_labels = [project_label(column) for column in self.canvas_columns]
+        self.project_numbers = [project_number(column) for column in self.canvas_columns]
+        self.assignment_ids = []
+        for column in self.canvas_columns:
+            match = ASSIGNMENT_ID.search(column)
+            self.assignment_ids.append(match.group(1) if match else None)
+
+        # Canvas column -> display name, for code that only has the column name
+        self.display_name_of = dict(zip(self.canvas_columns, self.display_names))
+        self.last_codepath_column = self.codepath_columns[-1] if self.codepath_columns else None
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.canvas_columns)
+
+    def positions(self, header, side="codepath"):
+        """Index of each assignment column in a header row (-1 when absent), cached per header"""
+        key = (side, tuple(header))
+        if key not in self._positions:
+            columns = self.codepath_columns if side == "codepath" else self.canvas_columns
+            lookup = {name: i for i, name in enumerate(header)}
+            self._positions[key] = [lookup.get(column, -1) for column in columns]
+        return self._positions[key]
+
+
+_compiled = {}
+
+
+def compile_mapping(column_mapping):
+    """Return the CompiledMapping for a ColumnMapping, building it once per process"""
+    key = (
+        tuple(column_mapping["Assignments"].items()),
+        column_mapping.get("Email"),
+        column_mapping.get("Status"),
+        column_mapping.get("SIS Login ID"),
+    )
+    if key not in _compiled:
+        _compiled[key] = CompiledMapping(column_mapping)
+    return _compiled[key]
@@ -0,0 +1,289 @@
+"""
+Local stand-in for the Canvas endpoints the push and the ingestion use, for
+trying them out, testing and benchmarking.
+
+    python3 -m grade_importer.mock_canvas --port 8765 --latency 0.02 --fail-every 10
+    python3 -m grade_importer.mock_canvas --exports-dir exports --download-seconds 1
+
+serves the endpoints grade_importer/canvas_api.py uses, keeping grades in
+memory:
+
+    POST /api/v1/courses/:course/assignments/:assignment/submissions/update_grades
+    GET  /api/v1/progress/:id
+
+and, with an exports directory, the gradebook export grade_importer/ingest.py
+uses plus the directory's files over plain HTTP:
+
+    POST /courses/:course/gradebook_csv     exports <exports dir>/gradebook-<course>.csv
+    GET  /api/v1/files/:id                  the export's attachment, with its download url
+    GET  /files/:id/download                redirects to /exports/<file name>
+    GET  /exports/<file name>               any file in the exports directory
+
+A bulk update or gradebook export answers with a queued Progress; the job
+completes (and its grades are applied) job_seconds later. A file download
+takes download_seconds, sent in chunks. latency delays every answer,
+fail_every answers every Nth request with a 503 (and every Nth + 1 with a
+429 and Retry-After) to exercise the client's retries, and any bearer token
+is accepted unless token is set. Connections are kept alive; the server
+counts the connections it accepted so a test can check the client pooled them.
+
+start_mock_canvas() runs one on a background thread and returns it; its url
+is the base URL to give the client.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPDATE_GRADES = re.compile(r"^/api/v1/courses/([^/]+)/assignments/([^/]+)/submissions/update_grades$")
+PROGRESS = re.compile(r"^/api/v1/progress/(\d+)$")
+GRADE_FIELD = re.compile(r"^grade_data\[([^\]]+)\]\[posted_grade\]$")
+GRADEBOOK_CSV = re.compile(r"^/courses/([^/]+)/gradebook_csv$")
+FILE = re.compile(r"^/api/v1/files/(\d+)$")
+FILE_DOWNLOAD = re.compile(r"^/files/(\d+)/download$")
+EXPORT = re.compile(r"^/exports/([^/]+)$")
+CHUNK_SIZE = 16 * 1024
+
+
+class MockCanvasServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, token=None, latency=0.0, job_seconds=0.05, fail_every=0,
+                 exports_dir=None, download_seconds=0.0):
+        super().__init__(address, MockCanvasHandler)
+        self.token = token
+        self.latency = latency
+        self.job_seconds = job_seconds
+        self.fail_every = fail_every
+        self.exports_dir = exports_dir
+        self.download_seconds = download_seconds
+        # attachment id -> file name in exports_dir
+        self.attachments = {}
+        # (course, assignment, user) -> grade, once the job that set it completed
+        self.grades = {}
+        # progress id -> [progress dict, created at, (course, assignment, grades)]
+        self.jobs = {}
+        self.requests = 0
+        self.connections = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get_request(self):
+        request = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return request
+
+    def next_request(self):
+        """Count a request; returns the status to fail it with, or None"""
+        with self._lock:
+            self.requests += 1
+            number = self.requests
+        if self.fail_every:
+            if number % self.fail_every == 0:
+                return 503
+            if number % self.fail_every == 1 and number > 1:
+                return 429
+        return None
+
+    def start_job(self, course_id, assignment_id, grades, tag="submissions_update"):
+        with self._lock:
+            progress_id = next(self._ids)
+            progress = {"id": progress_id, "workflow_state": "queued", "completion": 0,
+                        "tag": tag, "message": None,
+                        "url": f"{self.url}/api/v1/progress/{progress_id}"}
+            self.jobs[progress_id] = [progress, time.monotonic(), (course_id, assignment_id, grades)]
+            return dict(progress)
+
+    def start_export(self, course_id):
+        """Start a gradebook export; returns (progress, attachment id) or None when the course has no export"""
+        filename = f"gradebook-{course_id}.csv"
+        if not self.exports_dir or not os.path.isfile(os.path.join(self.exports_dir, filename)):
+            return None
+        progress = self.start_job(course_id, None, {}, tag="gradebook_to_csv")
+        with self._lock:
+            attachment_id = next(self._ids)
+            self.attachments[attachment_id] = filename
+        return progress, attachment_id
+
+    def export_path(self, filename):
+        """Path of a file in exports_dir, or None"""
+        if not self.exports_dir or os.path.basename(filename) != filename:
+            return None
+        path = os.path.join(self.exports_dir, filename)
+        return path if os.path.isfile(path) else None
+
+    def job_progress(self, progress_id):
+        with self._lock:
+            job = self.jobs.get(progress_id)
+            if job is None:
+                return None
+            progress, created, (course_id, assignment_id, grades) = job
+            if progress["workflow_state"] != "completed":
+                if time.monotonic() - created >= self.job_seconds:
+                    for user_id, grade in grades.items():
+                        self.grades[(course_id, assignment_id, user_id)] = grade
+                    progress.update(workflow_state="completed", completion=100,
+                                    message=f"{len(grades)} submissions updated" if grades else None)
+                else:
+                    progress.update(workflow_state="running", completion=50)
+            return dict(progress)
+
+
+class MockCanvasHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like Canvas
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, status, data, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check(self):
+        """Common request handling; returns False when an error answer was sent"""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.token and self.headers.get("Authorization") != f"Bearer {server.token}":
+            self._answer(401, {"errors": [{"message": "Invalid access token."}]})
+            return False
+        failure = server.next_request()
+        if failure == 429:
+            self._answer(429, {"errors": [{"message": "Rate limit exceeded"}]}, {"Retry-After": "0.05"})
+            return False
+        if failure:
+            self._answer(failure, {"errors": [{"message": "Service unavailable"}]})
+            return False
+        return True
+
+    def _send_file(self, path):
+        """Stream a file in chunks spread over the server's download_seconds"""
+        size = os.path.getsize(path)
+        chunks = max(1, -(-size // CHUNK_SIZE))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        with open(path, "rb") as export_file:
+            while True:
+                data = export_file.read(CHUNK_SIZE)
+                if not data:
+                    break
+                if self.server.download_seconds:
+                    time.sleep(self.server.download_seconds / chunks)
+                self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode()
+        if not self._check():
+            return
+        path = urllib.parse.urlsplit(self.path).path
+        match = GRADEBOOK_CSV.match(path)
+        if match:
+            export = self.server.start_export(match.group(1))
+            if export is None:
+                self._answer(404, {"errors": [{"message": "The specified resource does not exist."}]})
+                return
+            progress, attachment_id = export
+            self._answer(200, {"progress_id": progress["id"], "attachment_id": attachment_id,
+                               "filename": self.server.attachments[attachment_id]})
+            return
+        match = UPDATE_GRADES.match(path)
+        if not match:
+            self._answer(404, {"errors": [{"message": "The specified resource does not exist."}]})
+            return
+        grades = {}
+        for field, values in urllib.parse.parse_qs(body, keep_blank_values=True).items():
+            grade_match = GRADE_FIELD.match(field)
+            if grade_match:
+                grades[grade_match.group(1)] = values[-1]
+        if not grades:
+            self._answer(400, {"errors": [{"message": "grade_data is required"}]})
+            return
+        self._answer(200, self.server.start_job(match.group(1), match.group(2), grades))
+
+    def do_GET(self):
+        if not self._check():
+            return
+        path = urllib.parse.urlsplit(self.path).path
+        server = self.server
+        match = FILE.match(path)
+        if match and int(match.group(1)) in server.attachments:
+            attachment_id = int(match.group(1))
+            filename = server.attachments[attachment_id]
+            self._answer(200, {"id": attachment_id, "display_name": filename, "filename": filename,
+                               "content-type": "text/csv",
+                               "url": f"{server.url}/files/{attachment_id}/download"})
+            return
+        match = FILE_DOWNLOAD.match(path)
+        if match and int(match.group(1)) in server.attachments:
+            # Canvas hands file downloads off to its file storage
+            self._answer(302, {}, {"Location": f"/exports/{server.attachments[int(match.group(1))]}"})
+            return
+        match = EXPORT.match(path)
+        if match:
+            export_path = server.export_path(urllib.parse.unquote(match.group(1)))
+            if export_path is None:
+                self._answer(404, {"errors": [{"message": "The specified resource does not exist."}]})
+                return
+            self._send_file(export_path)
+            return
+        match = PROGRESS.match(path)
+        progress = self.server.job_progress(int(match.group(1))) if match else None
+        if progress is None:
+            self._answer(404, {"errors": [{"message": "The specified resource does not exist."}]})
+            return
+        self._answer(200, progress)
+
+
+def start_mock_canvas(port=0, **options):
+    """A MockCanvasServer serving on a background thread (port 0 picks a free port)"""
+    server = MockCanvasServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Canvas endpoints the push and fetch use")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token", help="only accept this bearer token (default: any)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay every answer")
+    parser.add_argument("--job-seconds", type=float, default=0.05, help="seconds until a bulk update completes")
+    parser.add_argument("--fail-every", type=int, default=0, help="fail every Nth request with a 503")
+    parser.add_argument("--exports-dir", help="directory of exports to serve (gradebook-<course>.csv and any file)")
+    parser.add_argument("--download-seconds", type=float, default=0.0, help="seconds a file download takes")
+    args = parser.parse_args()
+    server = MockCanvasServer(("127.0.0.1", args.port), token=args.token, latency=args.latency,
+                              job_seconds=args.job_seconds, fail_every=args.fail_every,
+                              exports_dir=args.exports_dir, download_seconds=args.download_seconds)
+    print(f"Mock Canvas API on {server.url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
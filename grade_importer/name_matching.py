@@ -0,0 +1,172 @@
+"""
+Fuzzy matching of student names between two lists (e.g. the CodePath
+completers file against the course roster).
+
+Names are normalized before comparing: case, accents and punctuation are
+dropped and the tokens are sorted, so "José  García-López", "GARCIA LOPEZ,
+Jose" and "jose garcia lopez" all compare equal. Instead of scoring every
+pair of names, the roster is indexed under a few blocking keys and a name is
+only scored against the roster names that share one of its keys:
+
+    tokens    - all tokens, sorted ("garcia jose lopez")
+    pair      - every pair of tokens, sorted ("garcia jose", "garcia lopez",
+                "jose lopez"), so a missing middle name or second surname on
+                either side still shares a block
+    phonetic  - Soundex of the first and last token, sorted (catches typos
+                and transliterations such as "Jon"/"John")
+
+Blocks holding more than MAX_BLOCK names (a very common first and last name
+pair, say) are too unselective to be worth scoring and are skipped, unless it
+is the exact tokens block.
+
+A candidate's confidence (0-1) is the average, over the tokens of the shorter
+name, of each token's character-level similarity to its closest token in the
+other name, less 5% when the token counts differ. When both sides have an
+email address, an email match wins outright with confidence 1.0.
+"""
+
+import difflib
+import re
+import unicodedata
+
+MIN_CONFIDENCE = 0.85
+MAX_BLOCK = 1000
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def name_tokens(name):
+    """Lower-case, accent-free tokens of a name, punctuation removed ('García-López, José' -> garcia lopez jose)"""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _PUNCTUATION.sub(" ", plain.casefold()).split()
+
+
+def normalize_name(name):
+    """The tokens of a name in sorted order, as one string"""
+    return " ".join(sorted(name_tokens(name)))
+
+
+def soundex(token):
+    """American Soundex code of one token ('robert' -> 'r163')"""
+    if not token:
+        return ""
+    code = token[0]
+    previous = _SOUNDEX_CODES.get(token[0], "")
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code; vowels do
+        if char not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(tokens):
+    """The keys a tokenized name is indexed under"""
+    if not tokens:
+        return []
+    ordered = sorted(set(tokens))
+    keys = ["tokens:" + " ".join(sorted(tokens))]
+    keys.extend(
+        f"pair:{first} {second}" for i, first in enumerate(ordered) for second in ordered[i + 1:]
+    )
+    keys.append("phonetic:" + " ".join(sorted((soundex(tokens[0]), soundex(tokens[-1])))))
+    return keys
+
+
+def token_similarity(a, b):
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def name_similarity(a, b):
+    """Confidence (0-1) that two normalized names are the same person"""
+    if a == b:
+        return 1.0
+    shorter, longer = sorted((a.split(), b.split()), key=len)
+    if not shorter:
+        return 0.0
+    if len(shorter) != len(longer) and len(shorter) < 2:
+        # A lone first or last name isn't enough to go on
+        return 0.0
+    # Each token of the shorter name against its closest token in the longer one
+    score = sum(max(token_similarity(token, other) for other in longer) for token in shorter) / len(shorter)
+    # A missing middle name or second surname costs a little confidence
+    if len(shorter) != len(longer):
+        score *= 0.95
+    return score
+
+
+class NameMatch:
+    """The roster entry a name matched, how confident the match is and how it was made"""
+
+    def __init__(self, key, confidence, method):
+        self.key = key
+        self.confidence = confidence
+        # "email", "exact" (same normalized name) or "fuzzy"
+        self.method = method
+
+
+class NameIndex:
+    """Roster names (and optional emails) indexed by blocking key"""
+
+    def __init__(self, names, emails=None):
+        """names: roster keys (usually full names); emails: optional {key: email}"""
+        self.normalized = {}
+        self.by_normalized = {}
+        self.blocks = {}
+        self.by_email = {}
+        for key in names:
+            tokens = name_tokens(key)
+            self.normalized[key] = " ".join(sorted(tokens))
+            self.by_normalized.setdefault(self.normalized[key], key)
+            for block in blocking_keys(tokens):
+                self.blocks.setdefault(block, []).append(key)
+        for key, email in (emails or {}).items():
+            email = (email or "").strip().lower()
+            if email:
+                self.by_email.setdefault(email, key)
+
+    def candidates(self, tokens):
+        """Roster keys sharing a blocking key with the tokenized name, in index order"""
+        seen = {}
+        for block in blocking_keys(tokens):
+            keys = self.blocks.get(block, ())
+            if len(keys) > MAX_BLOCK and not block.startswith("tokens:"):
+                continue
+            for key in keys:
+                seen[key] = None
+        return list(seen)
+
+    def match(self, name, email=None, min_confidence=MIN_CONFIDENCE):
+        """Best NameMatch for a name (email first when given), or None below min_confidence"""
+        email = (email or "").strip().lower()
+        if email and email in self.by_email:
+            return NameMatch(self.by_email[email], 1.0, "email")
+
+        tokens = name_tokens(name)
+        normalized = " ".join(sorted(tokens))
+        if normalized and normalized in self.by_normalized:
+            return NameMatch(self.by_normalized[normalized], 1.0, "exact")
+
+        best = None
+        for key in self.candidates(tokens):
+            confidence = name_similarity(normalized, self.normalized[key])
+            if best is None or confidence > best.confidence:
+                best = NameMatch(key, confidence, "fuzzy")
+        if best is None or best.confidence < min_confidence:
+            return None
+        return best
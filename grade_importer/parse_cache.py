@@ -0,0 +1,208 @@
+"""
+Binary cache of parsed CSV snapshots under data/.cache/parsed/.
+
+Snapshots never change once exported, yet the same files are parsed again by
+every step, every re-run and every history rebuild. The cache stores two
+parsed forms:
+
+    grade matrices - the column-projected form used by the comparison and the
+                     history (students, columns and one float64 column each)
+    rows           - every cell of a CSV as lists of strings plus its header,
+                     for callers that need whole rows (loaded as a records.Snapshot)
+
+An entry is keyed by the file's content hash (blake2b) plus the projection
+(columns and key column), so identical copies of a file share entries. The
+path -> (size, mtime, hash) index means a file is only re-hashed when its
+size or mtime changed. Entries are marshal-encoded with the float columns as
+raw bytes: a cached grade matrix loads several times faster than parsing the
+CSV, and cached rows load faster than csv.reader.
+
+The directory is capped at MAX_CACHE_BYTES; entries are touched when used and
+the least recently used are evicted when a new entry pushes it over the cap.
+An entry larger than the cap on its own is not cached, and index entries for
+files that no longer exist are dropped whenever the index is saved.
+"""
+
+import csv
+import hashlib
+import marshal
+import os
+import sys
+import threading
+from array import array
+
+from grade_importer.grade_matrix import GradeMatrix
+from grade_importer.records import Snapshot
+
+# Bump when the entry layout changes; marshal's own format is part of the key too
+CACHE_VERSION = 3
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+INDEX_FILENAME = "index.marshal"
+
+
+def parse_cache_dir(data_dir):
+    return os.path.join(data_dir, ".cache", "parsed")
+
+
+def content_hash(path):
+    """blake2b of a file's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as snapshot_file:
+        for chunk in iter(lambda: snapshot_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_rows(path):
+    """(header, remaining rows) of a CSV as lists of strings.
+
+    The cells are interned: a grade column holds a handful of distinct strings,
+    and marshal writes an interned string once per entry and refers back to it,
+    so cached rows load with one copy of each value.
+    """
+    with open(path, "r", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        return next(reader, []), [list(map(sys.intern, row)) for row in reader]
+
+
+class ParseCache:
+    """Parsed snapshots for one data directory, keyed by content hash and projection"""
+
+    def __init__(self, cache_dir, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self.index = {}
+        try:
+            with open(self.index_path, "rb") as index_file:
+                index = marshal.loads(index_file.read())
+            if isinstance(index, dict):
+                self.index = index
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    def digest(self, path):
+        """The content hash of path, re-hashing only when its size or mtime changed"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self.index.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = content_hash(path)
+        with self._lock:
+            self.index[path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._save_index()
+        return digest
+
+    def _save_index(self):
+        # Drop the files that have since been deleted or moved
+        self.index = {path: known for path, known in self.index.items() if os.path.exists(path)}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as index_file:
+            marshal.dump(self.index, index_file)
+        os.replace(temp_path, self.index_path)
+
+    def _entry_path(self, kind, digest, projection):
+        key = repr((CACHE_VERSION, marshal.version, kind, digest, projection)).encode()
+        return os.path.join(self.cache_dir, hashlib.blake2b(key, digest_size=16).hexdigest() + ".bin")
+
+    def _read(self, entry_path):
+        try:
+            # One read and loads(); marshal.load() on a file object is several times slower
+            with open(entry_path, "rb") as entry_file:
+                value = marshal.loads(entry_file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        # Mark as recently used for the LRU eviction
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return value
+
+    def _write(self, entry_path, value):
+        data = marshal.dumps(value)
+        # An entry over the cap would be evicted at once, and written again on every run
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as entry_file:
+            entry_file.write(data)
+        os.replace(temp_path, entry_path)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        with os.scandir(self.cache_dir) as listing:
+            for entry in listing:
+                if entry.name.endswith(".bin"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def grade_matrix(self, path, columns, key_column="Student"):
+        """GradeMatrix.from_csv(path, columns, key_column), from the cache when possible"""
+        entry_path = self._entry_path("matrix", self.digest(path), (tuple(columns), key_column))
+        cached = self._read(entry_path)
+        if cached is not None:
+            students, present, blobs = cached
+            data = []
+            for blob in blobs:
+                values = array("d")
+                values.frombytes(blob)
+                data.append(values)
+            return GradeMatrix(students, present, data)
+
+        matrix = GradeMatrix.from_csv(path, columns, key_column)
+        self._write(entry_path, (matrix.students, matrix.columns, [values.tobytes() for values in matrix.data]))
+        return matrix
+
+    def rows(self, path):
+        """(fieldnames, rows as lists of strings) of a CSV, from the cache when possible"""
+        entry_path = self._entry_path("rows", self.digest(path), ())
+        cached = self._read(entry_path)
+        if cached is not None:
+            return cached
+
+        fieldnames, rows = read_rows(path)
+        self._write(entry_path, (fieldnames, rows))
+        return fieldnames, rows
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def open_parse_cache(data_dir):
+    """This process's parse cache for data_dir"""
+    cache_dir = parse_cache_dir(os.path.abspath(data_dir))
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = ParseCache(cache_dir)
+        return _caches[cache_dir]
+
+
+def load_grade_matrix(path, columns, data_dir=None, key_column="Student"):
+    """A snapshot's grade matrix, through data_dir's parse cache when data_dir is given"""
+    if data_dir is None:
+        return GradeMatrix.from_csv(path, columns, key_column)
+    return open_parse_cache(data_dir).grade_matrix(path, columns, key_column)
+
+
+def load_snapshot(path, data_dir=None, **columns):
+    """A CSV as a records.Snapshot, through data_dir's parse cache when data_dir is given"""
+    header, rows = open_parse_cache(data_dir).rows(path) if data_dir is not None else read_rows(path)
+    return Snapshot.from_rows(header, rows, **columns)
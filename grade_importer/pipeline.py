@@ -0,0 +1,97 @@
+"""
+Grade processing pipeline (grade-importer run, or 0-updater.py).
+
+Runs all the grade processing steps in dependency order:
+1. Update Canvas grades from Codepath data
+2. Compare grades between Canvas files
+3. Find unsubmitted assignments
+4. Check CodePath completers (when data/CodePath_Completers_with_Selections.csv exists)
+5. Push the changed grades to Canvas (with push=True; see grade_importer/push.py)
+
+Steps 2-5 only need step 1's outputs, so they run side by side once it is done.
+
+The steps and their inputs/outputs are declared in grade_importer/scheduler.py.
+
+With batch=True (or when config.json lists "Courses"), the pipeline runs for
+every course in parallel worker processes; see grade_importer/batch.py.
+With fetch=True the exports are downloaded first; see grade_importer/ingest.py.
+With watch=True it keeps running and re-runs the affected steps whenever a new
+export lands in data/; see grade_importer/watch.py.
+"""
+
+import sys
+from datetime import datetime
+
+from grade_importer.context import PROJECT_DIR, PipelineContext, load_config
+from grade_importer.instrumentation import RunRecorder, write_run_record
+from grade_importer.scheduler import PIPELINE_STEPS, run_steps
+
+
+def print_section_header(title):
+    """Print a formatted section header"""
+    print("\n" + "=" * 70)
+    print(f" {title}")
+    print("=" * 70 + "\n")
+
+
+def main(base_dir=PROJECT_DIR, batch=False, workers=None, incremental=False, sequential=False,
+         watch=False, poll=False, push=False, fetch=False):
+    """Run all grade processing steps in dependency order"""
+    config = load_config(base_dir)
+
+    start_time = datetime.now()
+    print_section_header("GRADE PROCESSING PIPELINE STARTED")
+    print(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    options = {"incremental": incremental, "sequential": sequential, "push": push}
+
+    if fetch:
+        from grade_importer import ingest
+        print_section_header("Fetching Exports")
+        ingest.main(base_dir)
+
+    if watch:
+        if "Courses" in config:
+            print("Watch mode runs a single course; remove \"Courses\" from config.json or use --batch")
+            sys.exit(1)
+        from grade_importer.watch import watch as watch_data
+        watch_data(base_dir, options, polling=poll)
+        return
+
+    from grade_importer.batch import course_configs, run_batch
+    if batch or "Courses" in config:
+        run_batch(config, base_dir, workers, options)
+        duration = datetime.now() - start_time
+        print_section_header("BATCH PROCESSING COMPLETED")
+        print(f"Duration:    {duration.total_seconds():.2f} seconds")
+        print("=" * 70 + "\n")
+        return
+
+    # Config, chosen files and parsed tables are shared by all steps
+    context = PipelineContext(base_dir, config=course_configs(config)[0], options=options)
+    # Every step and substage is timed; see grade_importer/instrumentation.py
+    context.recorder = RunRecorder(context.config["CanvasCsvPattern"])
+
+    # Independent steps run concurrently; report sections are written in step order
+    results = run_steps(context, PIPELINE_STEPS)
+    required = {step.name for step in PIPELINE_STEPS if step.required}
+    if any(result["status"] == "failed" and result["step"] in required for result in results):
+        print("\nStopping pipeline due to error.")
+        write_run_record(context)
+        sys.exit(1)
+    if any(result["status"] != "ok" for result in results):
+        print("\nPipeline completed with errors.")
+
+    # Summary
+    end_time = datetime.now()
+    duration = end_time - start_time
+    print_section_header("GRADE PROCESSING PIPELINE COMPLETED")
+    print(f"Started at:  {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Finished at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Duration:    {duration.total_seconds():.2f} seconds")
+    print()
+    for line in context.recorder.format_table():
+        print(line)
+    print(f"\nRun record written to {write_run_record(context)}")
+    print("\nAll processing complete! Check the data/ directory for output files.")
+    print("=" * 70 + "\n")
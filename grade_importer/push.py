@@ -0,0 +1,190 @@
+"""
+Push mode: send the grades step 1 changed straight to Canvas instead of
+uploading the -updated.csv by hand (grade-importer push, or run --push).
+
+The grades to send are the cells of the -updated.csv that differ from the
+Canvas export it was made from: per assignment, the Canvas user id (the
+export's ID column) and the new grade. Values that are equal as numbers
+("8" and "8.0") are not sent, and neither are blank grades - a push never
+clears a grade in Canvas.
+
+Each assignment's changes go out in batches of BatchSize students through the
+submissions bulk-update endpoint (grade_importer/canvas_api.py), at most
+Workers batches at a time over pooled connections, and every batch's job is
+polled until Canvas reports it completed or failed. Settings live under
+"CanvasApi" in config.json; the access token comes from the environment:
+
+    "CanvasApi": {
+        "BaseUrl": "https://fau.instructure.com",
+        "CourseId": "123456",
+        "TokenEnv": "CANVAS_API_TOKEN",
+        "BatchSize": 100,
+        "Workers": 4
+    }
+
+python3 -m grade_importer.mock_canvas serves a local stand-in to try it against.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from grade_importer.canvas_api import POLL_SECONDS, CanvasClient, CanvasError
+from grade_importer.context import PROJECT_DIR, load_config
+from grade_importer.grade_values import normalize_value
+from grade_importer.instrumentation import stage
+from grade_importer.manifest import latest_snapshots, record_snapshots
+from grade_importer.mapping import compile_mapping
+from grade_importer.parse_cache import load_snapshot
+from grade_importer.report import Section, publish_section
+
+BATCH_SIZE = 100
+WORKERS = 4
+TOKEN_ENV = "CANVAS_API_TOKEN"
+USER_ID_COLUMN = "ID"
+
+
+def same_grade(old, new):
+    """Whether two grade cells hold the same grade ('8' and '8.0' do)"""
+    old_value, _, old_text = normalize_value(old)
+    new_value, _, new_text = normalize_value(new)
+    if old_value == old_value and new_value == new_value:
+        return abs(old_value - new_value) < 1e-9
+    return old_text == new_text
+
+
+def changed_grades(canvas_rows, updated_rows, mapping):
+    """{assignment id: {Canvas user id: new grade}} for the cells the update changed (rows are records or dicts)"""
+    login_column = mapping.login_column
+    original = {}
+    for row in canvas_rows:
+        login = (row.get(login_column) or "").strip().lower()
+        if login and login not in original:
+            original[login] = row
+
+    columns = [(column, assignment_id)
+               for column, assignment_id in zip(mapping.canvas_columns, mapping.assignment_ids)
+               if assignment_id is not None]
+    changes = {}
+    for row in updated_rows:
+        user_id = (row.get(USER_ID_COLUMN) or "").strip()
+        before = original.get((row.get(login_column) or "").strip().lower())
+        if not user_id or before is None:
+            continue
+        for column, assignment_id in columns:
+            grade = (row.get(column) or "").strip()
+            if grade and not same_grade(before.get(column), grade):
+                changes.setdefault(assignment_id, {})[user_id] = grade
+    return changes
+
+
+def batches(changes, batch_size=BATCH_SIZE):
+    """[(assignment id, {user id: grade})] with at most batch_size students each"""
+    result = []
+    for assignment_id, grades in changes.items():
+        items = list(grades.items())
+        for start in range(0, len(items), batch_size):
+            result.append((assignment_id, dict(items[start:start + batch_size])))
+    return result
+
+
+def push_batch(client, course_id, assignment_id, grades, poll_interval):
+    """Send one batch and wait for its job; returns (assignment id, students, final state, message)"""
+    try:
+        progress = client.update_grades(course_id, assignment_id, grades)
+        progress = client.wait_for(progress, poll_interval)
+        return assignment_id, len(grades), progress.get("workflow_state"), progress.get("message") or ""
+    except CanvasError as e:
+        return assignment_id, len(grades), "error", str(e)
+
+
+def push_grades(client, course_id, changes, batch_size=BATCH_SIZE, workers=WORKERS, poll_interval=POLL_SECONDS):
+    """Push every change in batches, workers at a time; returns one push_batch() result per batch"""
+    work = batches(changes, batch_size)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(push_batch, client, course_id, assignment_id, grades, poll_interval)
+                   for assignment_id, grades in work]
+        return [future.result() for future in futures]
+
+
+def open_client(api_config):
+    """A CanvasClient for config.json's CanvasApi settings; raises ValueError when they are incomplete"""
+    token_env = api_config.get("TokenEnv", TOKEN_ENV)
+    token = os.environ.get(token_env)
+    if not api_config.get("BaseUrl") or not api_config.get("CourseId"):
+        raise ValueError("CanvasApi needs BaseUrl and CourseId in config.json")
+    if not token:
+        raise ValueError(f"Set the Canvas access token in the {token_env} environment variable")
+    return CanvasClient(api_config["BaseUrl"], token, max_connections=api_config.get("Workers", WORKERS))
+
+
+def main(context=None, dry_run=False):
+    """Push the grades the latest update changed; uses step 1's tables when given a PipelineContext"""
+    config = context.config if context is not None else load_config()
+    data_dir = context.data_dir if context is not None else os.path.join(PROJECT_DIR, "data")
+    mapping = compile_mapping(config["ColumnMapping"])
+
+    if context is not None and "updated_rows" in context.tables:
+        canvas_file = context.paths["canvas"]
+        canvas_rows = context.tables["canvas_rows"]
+        updated_rows = context.tables["updated_rows"]
+    else:
+        exports = latest_snapshots(data_dir, config["CanvasCsvPattern"], "export")
+        if not exports or not os.path.exists(exports[0].replace(".csv", "-updated.csv")):
+            print("No updated Canvas export to push; run the update first.")
+            return
+        canvas_file = exports[0]
+        with stage(context, "parse") as record:
+            canvas_rows = load_snapshot(canvas_file, data_dir)
+            updated_rows = load_snapshot(canvas_file.replace(".csv", "-updated.csv"), data_dir)
+            record.rows = len(canvas_rows) + len(updated_rows)
+
+    with stage(context, "diff") as record:
+        changes = changed_grades(canvas_rows, updated_rows, mapping)
+        record.rows = len(updated_rows)
+    total = sum(len(grades) for grades in changes.values())
+    print(f"Grades changed since {os.path.basename(canvas_file)}: {total} across {len(changes)} assignment(s)")
+    if not total:
+        return
+    if dry_run:
+        for assignment_id, grades in changes.items():
+            print(f"  assignment {assignment_id}: {len(grades)} student(s)")
+        print("Dry run; nothing was sent.")
+        return
+
+    api_config = config.get("CanvasApi") or {}
+    try:
+        client = open_client(api_config)
+    except ValueError as e:
+        print(f"Not pushing: {e}")
+        return
+
+    start = time.perf_counter()
+    with stage(context, "push") as record:
+        try:
+            results = push_grades(client, api_config["CourseId"], changes,
+                                  api_config.get("BatchSize", BATCH_SIZE), api_config.get("Workers", WORKERS))
+        finally:
+            client.close()
+        record.rows = total
+    seconds = time.perf_counter() - start
+
+    section = Section("push", "CANVAS GRADE PUSH")
+    failed = [result for result in results if result[2] != "completed"]
+    pushed = sum(students for _, students, state, _ in results if state == "completed")
+    section.echo(f"Pushed {pushed} of {total} grades in {len(results)} batch(es) and "
+                 f"{client.requests} request(s) in {seconds:.2f}s")
+    for assignment_id, students, state, message in failed:
+        section.echo(f"  assignment {assignment_id}: {students} student(s) {state}: {message}")
+    section.fields.update({"course_id": api_config["CourseId"], "canvas_file": canvas_file,
+                           "grades": total, "pushed": pushed, "seconds": round(seconds, 3)})
+    section.add_table("batches", ["assignment_id", "students", "state", "message"], results)
+
+    out_path = canvas_file.replace(".csv", "-updated.out")
+    if context is not None and "summary" in context.paths:
+        out_path = context.paths["summary"]
+    written = publish_section(context, out_path, section)
+    if written:
+        record_snapshots(data_dir, *written)
+    if failed:
+        raise CanvasError(f"{len(failed)} batch(es) did not complete")
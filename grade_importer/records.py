@@ -0,0 +1,197 @@
+"""
+Compact in-memory form of a CSV export (a Canvas gradebook or a Codepath roster).
+
+csv.DictReader keeps each row as a dict holding every column of a wide
+gradebook, with the same key strings hashed and stored again for every
+student, and the updater used to copy each dict once more for its output. A
+Snapshot keeps instead:
+
+  - the header and the column -> position map once;
+  - each row's cells as one list of interned strings, so the columns no step
+    touches are kept as they were read, without a per-row dict. Grade, score
+    and section columns only hold a handful of distinct strings, so interning
+    leaves one copy of each instead of one per student;
+  - one StudentRecord per row, with __slots__ and the identity fields (name,
+    login, section, status). record.get(column) and record[column] read the
+    row's cell, so code written for dict rows reads records unchanged;
+  - the assignment columns normalized on first use into one GradeColumn each
+    (an array('d') of scores plus a status byte per cell, see
+    grade_importer/grade_values.py) indexed by record position and shared by
+    every step that reads the snapshot.
+
+Snapshot.chunks() appends rows as they are read and hands them out a block at
+a time, either keeping them or dropping each block once it has been used.
+"""
+
+import math
+import sys
+from itertools import repeat
+from operator import itemgetter
+
+from grade_importer.grade_values import normalize_column
+
+
+class StudentRecord:
+    """One row of a Snapshot: identity fields plus dict-style access to the row's cells"""
+
+    __slots__ = ("snapshot", "position", "name", "login", "section", "status")
+
+    def __init__(self, snapshot, position, name, login, section, status):
+        self.snapshot = snapshot
+        self.position = position
+        self.name = name
+        self.login = login
+        self.section = section
+        self.status = status
+
+    def get(self, column, default=None):
+        index = self.snapshot.positions.get(column)
+        return default if index is None else self.snapshot.rows[self.position][index]
+
+    def __getitem__(self, column):
+        return self.snapshot.rows[self.position][self.snapshot.positions[column]]
+
+    def __contains__(self, column):
+        return column in self.snapshot.positions
+
+    def cells(self):
+        """The row's cells in header order"""
+        return self.snapshot.rows[self.position]
+
+    def keys(self):
+        return self.snapshot.header
+
+    def values(self):
+        return self.cells()
+
+    def items(self):
+        return zip(self.snapshot.header, self.cells())
+
+    def grade(self, column):
+        """The normalized score of an assignment column (NaN when there is none)"""
+        return self.snapshot.grade_column(column).values[self.position]
+
+
+def _fit(row, width):
+    """A row's cells interned and padded or cut to the header width (short rows read as blank cells)"""
+    if len(row) == width:
+        return list(map(sys.intern, row))
+    return list(map(sys.intern, row[:width])) + [""] * (width - len(row))
+
+
+class Snapshot:
+    """The rows of one export as cell lists, with a StudentRecord per row and shared grade columns"""
+
+    def __init__(self, header, name_column="Student", login_column="SIS Login ID", section_column="Section",
+                 status_column="Status"):
+        self.header = [sys.intern(column) for column in header]
+        self.width = len(self.header)
+        # Like csv.DictReader, a repeated column name reads the last such column
+        self.positions = {column: index for index, column in enumerate(self.header)}
+        self.rows = []
+        self.records = []
+        self._identity = [
+            self.positions.get(column) for column in (name_column, login_column, section_column, status_column)
+        ]
+        self._grades = {}
+
+    @classmethod
+    def from_rows(cls, header, rows, **columns):
+        snapshot = cls(header, **columns)
+        snapshot.extend(rows)
+        return snapshot
+
+    def append(self, row):
+        """Add a csv.reader row; returns its record, or None for a blank line (skipped like DictReader does)"""
+        if not row:
+            return None
+        row = _fit(row, self.width)
+        name, login, section, status = self._identity
+        record = StudentRecord(
+            self,
+            len(self.rows),
+            row[name] if name is not None else "",
+            row[login] if login is not None else "",
+            row[section] if section is not None else "",
+            row[status] if status is not None else "",
+        )
+        self.rows.append(row)
+        self.records.append(record)
+        if self._grades:
+            self._grades.clear()
+        return record
+
+    def extend(self, rows):
+        """Add many rows at once, creating the records a column at a time"""
+        width = self.width
+        added = [_fit(row, width) for row in rows if row]
+        start = len(self.rows)
+        self.rows.extend(added)
+        identity = [map(itemgetter(index), added) if index is not None else repeat("") for index in self._identity]
+        self.records.extend(map(StudentRecord, repeat(self), range(start, len(self.rows)), *identity))
+        self._grades.clear()
+
+    def chunks(self, rows, size, keep=True):
+        """Append rows as they are read, yielding the new records size at a time.
+
+        With keep=False each chunk replaces the one before it once the consumer
+        asks for the next, so a whole export streams through in bounded memory.
+        """
+        chunk = []
+        for row in rows:
+            record = self.append(row)
+            if record is None:
+                continue
+            chunk.append(record)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+                if not keep:
+                    self.clear()
+        if chunk:
+            yield chunk
+
+    def clear(self):
+        """Drop every row (records handed out before become invalid)"""
+        self.rows = []
+        self.records = []
+        self._grades.clear()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, position):
+        return self.records[position]
+
+    def column(self, name):
+        """Every row's cell in a column ("" when the export has no such column)"""
+        index = self.positions.get(name)
+        if index is None:
+            return [""] * len(self.rows)
+        return list(map(itemgetter(index), self.rows))
+
+    def grade_column(self, name, points_possible=None, blank=math.nan):
+        """A column normalized into scores and statuses, computed once per snapshot"""
+        key = (name, points_possible, blank if blank == blank else None)
+        if key not in self._grades:
+            self._grades[key] = normalize_column(self.column(name), points_possible, blank)
+        return self._grades[key]
+
+    def points_possible(self, columns):
+        """{column: points} from the "Points Possible" row, as grade_values.points_possible()"""
+        for record in self.records:
+            if record.name.strip() == "Points Possible":
+                points = {}
+                for column in columns:
+                    value = normalize_column([record.get(column, "")]).values[0]
+                    if value > 0:
+                        points[column] = value
+                return points
+        return {}
+
+    def new_row(self, position):
+        """A copy of a row's cells to fill in and write out"""
+        return list(self.rows[position])
@@ -0,0 +1,244 @@
+"""
+Structured report of one course run, rendered once to text, JSON and CSV.
+
+Each step fills in a Section: the text lines of its part of the -updated.out
+report, scalar fields (files used, counts) and tables of records (students,
+grade changes, submission statistics). A Report holds the sections in step
+order and renders them to three files next to the -updated.csv:
+
+    <timestamp>_Canvas-<Course>-updated.out   the text report, as before
+    <timestamp>_Canvas-<Course>-report.json   every section's fields, tables and lines
+    <timestamp>_Canvas-<Course>-report.csv    every table row in long form:
+                                              section, table, row, column, value
+
+Each file is rendered in memory and written in one go. Under the step
+scheduler the sections are collected while the steps run and each report is
+written once at the end (see publish_section()); a step run on its own loads
+the report back from the JSON, replaces its own section - a re-run no longer
+appends a second copy - and writes the files again. A .out file with no JSON
+next to it (written before this format) is kept as a leading text-only
+section.
+
+grade-importer report [TABLE] answers quick questions ("who has 0 on the last
+project") from the latest report's JSON without re-running any step.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import threading
+
+from grade_importer.context import PROJECT_DIR, load_config
+from grade_importer.manifest import latest_snapshots
+
+REPORT_VERSION = 1
+
+
+def report_paths(out_path):
+    """(.out, .json, .csv) paths of the report whose text goes to out_path"""
+    base = out_path[: -len("-updated.out")] if out_path.endswith("-updated.out") else os.path.splitext(out_path)[0]
+    return out_path, base + "-report.json", base + "-report.csv"
+
+
+class Section:
+    """One step's part of a report: text lines plus the same findings as fields and tables"""
+
+    def __init__(self, name, title=None):
+        self.name = name
+        # Sections with a title get the ==== banner in the text report
+        self.title = title
+        self.lines = []
+        self.fields = {}
+        # table name -> {"columns": [...], "rows": [[...], ...]}
+        self.tables = {}
+
+    def write(self, *lines):
+        """Add lines to the text report"""
+        self.lines.extend(lines)
+
+    def echo(self, *lines):
+        """Print lines to the console and add them to the text report"""
+        for line in lines:
+            print(line)
+        self.lines.extend(lines)
+
+    def add_table(self, name, columns, rows):
+        self.tables[name] = {"columns": list(columns), "rows": [list(row) for row in rows]}
+
+    def text(self):
+        header = ""
+        if self.title:
+            header = "\n\n" + "=" * 60 + f"\n{self.title}\n" + "=" * 60 + "\n"
+        return header + "".join(line + "\n" for line in self.lines)
+
+    def to_dict(self):
+        return {"name": self.name, "title": self.title, "fields": self.fields,
+                "tables": self.tables, "lines": self.lines}
+
+    @classmethod
+    def from_dict(cls, data):
+        section = cls(data["name"], data.get("title"))
+        section.fields = dict(data.get("fields") or {})
+        section.tables = dict(data.get("tables") or {})
+        section.lines = list(data.get("lines") or [])
+        return section
+
+
+class Report:
+    """The sections of one -updated.out report, in order"""
+
+    def __init__(self, out_path):
+        self.out_path = out_path
+        self.sections = []
+
+    @classmethod
+    def load(cls, out_path):
+        """The report as last written to out_path, or an empty one"""
+        report = cls(out_path)
+        _, json_path, _ = report_paths(out_path)
+        try:
+            with open(json_path, "r") as json_file:
+                data = json.load(json_file)
+            report.sections = [Section.from_dict(section) for section in data["sections"]]
+            return report
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        # A plain .out file from before the structured report
+        try:
+            with open(out_path, "r") as out_file:
+                text = out_file.read()
+        except OSError:
+            return report
+        if text:
+            legacy = Section("text")
+            legacy.lines = text[:-1].split("\n") if text.endswith("\n") else text.split("\n")
+            report.sections.append(legacy)
+        return report
+
+    def add(self, section):
+        """Add a section, replacing an earlier section of the same name in place"""
+        for i, existing in enumerate(self.sections):
+            if existing.name == section.name:
+                self.sections[i] = section
+                return
+        self.sections.append(section)
+
+    def render_text(self):
+        return "".join(section.text() for section in self.sections)
+
+    def render_json(self):
+        data = {"version": REPORT_VERSION, "report": os.path.basename(self.out_path),
+                "sections": [section.to_dict() for section in self.sections]}
+        return json.dumps(data, indent=2) + "\n"
+
+    def render_csv(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["section", "table", "row", "column", "value"])
+        for section in self.sections:
+            for table_name, table in section.tables.items():
+                for row_number, row in enumerate(table["rows"], 1):
+                    for column, value in zip(table["columns"], row):
+                        writer.writerow([section.name, table_name, row_number, column,
+                                         "" if value is None else value])
+        return buffer.getvalue()
+
+    def write(self):
+        """Render and write the .out, .json and .csv files; returns their paths and the bytes written"""
+        paths = report_paths(self.out_path)
+        written = 0
+        for path, text in zip(paths, (self.render_text(), self.render_json(), self.render_csv())):
+            data = text.encode("utf-8")
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as report_file:
+                report_file.write(data)
+            os.replace(temp_path, path)
+            written += len(data)
+        return paths, written
+
+
+def publish_section(context, out_path, section, record=None, new_report=False):
+    """Add a step's section to the report whose text goes to out_path.
+
+    Standalone the report is loaded, updated and written straight away
+    (new_report=True starts it afresh, as the updater does). Under the step
+    scheduler the section is collected instead and every report is written
+    once all steps have finished, in step order (see write_reports()). The
+    section's text size is added to record (an instrumentation stage) if given.
+    Returns the report files written, or () when deferred.
+    """
+    if record is not None:
+        record.bytes_written += len(section.text().encode("utf-8"))
+    sections = getattr(context, "report_sections", None)
+    if sections is not None:
+        sections.setdefault(context.current_step, []).append((out_path, section, new_report))
+        return ()
+    report = Report(out_path) if new_report else Report.load(out_path)
+    report.add(section)
+    paths, _ = report.write()
+    return paths
+
+
+def write_reports(collected, step_names):
+    """Write the reports for sections collected from the steps, adding them in step order.
+
+    collected maps step name -> [(out_path, section, new_report)]. Returns the
+    paths of every file written.
+    """
+    reports = {}
+    for name in step_names:
+        for out_path, section, new_report in collected.get(name, []):
+            if new_report or out_path not in reports:
+                reports[out_path] = Report(out_path) if new_report else Report.load(out_path)
+            reports[out_path].add(section)
+    written = []
+    for report in reports.values():
+        paths, _ = report.write()
+        written.extend(paths)
+    return written
+
+
+def format_table(columns, rows):
+    """Rows lined up under their column names"""
+    cells = [[str(column) for column in columns]]
+    cells.extend(["" if value is None else str(value) for value in row] for row in rows)
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return lines
+
+
+def main(table=None, as_csv=False, base_dir=PROJECT_DIR):
+    """Print one table of the latest report (or list its tables) for the configured course"""
+    config = load_config(base_dir)
+    found = latest_snapshots(os.path.join(base_dir, "data"), config["CanvasCsvPattern"], "report-json")
+    if not found:
+        print(f"No report found for {config['CanvasCsvPattern']}; run the pipeline first.")
+        return
+    report = Report.load(found[0][: -len("-report.json")] + "-updated.out")
+
+    if table is None:
+        print(f"Report: {found[0]}")
+        for section in report.sections:
+            for name, data in section.tables.items():
+                print(f"  {section.name}/{name} ({len(data['rows'])} rows)")
+        return
+
+    # A table is named by itself or as section/table
+    section_name, _, table_name = table.rpartition("/")
+    for section in report.sections:
+        if table_name in section.tables and section_name in ("", section.name):
+            data = section.tables[table_name]
+            break
+    else:
+        print(f"No table {table} in {found[0]}")
+        return
+    if as_csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(data["columns"])
+        writer.writerows(data["rows"])
+    else:
+        for line in format_table(data["columns"], data["rows"]):
+            print(line)
@@ -0,0 +1,192 @@
+"""
+Compare students across Canvas roster exports to identify returning students
+(grade-importer returning).
+
+Any number of exports (files or directories) can be given; by default every
+Canvas export in data/ and next-semester/ is used. Each export is read once
+into an email index (grade_importer/roster_index.py), and the returning
+students, section breakdown and grade distribution are printed for every pair
+of courses that share students, followed by the students seen in three or
+more courses.
+
+    grade-importer returning                          # every pair
+    grade-importer returning --then COP4655 COP4808   # one pair
+    grade-importer returning data/ next-semester/2025-11-18T2235_Canvas-COP4808_001_13815.csv="Spring 2026"
+
+A file can be given as FILE=TERM when its export date doesn't tell the term,
+e.g. a next-semester roster exported before the semester starts.
+"""
+
+import os
+
+from grade_importer.context import PROJECT_DIR
+from grade_importer.manifest import parse_snapshot_name
+from grade_importer.roster_index import RosterIndex, course_code, grade_sort_key, iter_students
+
+
+def default_dirs(base_dir):
+    return [os.path.join(base_dir, 'data'), os.path.join(base_dir, 'next-semester')]
+
+
+def read_students_from_csv(filepath):
+    """
+    Read student data from Canvas CSV file.
+    Returns a dictionary with email as key and student info as value.
+    """
+    students = {}
+    for email, name, section, current_score, unposted_current_grade in iter_students(filepath):
+        students[email] = {
+            'name': name,
+            'email': email,
+            'section': section,
+            'current_score': current_score,
+            'unposted_current_grade': unposted_current_grade
+        }
+    return students
+
+
+def find_canvas_exports(directory):
+    """Canvas roster exports (not the pipeline's -updated/-changed outputs) in a directory"""
+    exports = []
+    for name in sorted(os.listdir(directory)):
+        info = parse_snapshot_name(name)
+        if info is not None and info['kind'] == 'export' and info['source'] == 'Canvas':
+            exports.append(os.path.join(directory, name))
+    return exports
+
+
+def collect_files(arguments):
+    """(files, {file: term}) from FILE, FILE=TERM and DIRECTORY arguments"""
+    files, terms = [], {}
+    for argument in arguments:
+        path, _, term = argument.partition('=')
+        if os.path.isdir(path):
+            files.extend(find_canvas_exports(path))
+        else:
+            files.append(path)
+            if term:
+                terms[path] = term
+    return files, terms
+
+
+def course_label(index, course):
+    """'COP4655 (Fall 2025)'"""
+    term = index.courses[course][0]
+    return f"{course_code(course)} ({term})" if term else course_code(course)
+
+
+def print_returning_report(index, previous, new):
+    """The returning-students table, section breakdown and grade distribution for one course pair"""
+    previous_label, new_label = course_label(index, previous), course_label(index, new)
+    previous_code = course_code(previous)
+    total_new = index.courses[new][2]
+    returning_students = sorted(index.took_then(previous, new), key=lambda pair: pair[2].name)
+
+    # Print results in table format
+    print("\n" + "=" * 115)
+    print(f"RETURNING STUDENTS: {len(returning_students)} out of {total_new} total in {new_label} from {previous_label}")
+    print("=" * 115)
+    print()
+
+    if returning_students:
+        # Print table header
+        print(f"{'#':<4} {'Name':<30} {'Email':<35} {'Section':<25} {previous_code + ' Grade':<15}")
+        print("-" * 115)
+
+        # Count by section and grade
+        section_counts = {}
+        grade_counts = {}
+
+        for idx, (email, earlier, later) in enumerate(returning_students, 1):
+            # Display N/A if grade is empty, otherwise show the grade
+            display_grade = earlier.grade if earlier.grade else 'N/A'
+            section_counts[later.section] = section_counts.get(later.section, 0) + 1
+            grade_counts[display_grade] = grade_counts.get(display_grade, 0) + 1
+            print(f"{idx:<4} {later.name:<30} {email:<35} {later.section:<25} {display_grade:<15}")
+
+        # Print section totals
+        print("=" * 115)
+        print("\nSECTION BREAKDOWN:")
+        print("-" * 60)
+        for section in sorted(section_counts.keys()):
+            print(f"{section:<40} {section_counts[section]:>3} students")
+        print("-" * 60)
+        print(f"{'TOTAL RETURNING STUDENTS':<40} {len(returning_students):>3}")
+
+        # Print grade distribution, in GRADE_ORDER and then any other grades
+        print("\n" + "=" * 115)
+        print(f"\nGRADE DISTRIBUTION ({previous_code} Current Grades):")
+        print("-" * 60)
+        for grade in sorted(grade_counts, key=grade_sort_key):
+            print(f"Grade {grade:<10} {grade_counts[grade]:>3} students")
+        print("-" * 60)
+        print(f"{'TOTAL':<15} {len(returning_students):>3} students")
+        print()
+    else:
+        print("No returning students found.")
+
+    print()
+    percent = len(returning_students) / total_new * 100 if total_new else 0.0
+    print(f"Summary: {len(returning_students)} out of {total_new} students in {new_label} ({percent:.1f}%) are returning from {previous_label}")
+
+
+def print_progression(index, previous, new):
+    """Grade in the earlier course (rows) against grade in the later one (columns)"""
+    counts = index.progression(previous, new)
+    if not counts:
+        return
+    rows = sorted({before for before, _ in counts}, key=grade_sort_key)
+    columns = sorted({after for _, after in counts}, key=grade_sort_key)
+    print(f"\nGRADE PROGRESSION ({course_code(previous)} rows -> {course_code(new)} columns):")
+    print("-" * 60)
+    print(f"{'':<8}" + "".join(f"{grade:>6}" for grade in columns))
+    for before in rows:
+        print(f"{before:<8}" + "".join(f"{counts.get((before, after), 0) or '':>6}" for after in columns))
+    print("-" * 60)
+
+
+def print_seen_in(index, minimum):
+    """Students enrolled in at least `minimum` of the indexed courses"""
+    students = sorted(index.seen_in(minimum), key=lambda item: item[1][-1].name)
+    print("\n" + "=" * 115)
+    print(f"STUDENTS IN {minimum} OR MORE COURSES: {len(students)}")
+    print("=" * 115)
+    for idx, (email, history) in enumerate(students, 1):
+        courses = ", ".join(f"{course_label(index, e.course)} {e.grade or 'N/A'}" for e in history)
+        print(f"{idx:<4} {history[-1].name:<30} {email:<35} {courses}")
+
+
+def main(files=None, then=None, min_courses=3, base_dir=PROJECT_DIR):
+    """Report returning students across the given exports (default: base_dir's data/ and next-semester/).
+
+    then is an optional (previous, new) pair of courses to compare instead of every pair.
+    """
+    arguments = files or [directory for directory in default_dirs(base_dir) if os.path.isdir(directory)]
+    files, terms = collect_files(arguments)
+    if not files:
+        print("No Canvas exports found.")
+        return
+
+    # Every file is read exactly once; all the reports below come from the index
+    index = RosterIndex.from_files(files, terms)
+    for course, (term, _, count) in index.courses.items():
+        print(f"Found {count} students in {course_label(index, course)} [{course}]")
+
+    if then:
+        previous, new = then
+        for course in (previous, new):
+            if not index.resolve(course):
+                print(f"Course {course} is not among the exports.")
+                return
+        pairs = [(a, b) for a in index.resolve(previous) for b in index.resolve(new) if a != b]
+    else:
+        pairs = index.course_pairs()
+
+    if not pairs:
+        print("\nNo students are shared between the courses.")
+    for previous, new in pairs:
+        print_returning_report(index, previous, new)
+        print_progression(index, previous, new)
+
+    if len(index.courses) >= min_courses:
+        print_seen_in(index, min_courses)
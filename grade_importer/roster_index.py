@@ -0,0 +1,199 @@
+"""
+Inverted email index over Canvas roster exports from any number of courses.
+
+Each export is read once and every student is filed under their SIS login
+(email) as an Enrollment: course, term, section, grade and score. Questions
+across the whole set are then answered from the index without re-reading
+any file:
+
+    took_then(a, b)      - students enrolled in course a and later in course b
+    progression(a, b)    - how grades in a carried over to grades in b
+    seen_in(n)           - students enrolled in n or more courses
+
+Courses come from the export filenames (<timestamp>_Canvas-<CODE>_<SECTION>_<CRN>.csv).
+The term defaults to the season of the export date (Spring: Jan-May, Summer:
+Jun-Jul, Fall: Aug-Dec) but can be given per file, since next semester's
+roster is usually exported before that semester starts. "Earlier" and
+"later" mean term order, then export time. When several exports of the same
+course are given, only the newest is used.
+"""
+
+import csv
+import os
+import sys
+from collections import namedtuple
+
+from grade_importer.manifest import parse_snapshot_name
+
+Enrollment = namedtuple(
+    "Enrollment", "course term section grade score name exported_at"
+)
+
+GRADE_ORDER = ["A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F", "N/A"]
+SEASONS = ["Spring", "Summer", "Fall"]
+
+
+def term_of(exported_at):
+    """'2025-11-17T0922' -> 'Fall 2025'"""
+    year, month = exported_at[:4], int(exported_at[5:7])
+    if month <= 5:
+        season = "Spring"
+    elif month <= 7:
+        season = "Summer"
+    else:
+        season = "Fall"
+    return f"{season} {year}"
+
+
+def term_rank(term):
+    """Sort key for 'Fall 2025'-style terms; unknown terms sort first"""
+    season, _, year = (term or "").partition(" ")
+    if season not in SEASONS or not year.isdigit():
+        return (0, -1)
+    return (int(year), SEASONS.index(season))
+
+
+def enrollment_order(enrollment):
+    return (term_rank(enrollment.term), enrollment.exported_at)
+
+
+def course_of(filepath):
+    """(course, exported_at) from a Canvas export filename, e.g. ('COP4655_001_13208', '2025-11-17T0922')"""
+    info = parse_snapshot_name(os.path.basename(filepath))
+    if info is None or info["source"] != "Canvas":
+        # Not a dated Canvas export; fall back to the bare filename
+        return os.path.splitext(os.path.basename(filepath))[0], ""
+    return info["course"], info["exported_at"]
+
+
+def course_code(course):
+    """'COP4655_001_13208' -> 'COP4655'"""
+    return course.split("_")[0]
+
+
+def iter_students(filepath):
+    """Yield (email, name, section, current score, unposted current grade) for each student in a Canvas export"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            # Skip header rows (Points Possible, etc.)
+            name = (row.get("Student") or "").strip()
+            if name in ("Points Possible", ""):
+                continue
+            email = (row.get("SIS Login ID") or "").strip()
+            if email:
+                yield (
+                    email,
+                    name,
+                    (row.get("Section") or "").strip(),
+                    (row.get("Current Score") or "").strip(),
+                    (row.get("Unposted Current Grade") or "").strip(),
+                )
+
+
+def latest_per_course(filepaths):
+    """The newest export of each course among filepaths, oldest course first"""
+    latest = {}
+    for filepath in filepaths:
+        course, exported_at = course_of(filepath)
+        if course not in latest or exported_at > latest[course][1]:
+            latest[course] = (filepath, exported_at)
+    return [filepath for filepath, _ in sorted(latest.values(), key=lambda item: (item[1], item[0]))]
+
+
+class RosterIndex:
+    """email -> [Enrollment] across every roster added, each list in export order"""
+
+    def __init__(self):
+        self.enrollments = {}
+        # course -> (term, exported_at, student count)
+        self.courses = {}
+
+    @classmethod
+    def from_files(cls, filepaths, terms=None):
+        """Index the newest export of each course; terms optionally maps a filepath to its term"""
+        terms = terms or {}
+        index = cls()
+        for filepath in latest_per_course(filepaths):
+            index.add_file(filepath, terms.get(filepath))
+        index.sort_courses()
+        return index
+
+    def add_file(self, filepath, term=None):
+        """Read one Canvas export and file its students under their email"""
+        course, exported_at = course_of(filepath)
+        if term is None:
+            term = term_of(exported_at) if exported_at else ""
+        count = 0
+        for email, name, section, score, grade in iter_students(filepath):
+            history = self.enrollments.setdefault(email.lower(), [])
+            # The same few sections, grades and scores repeat across every course; keep one copy of each
+            history.append(Enrollment(course, term, sys.intern(section), sys.intern(grade), sys.intern(score),
+                                      name, exported_at))
+            # Keep each history in course order, whatever order the files come in
+            if len(history) > 1 and enrollment_order(history[-1]) < enrollment_order(history[-2]):
+                history.sort(key=enrollment_order)
+            count += 1
+        self.courses[course] = (term, exported_at, count)
+        return count
+
+    def sort_courses(self):
+        """Put self.courses in term order, then export time"""
+        self.courses = dict(
+            sorted(self.courses.items(), key=lambda item: (term_rank(item[1][0]), item[1][1]))
+        )
+
+    def resolve(self, course):
+        """Courses matching a full course key or just its code ('COP4655')"""
+        if course in self.courses:
+            return [course]
+        return [key for key in self.courses if course_code(key) == course]
+
+    def took_then(self, first, then):
+        """(email, first Enrollment, later Enrollment) for students in course `first` and later in `then`"""
+        firsts, thens = set(self.resolve(first)), set(self.resolve(then))
+        pairs = []
+        for email, history in self.enrollments.items():
+            earlier = next((e for e in history if e.course in firsts), None)
+            if earlier is None:
+                continue
+            later = next(
+                (e for e in history if e.course in thens and enrollment_order(e) > enrollment_order(earlier)), None
+            )
+            if later is not None:
+                pairs.append((email, earlier, later))
+        return pairs
+
+    def progression(self, first, then):
+        """{(grade in first, grade in then): student count}"""
+        counts = {}
+        for _, earlier, later in self.took_then(first, then):
+            key = (earlier.grade or "N/A", later.grade or "N/A")
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def seen_in(self, minimum=3):
+        """(email, enrollments) for students enrolled in at least `minimum` different courses"""
+        return [
+            (email, history)
+            for email, history in self.enrollments.items()
+            if len({enrollment.course for enrollment in history}) >= minimum
+        ]
+
+    def course_pairs(self):
+        """Every (earlier course, later course) pair that shares at least one student, in course order"""
+        order = list(self.courses)
+        shared = {}
+        for history in self.enrollments.values():
+            courses = sorted({e.course for e in history}, key=order.index)
+            for i, earlier in enumerate(courses):
+                for later in courses[i + 1:]:
+                    shared[(earlier, later)] = shared.get((earlier, later), 0) + 1
+        return sorted(shared, key=lambda pair: (order.index(pair[1]), order.index(pair[0])))
+
+
+def grade_sort_key(grade):
+    """Letter grades in GRADE_ORDER first, anything else alphabetically after them"""
+    if grade in GRADE_ORDER:
+        return (0, GRADE_ORDER.index(grade), "")
+    return (1, 0, grade)
@@ -0,0 +1,270 @@
+"""
+Dependency-aware scheduler for the pipeline steps.
+
+Each Step declares the context keys it reads (inputs) and publishes (outputs),
+using the names documented on PipelineContext. A step depends on every step
+that publishes one of its inputs, so the order of PIPELINE_STEPS doesn't
+matter beyond breaking ties; compare and unsubmitted both only need the
+updater's outputs and run side by side once it has finished. A new step is
+plugged in by adding a Step here (enabled() can make it conditional, as the
+completers check is on its input file). sources names the exports ("canvas",
+"codepath") a step's result depends on, so watch mode only re-runs the steps
+a new export affects.
+
+Steps run on a thread pool, so they share the parsed tables on the context.
+While they run:
+  - console output is routed per step: the step first in the order prints
+    straight through and the others are buffered until it is their turn, so
+    the console reads the same as a sequential run;
+  - report sections published with publish_section() (grade_importer/report.py)
+    are collected and each report is written once, in step order, after all
+    steps have finished.
+
+A step whose dependency failed or was skipped is skipped.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from grade_importer.manifest import record_snapshots
+from grade_importer.report import write_reports
+
+
+class Step:
+    """One step module (e.g. grade_importer.updater) run as a pipeline step through its main(context)"""
+
+    def __init__(self, name, module, title, inputs=(), outputs=(), required_outputs=(),
+                 required=False, enabled=None, sources=("canvas", "codepath")):
+        self.name = name
+        self.module = module
+        self.title = title
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.sources = tuple(sources)
+        # Outputs the step must leave on the context to count as successful
+        # (the updater reports its own errors instead of raising)
+        self.required_outputs = tuple(required_outputs)
+        # A failed required step fails the whole run
+        self.required = required
+        self._enabled = enabled
+
+    def enabled(self, context):
+        return self._enabled is None or self._enabled(context)
+
+
+def _completers_file_exists(context):
+    return os.path.exists(os.path.join(context.data_dir, "CodePath_Completers_with_Selections.csv"))
+
+
+PIPELINE_STEPS = [
+    Step(
+        "update", "grade_importer.updater", "Updating Canvas Grades from Codepath Data",
+        outputs=("canvas", "codepath", "updated_csv", "summary",
+                 "canvas_rows", "codepath_rows", "updated_rows"),
+        required_outputs=("summary",),
+        required=True,
+    ),
+    Step(
+        "compare", "grade_importer.compare", "Comparing Grades Between Canvas Files",
+        inputs=("updated_csv", "updated_rows", "summary"),
+    ),
+    Step(
+        "unsubmitted", "grade_importer.unsubmitted", "Finding Unsubmitted Assignments",
+        inputs=("codepath", "codepath_rows", "summary"),
+        sources=("codepath",),
+    ),
+    Step(
+        "completers", "grade_importer.completers", "Checking CodePath Completers Against the Roster",
+        inputs=("codepath", "codepath_rows"),
+        enabled=_completers_file_exists,
+        sources=("codepath",),
+    ),
+    Step(
+        "push", "grade_importer.push", "Pushing Changed Grades to Canvas",
+        inputs=("canvas", "canvas_rows", "updated_rows", "summary"),
+        enabled=lambda context: context.options.get("push"),
+    ),
+]
+
+_step_modules = {}
+_import_lock = threading.Lock()
+
+
+def load_step_module(module_name):
+    """Import a step module once per process"""
+    with _import_lock:
+        if module_name not in _step_modules:
+            _step_modules[module_name] = importlib.import_module(module_name)
+        return _step_modules[module_name]
+
+
+def step_order(steps):
+    """Topological order of steps (ties keep their listed order) and each step's dependencies.
+
+    Raises ValueError on a dependency cycle.
+    """
+    producers = {}
+    for step in steps:
+        for key in step.outputs:
+            producers.setdefault(key, []).append(step.name)
+    depends_on = {
+        step.name: sorted({producer for key in step.inputs for producer in producers.get(key, [])
+                           if producer != step.name})
+        for step in steps
+    }
+
+    order = []
+    remaining = list(steps)
+    while remaining:
+        done = {step.name for step in order}
+        ready = next((step for step in remaining if set(depends_on[step.name]) <= done), None)
+        if ready is None:
+            raise ValueError("Pipeline steps have a dependency cycle: " + ", ".join(step.name for step in remaining))
+        order.append(ready)
+        remaining.remove(ready)
+    return order, depends_on
+
+
+def section_header(title):
+    """A formatted section header, as printed by the orchestrator"""
+    return "\n" + "=" * 70 + f"\n {title}\n" + "=" * 70 + "\n"
+
+
+class ConsoleRouter:
+    """sys.stdout stand-in: the live step writes straight through, the others are buffered"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.live = None
+        self.buffers = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def attach(self, step_name):
+        """Route the calling thread's output to step_name"""
+        self._local.step = step_name
+
+    def write(self, text):
+        step_name = getattr(self._local, "step", None)
+        with self._lock:
+            if step_name is None or step_name == self.live:
+                return self.stream.write(text)
+            self.buffers.setdefault(step_name, []).append(text)
+            return len(text)
+
+    def write_for(self, step_name, text):
+        """Write on behalf of a step from another thread"""
+        with self._lock:
+            if step_name == self.live:
+                self.stream.write(text)
+            else:
+                self.buffers.setdefault(step_name, []).append(text)
+
+    def go_live(self, step_name):
+        """Print everything step_name has buffered so far and pass its later output through"""
+        with self._lock:
+            self.stream.write("".join(self.buffers.pop(step_name, [])))
+            self.live = step_name
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _run_step(context, step, number, router):
+    router.attach(step.name)
+    context.current_step = step.name
+    print(section_header(f"STEP {number}: {step.title}"))
+    start = time.perf_counter()
+    try:
+        module = load_step_module(step.module)
+        if context.recorder is not None:
+            with context.recorder.step(step.name):
+                module.main(context)
+        else:
+            module.main(context)
+        missing = [key for key in step.required_outputs if key not in context.paths]
+        if missing:
+            raise RuntimeError("it did not write " + ", ".join(missing))
+        print(f"\n✓ Step {number} ({step.name}) completed successfully")
+        status = "ok"
+    except Exception as e:
+        print(f"\n✗ Step {number} ({step.name}) failed with error: {e}")
+        status = "failed"
+    return {"step": step.name, "status": status, "seconds": time.perf_counter() - start}
+
+
+def write_report_sections(context, steps):
+    """Write the reports the steps published sections to; returns the text (.out) reports written"""
+    written = write_reports(context.report_sections, [step.name for step in steps])
+    context.report_sections = None
+    if written:
+        record_snapshots(context.data_dir, *written)
+    return [path for path in written if path.endswith(".out")]
+
+
+def run_steps(context, steps=None, max_workers=None, sources=None):
+    """Run the enabled steps on a thread pool in dependency order.
+
+    Returns one {"step", "status", "seconds"} dict per enabled step, in step
+    order; status is "ok", "failed" or "skipped". max_workers=1 (or the
+    "sequential" option) runs the steps one at a time. With sources (a set of
+    "canvas"/"codepath") only the steps depending on those exports run.
+    """
+    if context.options.get("sequential"):
+        max_workers = 1
+    steps = [step for step in (steps or PIPELINE_STEPS) if step.enabled(context)]
+    if sources is not None:
+        steps = [step for step in steps if set(step.sources) & set(sources)]
+    order, depends_on = step_order(steps)
+    numbers = {step.name: number for number, step in enumerate(order, 1)}
+    context.table_consumers = {name for step in order for name in step.inputs}
+    results = {}
+    # Import the step modules up front rather than from several threads at once
+    for step in order:
+        load_step_module(step.module)
+
+    router = ConsoleRouter(sys.stdout)
+    context.report_sections = {}
+    sys.stdout = router
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(order) or 1) as executor:
+            running = {}
+            pending = list(order)
+            printed = 0
+            router.go_live(order[0].name if order else None)
+            while pending or running:
+                # Start every step whose dependencies are done; skip those whose dependencies didn't succeed
+                for step in list(pending):
+                    statuses = [results[name]["status"] for name in depends_on[step.name] if name in results]
+                    if len(statuses) < len(depends_on[step.name]):
+                        continue
+                    pending.remove(step)
+                    if all(status == "ok" for status in statuses):
+                        running[executor.submit(_run_step, context, step, numbers[step.name], router)] = step
+                    else:
+                        failed = ", ".join(name for name in depends_on[step.name] if results[name]["status"] != "ok")
+                        router.write_for(step.name, section_header(f"STEP {numbers[step.name]}: {step.title}"))
+                        router.write_for(step.name, f"\n- Step {numbers[step.name]} ({step.name}) skipped: "
+                                                    f"{failed} did not complete\n")
+                        results[step.name] = {"step": step.name, "status": "skipped", "seconds": 0.0}
+                if running:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        step = running.pop(future)
+                        results[step.name] = future.result()
+                # Hand the console to the next unfinished step in order
+                while printed < len(order) and order[printed].name in results:
+                    printed += 1
+                    if printed < len(order):
+                        router.go_live(order[printed].name)
+    finally:
+        sys.stdout = router.stream
+        if context.report_sections is not None:
+            written = write_report_sections(context, order)
+            for path in written:
+                print(f"Report written to {path}")
+    return [results[step.name] for step in order]
@@ -0,0 +1,187 @@
+"""
+Submission state of a Codepath export as a student x assignment bitmap.
+
+A SubmissionMatrix holds one Python int per assignment column, with bit i set
+when student i has not submitted it (a blank, missing or 0 grade, as in
+GradeColumn.is_unsubmitted()). The bits are built in one pass per column from
+the snapshot's normalized grade columns, so every question is then a few
+whole-column integer operations instead of another loop over the students:
+
+  - per-assignment and per-project counts are popcounts (int.bit_count());
+  - a project is missing when any of its columns is (OR of the columns);
+  - "missing at least k projects" keeps one mask per count so far and ORs
+    each project into it (at_least[c] |= at_least[c - 1] & project);
+  - "missing the last k projects in a row" ANDs the last k project masks;
+  - a section is one more mask, so a rate by section is a popcount of the
+    AND of the two.
+
+Only the students in a mask are ever decoded back into names.
+"""
+
+from itertools import compress
+
+# Bytes of 0/1 flags -> ASCII "0"/"1", for int(..., 2), and back
+_BITS = bytes.maketrans(b"\x00\x01", b"01")
+_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack_flags(flags):
+    """An int with bit i set where flags[i] (a bytes-like of 0/1) is set"""
+    if not flags:
+        return 0
+    return int(bytes(flags).translate(_BITS)[::-1], 2)
+
+
+def set_bits(mask):
+    """Positions of the set bits of mask, lowest first"""
+    flags = format(mask, "b")[::-1].encode().translate(_FLAGS)
+    return list(compress(range(len(flags)), flags))
+
+
+class SubmissionMatrix:
+    """Not-submitted bitsets for students x assignments, with project and section masks.
+
+    students    - student names, bit order
+    sections    - a section label per student ("" when unknown)
+    columns     - the assignment columns found in the export (Canvas names), in mapping order
+    labels      - the project label of each column
+    bits        - one int per column, bit i set when student i hasn't submitted it
+    projects    - project labels in first-seen column order
+    """
+
+    def __init__(self, students, sections, columns, labels, bits):
+        self.students = students
+        self.sections = sections
+        self.columns = columns
+        self.labels = labels
+        self.bits = bits
+        self.all = (1 << len(students)) - 1
+        self.projects = list(dict.fromkeys(labels))
+        self._project_bits = {}
+        for label, column_bits in zip(labels, bits):
+            self._project_bits[label] = self._project_bits.get(label, 0) | column_bits
+        self._section_masks = None
+
+    @classmethod
+    def from_records(cls, records, mapping, sections=None):
+        """Build the bitmap from Codepath records of one Snapshot.
+
+        records is the (name, record) pairs to include, in report order;
+        mapping a CompiledMapping. Columns the export lacks are left out.
+        """
+        students = [name for name, _ in records]
+        if sections is None:
+            sections = [""] * len(students)
+        if not records:
+            return cls(students, sections, [], [], [])
+        snapshot = records[0][1].snapshot
+        positions = [record.position for _, record in records]
+        # Every row of the export, in order: the flags are used as they are
+        whole = positions == list(range(len(snapshot)))
+        columns, labels, bits = [], [], []
+        for codepath_column, canvas_column, label in zip(
+            mapping.codepath_columns, mapping.canvas_columns, mapping.project_labels
+        ):
+            if codepath_column not in snapshot.positions:
+                continue
+            flags = snapshot.grade_column(codepath_column).unsubmitted
+            if not whole:
+                flags = bytes(map(flags.__getitem__, positions))
+            columns.append(canvas_column)
+            labels.append(label)
+            bits.append(pack_flags(flags))
+        return cls(students, sections, columns, labels, bits)
+
+    def __len__(self):
+        return len(self.students)
+
+    def missing(self, column):
+        """How many students haven't submitted a column"""
+        return self.bits[self.columns.index(column)].bit_count()
+
+    def project_stats(self):
+        """{project label: {'missing': cells, 'total': cells}} summed over the project's columns"""
+        stats = {}
+        for label, column_bits in zip(self.labels, self.bits):
+            project = stats.setdefault(label, {'missing': 0, 'total': 0})
+            project['missing'] += column_bits.bit_count()
+            project['total'] += len(self.students)
+        return stats
+
+    def missing_by_student(self):
+        """{student: [Canvas columns not submitted]} for the students missing any, in student order"""
+        missing = {}
+        anything = 0
+        for column_bits in self.bits:
+            anything |= column_bits
+        lists = {i: [] for i in set_bits(anything)}
+        for column, column_bits in zip(self.columns, self.bits):
+            for i in set_bits(column_bits):
+                lists[i].append(column)
+        for i, columns in lists.items():
+            missing[self.students[i]] = columns
+        return missing
+
+    def project_mask(self, label):
+        """Students missing any column of a project"""
+        return self._project_bits.get(label, 0)
+
+    def missing_at_least(self, count):
+        """Students missing at least count projects"""
+        if count <= 0:
+            return self.all
+        # at_least[c]: students missing at least c of the projects seen so far
+        at_least = [self.all] + [0] * count
+        for label in self.projects:
+            project = self._project_bits[label]
+            for c in range(count, 0, -1):
+                at_least[c] |= at_least[c - 1] & project
+        return at_least[count]
+
+    def missing_last(self, count):
+        """Students missing each of the last count projects"""
+        if count <= 0 or count > len(self.projects):
+            return 0
+        mask = self.all
+        for label in self.projects[-count:]:
+            mask &= self._project_bits[label]
+        return mask
+
+    def section_masks(self):
+        """{section: students in it}, sections in first-seen order"""
+        if self._section_masks is None:
+            members = {}
+            for i, section in enumerate(self.sections):
+                members.setdefault(section, []).append(i)
+            masks = {}
+            for section, positions in members.items():
+                flags = bytearray(len(self.sections))
+                for i in positions:
+                    flags[i] = 1
+                masks[section] = pack_flags(flags)
+            self._section_masks = masks
+        return self._section_masks
+
+    def section_rates(self):
+        """(section, students, submitted, cells, percentage) per section over every column"""
+        rows = []
+        for section, mask in self.section_masks().items():
+            students = mask.bit_count()
+            cells = students * len(self.bits)
+            unsubmitted = sum((column_bits & mask).bit_count() for column_bits in self.bits)
+            submitted = cells - unsubmitted
+            percentage = submitted / cells * 100 if cells else 0
+            rows.append((section, students, submitted, cells, round(percentage, 1)))
+        return rows
+
+    def names(self, mask):
+        """The students in a mask, in student order"""
+        return [self.students[i] for i in set_bits(mask)]
+
+    def describe(self, mask):
+        """(student, section, projects missed) for the students in a mask"""
+        missed = {i: [] for i in set_bits(mask)}
+        for label in self.projects:
+            for i in set_bits(self._project_bits[label] & mask):
+                missed[i].append(label)
+        return [(self.students[i], self.sections[i], labels) for i, labels in missed.items()]
@@ -0,0 +1,159 @@
+"""
+Synthetic Canvas and Codepath exports for benchmarks and trying out changes.
+
+generate_dataset() writes a config.json and a data/ directory shaped like a
+real course: Canvas exports with a "Points Possible" row, and Codepath exports
+with junk lines before the Member ID / Full Name header row and an empty first
+column. It includes withdrawn and dropped students, students whose Codepath
+email doesn't match their Canvas login, Canvas-only students, and more
+assignments filled in with each snapshot. Rows are generated one at a time,
+so million-student files don't have to fit in memory.
+"""
+
+import csv
+import json
+import os
+import random
+
+FIRST_NAMES = ["Ana", "Ben", "Carla", "Dev", "Elena", "Farah", "Gus", "Hana", "Ivan", "Jada",
+               "Kofi", "Lena", "Marco", "Nia", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq"]
+LAST_NAMES = ["Garcia", "Nguyen", "Smith", "Patel", "Johnson", "Kim", "Lopez", "Brown", "Silva",
+              "Chen", "Williams", "Okafor", "Muller", "Rossi", "Haddad", "Cohen", "Singh", "Diaz"]
+GRADE_VALUES = ["10", "10", "10", "9.5", "9", "8", "7", "0", ""]
+
+CANVAS_FIXED_COLUMNS = ["Student", "ID", "SIS User ID", "SIS Login ID", "Section"]
+CANVAS_SCORE_COLUMNS = ["Current Score", "Unposted Current Score", "Final Score", "Unposted Final Score"]
+CODEPATH_FIXED_COLUMNS = ["Member ID", "Full Name", "Email", "Status", "CodePath Certificate Status", "Cohort"]
+
+
+def assignment_mapping(assignments):
+    """Canvas column -> Codepath column for a course with the given number of assignments"""
+    mapping = {f"Proj-{k} ({2570000 + k})": f"ASN - {k} Points" for k in range(1, assignments)}
+    mapping[f"Final Project: Codepath ({2570000 + assignments})"] = f"ASN - {assignments} Points"
+    return mapping
+
+
+def course_config(course, assignments):
+    """A config.json for the synthetic course"""
+    return {
+        "CanvasCsvPattern": f"Canvas-{course}",
+        "CodepathCsvPattern": f"Codepath-{course}",
+        "HeadersToLookFor": ["Member ID", "Full Name"],
+        "ColumnMapping": {
+            "Email": "Email",
+            "Status": "Status",
+            "SIS Login ID": "SIS Login ID",
+            "Assignments": assignment_mapping(assignments),
+        },
+    }
+
+
+def snapshot_timestamp(snapshot):
+    return f"2025-10-{10 + snapshot:02d}T0900"
+
+
+def iter_students(count, seed):
+    """Yield the same roster of students for a given seed"""
+    rng = random.Random(seed)
+    for i in range(count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        roll = rng.random()
+        status = "Withdrawn" if roll < 0.03 else "Active"
+        certificate = "Dropped" if 0.03 <= roll < 0.06 else rng.choice(["", "In Progress", "Eligible"])
+        email = f"{first.lower()}.{last.lower()}{i}@fau.edu"
+        yield {
+            "index": i,
+            "name": f"{first} {last} {i}",
+            "email": email,
+            # Students whose Codepath email isn't their Canvas login
+            "codepath_email": email.replace("@fau.edu", "@gmail.com") if 0.06 <= roll < 0.08 else email,
+            "status": status,
+            "certificate": certificate,
+            # Dropped students are gone from Canvas; a few Canvas students never joined Codepath
+            "in_canvas": certificate != "Dropped",
+            "in_codepath": not 0.08 <= roll < 0.09,
+            "section": f"COP4808-00{1 + i % 3}",
+        }
+
+
+def student_grades(student, assignments, snapshot, snapshots, seed):
+    """Codepath grades for a student as of a snapshot; later snapshots have more work graded"""
+    rng = random.Random(seed * 1000003 + student["index"])
+    grades = [rng.choice(GRADE_VALUES) for _ in range(assignments)]
+    # A few grades get revised from one snapshot to the next
+    for _ in range(snapshot):
+        for k in range(assignments):
+            if rng.random() < 0.02:
+                grades[k] = rng.choice(GRADE_VALUES)
+    graded = assignments - (snapshots - 1 - snapshot)
+    return [value if k < graded else "" for k, value in enumerate(grades)]
+
+
+def write_canvas_export(path, students, assignments, grades_snapshot, snapshots, seed):
+    """Canvas gradebook export; grades_snapshot=None leaves the assignment columns blank"""
+    mapping = assignment_mapping(assignments)
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CANVAS_FIXED_COLUMNS + list(mapping) + CANVAS_SCORE_COLUMNS)
+        writer.writerow(["    Points Possible", "", "", "", ""] + ["10"] * assignments + ["", "", "", ""])
+        for student in iter_students(students, seed):
+            if not student["in_canvas"]:
+                continue
+            if grades_snapshot is None:
+                grades = [""] * assignments
+            else:
+                grades = student_grades(student, assignments, grades_snapshot, snapshots, seed)
+            writer.writerow(
+                [student["name"], str(100000 + student["index"]), f"Z{student['index']:08d}",
+                 student["email"], student["section"]]
+                + grades
+                + ["85.0", "85.0", "80.0", "80.0"]
+            )
+
+
+def write_codepath_export(path, students, assignments, snapshot, snapshots, seed, preamble_lines):
+    """Codepath gradebook CSV download, junk lines and empty first column included"""
+    mapping = assignment_mapping(assignments)
+    with open(path, "w", newline="") as csv_file:
+        for line in range(preamble_lines):
+            csv_file.write("CodePath Gradebook - COP4808,,\n" if line == 0 else ",,\n")
+        writer = csv.writer(csv_file)
+        writer.writerow([""] + CODEPATH_FIXED_COLUMNS + list(mapping.values()) + ["Total Points"])
+        for student in iter_students(students, seed):
+            if not student["in_codepath"]:
+                continue
+            grades = student_grades(student, assignments, snapshot, snapshots, seed)
+            writer.writerow(
+                ["", str(500000 + student["index"]), student["name"], student["codepath_email"],
+                 student["status"], student["certificate"], "Fall 2025"]
+                + grades
+                + [""]
+            )
+
+
+def generate_dataset(base_dir, students=1000, assignments=8, preamble_lines=5, snapshots=2,
+                     seed=1, course="COP4808_001_13815"):
+    """Write config.json and data/ for a synthetic course under base_dir; returns the config.
+
+    Each snapshot gets a Canvas export (holding the previous snapshot's grades)
+    and a Codepath export. Every snapshot except the last also gets the
+    -updated.csv the updater would have written, so the comparison step has a
+    previous file to diff against.
+    """
+    data_dir = os.path.join(base_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    config = course_config(course, assignments)
+    with open(os.path.join(base_dir, "config.json"), "w") as config_file:
+        json.dump(config, config_file, indent=4)
+
+    for snapshot in range(snapshots):
+        prefix = os.path.join(data_dir, snapshot_timestamp(snapshot))
+        write_canvas_export(f"{prefix}_Canvas-{course}.csv", students, assignments,
+                            snapshot - 1 if snapshot else None, snapshots, seed)
+        write_codepath_export(f"{prefix}_Codepath-{course}.csv", students, assignments,
+                              snapshot, snapshots, seed, preamble_lines)
+        if snapshot < snapshots - 1:
+            write_canvas_export(f"{prefix}_Canvas-{course}-updated.csv", students, assignments,
+                                snapshot, snapshots, seed)
+    return config
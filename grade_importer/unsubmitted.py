@@ -0,0 +1,286 @@
+"""
+Step 3: report the assignments each student has not submitted (grade-importer unsubmitted),
+and early-alert queries over every course's latest export (grade-importer alerts).
+"""
+
+import csv
+import os
+from datetime import datetime
+
+from grade_importer.codepath_csv import load_codepath_snapshot
+from grade_importer.context import PROJECT_DIR, course_configs, course_name, load_config
+from grade_importer.instrumentation import stage
+from grade_importer.mapping import compile_mapping, normalize_email
+from grade_importer.manifest import latest_snapshots, record_snapshots
+from grade_importer.parse_cache import load_snapshot
+from grade_importer.report import Section, publish_section
+from grade_importer.submissions import SubmissionMatrix
+
+def rows_by_student(rows):
+    """Key the records of a cleaned Codepath export by Full Name, skipping dropped students"""
+    data = {}
+    for row in rows:
+        student_name = row.get('Full Name', '')
+        # Skip students who have dropped
+        certificate_status = row.get('CodePath Certificate Status', '').strip()
+        if student_name and certificate_status != 'Dropped':
+            data[student_name] = row
+    return data
+
+def parse_csv(file_path, config):
+    """Parse the Codepath export; returns the rows keyed by student and the cleaned headers"""
+    # The reader skips the lines before the headers as it streams the file
+    snapshot = load_codepath_snapshot(file_path, config["HeadersToLookFor"])
+    return rows_by_student(snapshot), list(snapshot.header)
+
+def find_missing_submissions(data, headers, config):
+    """The report's view of the submission bitmap (see grade_importer/submissions.py).
+
+    Returns the Canvas assignments each student hasn't submitted, the checked
+    Codepath columns, {project: {'missing', 'total'}} and the student count.
+    """
+    # Get assignment columns from config - use the Codepath column names (values)
+    mapping = compile_mapping(config['ColumnMapping'])
+    codepath_columns = mapping.codepath_columns
+
+    print("\nChecking assignments:", codepath_columns)
+    for j, position in enumerate(mapping.positions(headers)):
+        if position == -1:
+            print(f"Warning: Assignment column '{codepath_columns[j]}' not found in CSV")
+
+    # Double check status (in case it's checked at a different point)
+    students = [
+        (student, row) for student, row in data.items()
+        if row.get('CodePath Certificate Status', '').strip() != 'Dropped'
+    ]
+    matrix = SubmissionMatrix.from_records(students, mapping)
+
+    # Every project is listed, including ones whose columns the file lacks
+    project_stats = {project_name: {'missing': 0, 'total': 0} for project_name in mapping.project_labels}
+    project_stats.update(matrix.project_stats())
+    return matrix.missing_by_student(), codepath_columns, project_stats, len(students)
+
+def get_latest_csv_file(root_directory, config):
+    pattern = config.get('CodepathCsvPattern', '')
+    if not pattern:
+        raise ValueError("CodepathCsvPattern not found in config.json")
+        
+    latest_files = latest_snapshots(root_directory, pattern, 'export')
+    if not latest_files:
+        raise FileNotFoundError(f"No CSV files matching pattern '{pattern}' found in the directory")
+        
+    # Get the most recent file
+    latest_file = latest_files[0]
+    print(f"Found latest Codepath file: {os.path.basename(latest_file)}")
+    return latest_file
+
+def main(context=None):
+    """Report unsubmitted assignments; reuses step 1's parsed Codepath export when given a PipelineContext"""
+    config = context.config if context is not None else load_config()
+    # Use Codepath column names (values) instead of Canvas names (keys)
+    columns_to_compare = list(config['ColumnMapping']['Assignments'].values())
+    print(f"Columns to compare: {columns_to_compare}")
+
+    # Get the latest Canvas file using pattern from config
+    if context is not None:
+        root_directory = context.data_dir
+    else:
+        root_directory = os.path.join(PROJECT_DIR, 'data')
+    if not os.path.exists(root_directory):
+        raise FileNotFoundError(f"Data directory not found at: {root_directory}")
+
+    if context is not None and 'codepath_rows' in context.tables:
+        # Step 1 already picked and cleaned the Codepath export
+        file_path = context.paths['codepath']
+        print(f"\nAnalyzing file: {os.path.basename(file_path)}")
+        data = rows_by_student(context.tables['codepath_rows'])
+        headers = list(context.tables['codepath_rows'].header)
+    else:
+        with stage(context, "discover"):
+            file_path = get_latest_csv_file(root_directory, config)
+        print(f"\nAnalyzing file: {os.path.basename(file_path)}")
+
+        # Parse the CSV file with config for headers
+        with stage(context, "parse") as record:
+            data, headers = parse_csv(file_path, config)
+            record.rows = len(data)
+            record.read_file(file_path)
+    
+    # Find missing submissions
+    with stage(context, "analyze") as record:
+        missing_assignments, checked_columns, project_stats, total_students = find_missing_submissions(data, headers, config)
+        record.rows = len(data)
+    
+    generated_on = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # Write results to console
+    print("\nNot Submitted Assignments Report:")
+    print(f"Generated on: {generated_on}")
+    print(f"File analyzed: {os.path.basename(file_path)}")
+    print("\nFindings:")
+    
+    # Print to console
+    if missing_assignments:
+        for student, assignments in missing_assignments.items():
+            print(f"\nStudent: {student}")
+            print("Not submitted assignments:")
+            for assignment in assignments:
+                print(f"  - {assignment}")
+    else:
+        print("No unsubmitted assignments found!")
+    
+    # Get Canvas student count for comparison
+    canvas_pattern = config.get('CanvasCsvPattern', '')
+    canvas_student_count = None
+    if context is not None and 'updated_rows' in context.tables:
+        canvas_student_count = len(context.tables['updated_rows'])
+    elif canvas_pattern:
+        codepath_basename = os.path.basename(file_path)
+        timestamp_part = codepath_basename.split('_')[0]
+        canvas_updated_file = os.path.join(root_directory, f"{timestamp_part}_{canvas_pattern}-updated.csv")
+        if os.path.exists(canvas_updated_file):
+            with open(canvas_updated_file, 'r') as f:
+                canvas_reader = csv.DictReader(f)
+                canvas_student_count = sum(1 for _ in canvas_reader)
+    
+    # Project statistics table, for both console and file
+    stats_rows = []
+    for project_name, stats in sorted(project_stats.items()):
+        submitted = stats['total'] - stats['missing']
+        percentage = (submitted / stats['total']) * 100 if stats['total'] > 0 else 0
+        stats_rows.append((project_name, submitted, stats['missing'], stats['total'], round(percentage, 1)))
+
+    stats_table = []
+    stats_table.append("=== Project Submission Statistics ===")
+    stats_table.append(f"Total students in Codepath: {total_students}")
+    if canvas_student_count:
+        stats_table.append(f"Total students in Canvas: {canvas_student_count}")
+    stats_table.append(f"Generated on: {generated_on}")
+    stats_table.append(f"File analyzed: {os.path.basename(file_path)}")
+    stats_table.append("")
+    stats_table.append("-" * 90)
+    stats_table.append(f"{'Project':<17} | {'Submitted':<10} | {'Unsubmitted':<12} | {'Total':<8} | {'Percentage':<10}")
+    stats_table.append("-" * 90)
+    for project_name, submitted, unsubmitted, total, percentage in stats_rows:
+        stats_table.append(f"{project_name:<17} | {submitted:<10} | {unsubmitted:<12} | {total:<8} | {percentage:.1f}%")
+    stats_table.append("-" * 90)
+
+    print()
+    for line in stats_table:
+        print(line)
+    
+    # Add to the .out report (matching the Canvas updated file pattern)
+    # Convert Codepath filename to Canvas pattern for .out file
+    canvas_pattern = config.get('CanvasCsvPattern', '')
+    if canvas_pattern:
+        # Extract timestamp from Codepath filename
+        codepath_basename = os.path.basename(file_path)
+        # Try to find a matching Canvas updated file
+        timestamp_part = codepath_basename.split('_')[0]  # Get timestamp like '2025-10-20T2058'
+        out_filename = os.path.join(root_directory, f"{timestamp_part}_{canvas_pattern}-updated.out")
+        if context is not None and 'summary' in context.paths:
+            # Step 1 started this run's report (it is written once all steps finish)
+            out_filename = context.paths['summary']
+        elif not os.path.exists(out_filename):
+            print(f"\nNote: .out file not found at {out_filename}, skipping append")
+            return
+
+        section = Section("unsubmitted", "NOT SUBMITTED ASSIGNMENTS REPORT")
+        section.write(f"Generated on: {generated_on}")
+        section.write(f"File analyzed: {os.path.basename(file_path)}", "")
+        if missing_assignments:
+            section.write("Findings:", "")
+            for student, assignments in missing_assignments.items():
+                section.write(f"Student: {student}")
+                section.write("Not submitted assignments:")
+                section.write(*(f"  - {assignment}" for assignment in assignments))
+                section.write("")
+        else:
+            section.write("No unsubmitted assignments found!")
+        # Add statistics table
+        section.write("", *stats_table)
+
+        section.fields.update({
+            "generated_on": generated_on,
+            "file_analyzed": file_path,
+            "codepath_students": total_students,
+            "canvas_students": canvas_student_count,
+        })
+        section.add_table("unsubmitted", ["student", "assignment"], [
+            (student, assignment)
+            for student, assignments in missing_assignments.items()
+            for assignment in assignments
+        ])
+        section.add_table("project_stats", ["project", "submitted", "unsubmitted", "total", "percentage"], stats_rows)
+
+        with stage(context, "write-report") as report_record:
+            written = publish_section(context, out_filename, section, report_record)
+        print(f"\nReport added to {out_filename}")
+        if written:
+            record_snapshots(root_directory, *written)
+
+def canvas_sections(students, canvas_snapshot):
+    """Each Codepath student's Canvas Section, joined on Email = SIS Login ID ("" when not in Canvas)"""
+    sections = {}
+    for record in canvas_snapshot:
+        key = normalize_email(record.login)
+        # The first row for a login wins, as in step 1's join
+        if key and key not in sections:
+            sections[key] = record.section
+    return [sections.get(normalize_email(row.login), "") for _, row in students]
+
+def course_alerts(course_config, data_dir, missing_at_least=2, missing_last=2):
+    """Print the early-alert queries for one course's latest Codepath export; returns (students, flagged)"""
+    name = course_name(course_config)
+    print(f"\n=== {name} ===")
+    codepath_files = latest_snapshots(data_dir, course_config.get('CodepathCsvPattern', ''), 'export')
+    if not codepath_files:
+        print("No Codepath export found")
+        return 0, 0
+    data, _ = parse_csv(codepath_files[0], course_config)
+    students = list(data.items())
+    canvas_files = latest_snapshots(data_dir, course_config['CanvasCsvPattern'], 'export')
+    if canvas_files:
+        sections = canvas_sections(students, load_snapshot(canvas_files[0], data_dir))
+        sections = [section or "not in Canvas" for section in sections]
+    else:
+        sections = [name] * len(students)
+    mapping = compile_mapping(course_config['ColumnMapping'])
+    matrix = SubmissionMatrix.from_records(students, mapping, sections)
+    print(f"Codepath export: {os.path.basename(codepath_files[0])}")
+    if canvas_files:
+        print(f"Sections from:   {os.path.basename(canvas_files[0])}")
+
+    print(f"\n{'Section':<24} | {'Students':<8} | {'Submitted':<10} | {'Total':<8} | {'Percentage':<10}")
+    print("-" * 74)
+    for section, count, submitted, total, percentage in matrix.section_rates():
+        print(f"{section:<24} | {count:<8} | {submitted:<10} | {total:<8} | {percentage:.1f}%")
+
+    flagged = 0
+    for title, mask in (
+        (f"Missing at least {missing_at_least} projects", matrix.missing_at_least(missing_at_least)),
+        (f"Missing the last {missing_last} projects in a row", matrix.missing_last(missing_last)),
+    ):
+        students_missing = matrix.describe(mask)
+        print(f"\n{title}: {len(students_missing)}")
+        for student, section, projects in students_missing:
+            print(f"  {student} ({section}): {', '.join(projects)}")
+        flagged |= mask
+    return len(students), flagged.bit_count()
+
+def alerts_main(base_dir=PROJECT_DIR, courses=None, missing_at_least=2, missing_last=2):
+    """Early-alert queries over the latest Codepath export of every course (or those named in courses).
+
+    Returns the number of students checked.
+    """
+    config = load_config(base_dir)
+    data_dir = os.path.join(base_dir, 'data')
+    checked = flagged = 0
+    for course_config in course_configs(config):
+        if courses and course_name(course_config) not in courses:
+            continue
+        students, course_flagged = course_alerts(course_config, data_dir, missing_at_least, missing_last)
+        checked += students
+        flagged += course_flagged
+    print(f"\nStudents flagged: {flagged} of {checked}")
+    return checked
@@ -0,0 +1,495 @@
+"""
+Step 1: update the Canvas export with the Codepath grades (grade-importer update).
+
+The Codepath export streams through a generator pipeline, CHUNK_ROWS rows at a
+time: join_chunks() matches each block to the Canvas export, update_chunks()
+normalizes its grades and fills in copies of the Canvas rows, and the rows are
+written to the -updated.csv as soon as their block is done. Only the Canvas
+export and what the summary lists are held for the whole run; the Codepath and
+updated rows are kept only when a later pipeline step reads them.
+"""
+
+import contextlib
+import csv
+import os
+from operator import itemgetter
+
+from grade_importer.codepath_csv import codepath_snapshot, open_codepath_csv
+from grade_importer.context import PROJECT_DIR, load_config
+from grade_importer.grade_values import INVALID, normalize_column
+from grade_importer.incremental import IncrementalState, state_path
+from grade_importer.instrumentation import stage
+from grade_importer.mapping import compile_mapping, normalize_email
+from grade_importer.manifest import latest_snapshots, record_snapshots
+from grade_importer.parse_cache import load_snapshot
+from grade_importer.records import Snapshot
+from grade_importer.report import Section, publish_section
+
+
+def build_canvas_index(canvas_data, key_column):
+    """Index Canvas rows (records or dicts) by normalized login ID in a single pass.
+
+    The first row seen for a key wins (matching the old linear scan). Returns the
+    index and a dict of keys that appear more than once with their row counts.
+    """
+    index = {}
+    counts = {}
+    for row in canvas_data:
+        key = normalize_email(row.get(key_column))
+        if not key:
+            # Rows such as "Points Possible" have no login ID
+            continue
+        counts[key] = counts.get(key, 0) + 1
+        if key not in index:
+            index[key] = row
+    duplicates = {key: count for key, count in counts.items() if count > 1}
+    return index, duplicates
+
+
+def format_join_summary(matched, codepath_unmatched, canvas_unmatched, canvas_duplicates, codepath_duplicates):
+    """Build the join statistics lines shared by the console and the .out file"""
+    lines = [
+        "Join summary:",
+        f"  Matched students: {matched}",
+        f"  Codepath students not in Canvas: {codepath_unmatched}",
+        f"  Canvas students not in Codepath: {len(canvas_unmatched)}",
+        f"  Duplicate Canvas login IDs: {len(canvas_duplicates)}",
+        f"  Duplicate Codepath emails: {len(codepath_duplicates)}",
+    ]
+    if canvas_unmatched:
+        lines.append("Canvas students not in Codepath:")
+        for email, name in canvas_unmatched:
+            lines.append(f"  - {name} ({email})")
+    if canvas_duplicates:
+        lines.append("Duplicate Canvas login IDs (first row used):")
+        for email, count in sorted(canvas_duplicates.items()):
+            lines.append(f"  - {email} x{count}")
+    if codepath_duplicates:
+        lines.append("Duplicate Codepath emails (first row used):")
+        for email, count in sorted(codepath_duplicates.items()):
+            lines.append(f"  - {email} x{count}")
+    return lines
+
+
+# Codepath rows are joined, updated and written this many at a time
+CHUNK_ROWS = 2048
+
+
+class UpdateTallies:
+    """What the update stream has seen so far, for the summary.
+
+    Only the students the report lists are kept (missing, duplicates, 0 on the
+    last project); which Canvas rows were matched is one byte per Canvas row.
+    """
+
+    def __init__(self, canvas_rows):
+        self.codepath_rows = 0
+        self.matched = bytearray(len(canvas_rows))  # 1 at the position of each matched Canvas record
+        self.matched_count = 0
+        self.missing = []  # (email, name) in Codepath but not in Canvas
+        self.codepath_duplicates = {}
+        self.zero_last = []  # (email, name) with 0 on the last project
+        self.unreadable = {}  # Canvas column -> grades that aren't a score
+
+
+def join_chunks(chunks, canvas_index, tallies, incremental_state=None):
+    """For each chunk of Codepath records, yield the students to update as
+    (Canvas record, Codepath record, email, name, incremental outcome or None, fingerprint)
+    """
+    for chunk in chunks:
+        matched = []
+        for row in chunk:
+            tallies.codepath_rows += 1
+
+            # Get email and skip if not present
+            email = row.login
+            if not email:  # Skip if no email
+                continue
+
+            # Get status and student name
+            status = row.status.strip()
+            student_name = row.name
+            email = normalize_email(email)
+
+            # Only process non-withdrawn students
+            if status == 'Withdrawn':
+                continue
+
+            canvas_row = canvas_index.get(email)
+
+            # Incremental mode: an unchanged student reuses last run's outcome
+            fingerprint = None
+            cached = None
+            if incremental_state is not None:
+                if email in incremental_state.current:
+                    # Duplicate Codepath row; the first one already decided the outcome
+                    cached = incremental_state.current[email]
+                else:
+                    fingerprint = incremental_state.fingerprint(row, canvas_row is not None)
+                    cached = incremental_state.lookup(email, fingerprint)
+
+            # If student is not in Canvas, check if they're dropped before adding to missing list
+            if canvas_row is None:
+                if cached is not None:
+                    is_missing = cached["missing"]
+                else:
+                    certificate_status = row.get("CodePath Certificate Status", '').strip()
+                    is_missing = certificate_status != 'Dropped'
+                if incremental_state is not None and fingerprint is not None:
+                    incremental_state.record(email, fingerprint, {"missing": is_missing}, cached is None)
+                if is_missing:
+                    tallies.missing.append((email, student_name))
+                continue
+
+            # Student is in Canvas, update their grades if not processed
+            if tallies.matched[canvas_row.position]:
+                tallies.codepath_duplicates[email] = tallies.codepath_duplicates.get(email, 1) + 1
+                continue
+            tallies.matched[canvas_row.position] = 1
+            tallies.matched_count += 1
+            matched.append((canvas_row, row, email, student_name, cached, fingerprint))
+        yield matched
+
+
+def update_chunks(joined, canvas_rows, codepath_rows, assignment_columns, points, last_codepath_column,
+                  tallies, incremental_state=None):
+    """For each chunk of join_chunks() output, yield (updated rows, changed rows) as lists of cells.
+
+    The grades of the students that are recomputed are normalized a column at a
+    time over the chunk (see grade_importer/grade_values.py) and their Canvas
+    text written into a copy of the Canvas row.
+    """
+    canvas_positions = canvas_rows.positions
+    # (output position, Codepath position or None, points possible, Canvas column, Codepath column)
+    columns = [(canvas_positions[canvas_col], codepath_rows.positions.get(codepath_col),
+                points.get(canvas_col), canvas_col, codepath_col)
+               for canvas_col, codepath_col in assignment_columns]
+    for matched in joined:
+        rows = [canvas_rows.new_row(entry[0].position) for entry in matched]
+        fresh_rows = [row for row, entry in zip(rows, matched) if entry[4] is None]
+        fresh_cells = [entry[1].cells() for entry in matched if entry[4] is None]
+        last_column = None
+        if fresh_rows:
+            for index, codepath_index, points_possible, canvas_col, codepath_col in columns:
+                if codepath_index is None:
+                    raw_values = [""] * len(fresh_cells)
+                else:
+                    raw_values = list(map(itemgetter(codepath_index), fresh_cells))
+                column = normalize_column(raw_values, points_possible)
+                for row, text in zip(fresh_rows, column.texts):
+                    row[index] = text
+                if codepath_col == last_codepath_column:
+                    last_column = column
+                invalid = column.status.count(INVALID)
+                if invalid:
+                    tallies.unreadable[canvas_col] = tallies.unreadable.get(canvas_col, 0) + invalid
+
+        changed = []
+        position = 0
+        for row, (_, _, email, student_name, cached, fingerprint) in zip(rows, matched):
+            if cached is not None:
+                for canvas_col, text in cached["grades"].items():
+                    if canvas_col in canvas_positions:
+                        row[canvas_positions[canvas_col]] = text
+                is_zero_last = cached["zero_last"]
+                if incremental_state is not None:
+                    incremental_state.record(email, fingerprint, cached, False)
+            else:
+                # Record the students with 0 on the last assignment
+                is_zero_last = last_column is not None and last_column.is_zero(position)
+                position += 1
+                if incremental_state is not None:
+                    grades = {canvas_col: row[index] for index, _, _, canvas_col, _ in columns}
+                    incremental_state.record(
+                        email,
+                        fingerprint,
+                        {"missing": False, "grades": grades, "zero_last": is_zero_last},
+                        True,
+                    )
+                    changed.append(row)
+
+            if is_zero_last:
+                tallies.zero_last.append((email, student_name))
+        yield rows, changed
+
+
+class UpdatedCsvWriter:
+    """Write rows to a CSV as they come, under a temporary name renamed into place on success.
+
+    The file is only created once there is a row to write, unless always is set;
+    with no path nothing is written.
+    """
+
+    def __init__(self, path, header, always=False):
+        self.path = path
+        self.header = header
+        self.always = always
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._temp_path = None
+
+    def _open(self):
+        self._temp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._file = open(self._temp_path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+
+    def write(self, rows):
+        if self.path is None or not rows:
+            return
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def __enter__(self):
+        if self.path is not None and self.always:
+            self._open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._file is None:
+            return False
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._temp_path, self.path)
+        else:
+            os.remove(self._temp_path)
+        return False
+
+
+def get_latest_csv(pattern, directory=os.path.join(PROJECT_DIR, "data")):
+    # Look up the newest export for the pattern in the data directory manifest
+    files = latest_snapshots(directory, pattern, "export")
+    if not files:
+        raise FileNotFoundError(f"No files found matching pattern: {pattern}")
+    return files[0]
+
+
+def main(context=None, incremental=None):
+    """Update the Canvas export with Codepath grades.
+
+    When run from 0-updater.py a PipelineContext is passed in; the loaded config
+    is taken from it and the files and tables parsed here are recorded on it for
+    the later steps.
+
+    With incremental=True (or context.options["incremental"]) students whose
+    Codepath row is unchanged since the last run reuse the stored outcome and
+    only the changed students are written to a -changed.csv as well.
+    """
+    if incremental is None:
+        incremental = context is not None and context.options.get("incremental", False)
+    try:
+        # Read the configuration file
+        config = context.config if context is not None else load_config()
+
+        # Get the latest CSV files based on patterns
+        data_dir = context.data_dir if context is not None else os.path.join(PROJECT_DIR, "data")
+        try:
+            with stage(context, "discover"):
+                canvas_csv_filename = get_latest_csv(config["CanvasCsvPattern"], data_dir)
+                codepath_csv_filename = get_latest_csv(config["CodepathCsvPattern"], data_dir)
+            # The summary report section; echo() prints a line and keeps it for the .out file
+            section = Section("update")
+            section.echo(f"Using Canvas file: {canvas_csv_filename}")
+            section.echo(f"Using Codepath file: {codepath_csv_filename}")
+            if context is not None:
+                context.paths["canvas"] = canvas_csv_filename
+                context.paths["codepath"] = codepath_csv_filename
+        except FileNotFoundError as e:
+            print(f"Error finding CSV files: {str(e)}")
+            return
+
+        output_csv_filename = canvas_csv_filename.replace(".csv", "-updated.csv")
+        output_summary_filename = output_csv_filename.replace(
+            "-updated.csv", "-updated.out"
+        )
+        output_changed_filename = output_csv_filename.replace(
+            "-updated.csv", "-changed.csv"
+        )
+
+        # Column name mapping
+        column_mapping = config["ColumnMapping"]
+
+        # Headers to look for
+        headers_to_look_for = config["HeadersToLookFor"]
+
+        # Read the emails and store them in a list
+        # (in watch mode the previous run's rows are reused while the export is unchanged)
+        canvas_data = context.reuse_table("canvas_rows", canvas_csv_filename) if context is not None else None
+        if canvas_data is None:
+            # Parsed exports are kept in data/.cache/parsed/ (see grade_importer/parse_cache.py);
+            # the rows are held as a compact Snapshot (see grade_importer/records.py)
+            with stage(context, "canvas-parse") as record:
+                canvas_data = load_snapshot(canvas_csv_filename, data_dir)
+                record.rows = len(canvas_data)
+                record.read_file(canvas_csv_filename)
+        if context is not None:
+            context.note_snapshot(canvas_csv_filename)
+
+        if not canvas_data:
+            print("No valid data found in the Canvas file.")
+            return
+
+        # Build the email -> Canvas row index once; used for both membership and lookup
+        with stage(context, "canvas-index") as record:
+            canvas_index, canvas_duplicates = build_canvas_index(
+                canvas_data, compile_mapping(column_mapping).login_column
+            )
+            record.rows = len(canvas_data)
+
+        tallies = UpdateTallies(canvas_data)
+
+        # Canvas <-> Codepath assignment columns; the last one is the last project
+        mapping = compile_mapping(column_mapping)
+        assignment_columns = list(zip(mapping.canvas_columns, mapping.codepath_columns))
+        # Output rows are lists in the Canvas header's order; a mapped column the export
+        # doesn't have can't be written
+        for canvas_col, _ in assignment_columns:
+            if canvas_col not in canvas_data.positions:
+                section.echo(f"Warning: Canvas column '{canvas_col}' not found in {canvas_csv_filename}")
+        assignment_columns = [(canvas_col, codepath_col) for canvas_col, codepath_col in assignment_columns
+                              if canvas_col in canvas_data.positions]
+        points = canvas_data.points_possible(mapping.canvas_columns)
+
+        incremental_state = None
+        if incremental:
+            incremental_state = IncrementalState(
+                state_path(data_dir, config["CanvasCsvPattern"]), column_mapping, points
+            )
+
+        # The Codepath rows and the updated rows are only kept when a later step reads them;
+        # otherwise each block of rows is dropped once it is written
+        keep_codepath = context is not None and context.wants_table("codepath_rows")
+        updated_rows = None
+        if context is not None and context.wants_table("updated_rows"):
+            updated_rows = Snapshot(canvas_data.header)
+
+        # print("\nProcessing CodePath students:")
+        # Process CodePath students
+        # The reader skips the lines before the headers as the file streams in
+        with contextlib.ExitStack() as codepath_stack:
+            with stage(context, "header-cleanup"):
+                reader = codepath_stack.enter_context(
+                    open_codepath_csv(codepath_csv_filename, headers_to_look_for)
+                )
+            section.echo(f"Cleared headers from codepath file: {codepath_csv_filename}")
+
+            codepath_rows = codepath_snapshot(reader.fieldnames)
+            if context is not None:
+                context.tables["canvas_rows"] = canvas_data
+                if keep_codepath:
+                    context.tables["codepath_rows"] = codepath_rows
+
+            # Read, join, update and write as one generator pipeline, CHUNK_ROWS Codepath
+            # rows at a time: output rows are written as soon as their block is done
+            chunks = codepath_rows.chunks(reader.reader, CHUNK_ROWS, keep=keep_codepath)
+            joined = join_chunks(chunks, canvas_index, tallies, incremental_state)
+            updated = update_chunks(joined, canvas_data, codepath_rows, assignment_columns, points,
+                                    mapping.last_codepath_column, tallies, incremental_state)
+            with stage(context, "stream-update") as record:
+                record.read_file(codepath_csv_filename)
+                with UpdatedCsvWriter(output_csv_filename, canvas_data.header) as output, \
+                        UpdatedCsvWriter(output_changed_filename if incremental_state is not None else None,
+                                         canvas_data.header, always=True) as changed_output:
+                    for rows, changed_rows in updated:
+                        output.write(rows)
+                        changed_output.write(changed_rows)
+                        if updated_rows is not None:
+                            updated_rows.extend(rows)
+                record.rows = tallies.codepath_rows
+                if output.rows:
+                    record.wrote_file(output_csv_filename)
+
+        canvas_unmatched = [
+            (email, canvas_row.name)
+            for email, canvas_row in canvas_index.items()
+            if not tallies.matched[canvas_row.position]
+        ]
+        join_summary = format_join_summary(
+            tallies.matched_count,
+            len(tallies.missing),
+            canvas_unmatched,
+            canvas_duplicates,
+            tallies.codepath_duplicates,
+        )
+
+        if output.rows:
+            section.echo(f"Results written to {output_csv_filename}")
+            if context is not None:
+                context.paths["updated_csv"] = output_csv_filename
+                if updated_rows is not None:
+                    context.tables["updated_rows"] = updated_rows
+                context.note_snapshot(output_csv_filename)
+
+        # Incremental mode: remember this run's fingerprints and write only the changed rows
+        if incremental_state is not None:
+            incremental_state.save()
+            section.echo(
+                f"Incremental: {incremental_state.changed} of {len(incremental_state.current)} "
+                "students changed since the last run"
+            )
+            section.echo(f"Changed students written to {output_changed_filename}")
+            section.fields["incremental_changed"] = incremental_state.changed
+            section.fields["changed_csv"] = output_changed_filename
+        section.echo("")
+
+        # Missing students, the join summary and the students with 0 on the last project
+        # go to the console and the .out file alike
+        if tallies.missing:
+            section.echo(f"Missing students (in Codepath but not in Canvas): {len(tallies.missing)}")
+            for email, name in tallies.missing:
+                section.echo(f"  - {name} ({email})")
+        else:
+            section.echo("No missing students")
+        section.echo("")
+        section.echo(*join_summary)
+        section.echo("")
+
+        for canvas_col, count in tallies.unreadable.items():
+            section.echo(f"Warning: {count} grade(s) for '{canvas_col}' are not a score; copied unchanged")
+        if tallies.unreadable:
+            section.echo("")
+
+        section.echo("Students with 0 on the last project:")
+        if tallies.zero_last:
+            for email, name in tallies.zero_last:
+                section.echo(f"  - {name} ({email})")
+            section.echo(f"Total students with 0 on the last project: {len(tallies.zero_last)}", "")
+
+            # Email lists in different formats
+            emails = [email for email, name in tallies.zero_last]
+            section.echo("Email list for students with 0 (semicolon-separated for Outlook):")
+            section.echo("; ".join(emails), "")
+            section.echo("Email list (comma-separated):")
+            section.echo(", ".join(emails))
+        else:
+            section.echo("  None")
+
+        section.fields.update({
+            "canvas_file": canvas_csv_filename,
+            "codepath_file": codepath_csv_filename,
+            "updated_csv": output_csv_filename if output.rows else None,
+            "matched_students": tallies.matched_count,
+            "updated_rows": output.rows,
+        })
+        section.add_table("missing_students", ["email", "name"], tallies.missing)
+        section.add_table("canvas_not_in_codepath", ["email", "name"], canvas_unmatched)
+        section.add_table("duplicate_canvas_logins", ["email", "count"], sorted(canvas_duplicates.items()))
+        section.add_table("duplicate_codepath_emails", ["email", "count"],
+                          sorted(tallies.codepath_duplicates.items()))
+        section.add_table("zero_last_project", ["email", "name"], tallies.zero_last)
+        section.add_table("unreadable_grades", ["assignment", "count"], sorted(tallies.unreadable.items()))
+
+        # Start this run's report (.out, .json, .csv) with the summary section
+        with stage(context, "write-summary") as summary_record:
+            written = publish_section(context, output_summary_filename, section, summary_record, new_report=True)
+        print(f"Summary written to {output_summary_filename}")
+        record_snapshots(data_dir, output_csv_filename, output_changed_filename, *written)
+        if context is not None:
+            context.paths["summary"] = output_summary_filename
+
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+
@@ -0,0 +1,199 @@
+"""
+Watch mode: keep the pipeline running and re-run it when new exports land in data/.
+
+    python3 0-updater.py --watch
+
+The process stays up with the step modules imported and the config loaded
+(config.json is reloaded when it changes). After one full run at start-up it
+waits for new files in data/ - through inotify on Linux, otherwise by polling
+the directory listing. A new file is only picked up once its size and mtime
+have stopped changing for a short settle time, so exports that are still
+being copied in are not read half-written. Only files named like a Canvas or
+Codepath export of the configured course trigger a run; the pipeline's own
+outputs don't.
+
+Only the steps affected by the new exports run (see Step.sources in
+grade_importer/scheduler.py): a new Canvas export re-runs update and compare,
+a new Codepath export re-runs everything. The previous run stays warm in
+memory: its -updated rows are the old side of the next comparison, and the
+parsed Canvas export is reused while the file is unchanged.
+
+Only the top level of data/ is watched.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+
+from grade_importer.context import PipelineContext, load_config, snapshot_key
+from grade_importer.instrumentation import RunRecorder, write_run_record
+from grade_importer.manifest import is_snapshot_of
+from grade_importer.scheduler import run_steps
+
+# inotify(7) event masks: a file finished writing or was moved/created in the directory
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+SETTLE_SECONDS = 0.5
+POLL_SECONDS = 1.0
+
+
+class InotifyWatcher:
+    """Changed filenames in one directory through Linux inotify (via libc)"""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        """Names of the files that changed, waiting up to timeout seconds for the first event"""
+        names = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return names
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = _EVENT.unpack_from(buffer, offset)
+            offset += _EVENT.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Changed filenames in one directory by comparing (size, mtime) listings"""
+
+    def __init__(self, directory, interval=POLL_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self.listing = self._list()
+
+    def _list(self):
+        listing = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    listing[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return listing
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        listing = self._list()
+        names = {name for name, state in listing.items() if self.listing.get(name) != state}
+        self.listing = listing
+        return names
+
+    def close(self):
+        pass
+
+
+def open_watcher(directory, polling=False):
+    """inotify where available, otherwise (or when asked) a polling watcher"""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling {directory} instead")
+    return PollingWatcher(directory)
+
+
+def export_source(filename, config):
+    """'canvas' or 'codepath' for an export of the configured course, otherwise None"""
+    if config.get("CanvasCsvPattern") and is_snapshot_of(filename, config["CanvasCsvPattern"]):
+        return "canvas"
+    if config.get("CodepathCsvPattern") and is_snapshot_of(filename, config["CodepathCsvPattern"]):
+        return "codepath"
+    return None
+
+
+def run_once(base_dir, config, options, sources=None, previous=None):
+    """One pipeline run for the steps affected by sources (all steps when None); returns its context"""
+    start = time.perf_counter()
+    context = PipelineContext(base_dir, config=config, options=options)
+    context.recorder = RunRecorder(config["CanvasCsvPattern"])
+    # Keep only one run back in memory
+    if previous is not None:
+        previous.previous = None
+    context.previous = previous
+    results = run_steps(context, sources=sources)
+    seconds = time.perf_counter() - start
+    record = write_run_record(context)
+    statuses = ", ".join(f"{result['step']} {result['status']}" for result in results)
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Run finished in {seconds:.2f}s ({statuses}); "
+          f"run record {os.path.basename(record)}")
+    return context
+
+
+def watch(base_dir, options=None, settle=SETTLE_SECONDS, polling=False):
+    """Run the pipeline, then re-run the affected steps whenever new exports settle in data/"""
+    data_dir = os.path.join(base_dir, "data")
+    config_path = os.path.join(base_dir, "config.json")
+    config_state = snapshot_key(config_path)
+    config = load_config(base_dir)
+
+    watcher = open_watcher(data_dir, polling)
+    print(f"Watching {data_dir} with {type(watcher).__name__} (Ctrl-C to stop)")
+    context = run_once(base_dir, config, options)
+
+    # filename -> (size, mtime) when last seen and when it last changed
+    pending = {}
+    try:
+        while True:
+            for name in watcher.wait(settle if pending else POLL_SECONDS):
+                pending[name] = (snapshot_key(os.path.join(data_dir, name)), time.monotonic())
+
+            # A file is ready once its size and mtime have not changed for the settle time
+            now = time.monotonic()
+            ready = []
+            for name, (state, since) in list(pending.items()):
+                current = snapshot_key(os.path.join(data_dir, name))
+                if current != state:
+                    pending[name] = (current, now)
+                elif now - since >= settle:
+                    del pending[name]
+                    if current is not None:
+                        ready.append(name)
+            if not ready:
+                continue
+
+            if snapshot_key(config_path) != config_state:
+                config_state = snapshot_key(config_path)
+                config = load_config(base_dir)
+                print("config.json changed; reloaded it")
+            exports = sorted(name for name in ready if export_source(name, config))
+            if not exports:
+                continue
+            sources = {export_source(name, config) for name in exports}
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] New export(s): {', '.join(exports)}")
+            context = run_once(base_dir, config, options, sources, previous=context)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmarks for the grade pipeline.
+
+Generates synthetic Canvas/Codepath exports for each requested roster size
+(reused from --workdir when they already exist) and times each stage:
+header stripping, the roster join, step 1, compare_grades,
+find_missing_submissions, the full 0-updater.py pipeline and pushing the
+changed grades to a local mock Canvas API.
+
+    python3 run_benchmarks.py                          # 1k, 10k and 100k students
+    python3 run_benchmarks.py --sizes 1000,1000000     # include the 1M run
+    python3 run_benchmarks.py --stages join,compare --json results.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from grade_importer.benchmark import STAGES, format_results, run_stage
+from grade_importer.synthetic import generate_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the grade pipeline on synthetic data")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated student counts (default: 1000,10000,100000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--assignments", type=int, default=8, help="assignments per course (default: 8)")
+    parser.add_argument("--preamble", type=int, default=5,
+                        help="junk lines before the Codepath header row (default: 5)")
+    parser.add_argument("--workdir", help="where datasets are generated and kept (default: a temporary directory)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    stages = [stage for stage in STAGES if stage in args.stages.split(",")]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="grade-bench-")
+    print(f"Datasets in: {workdir}")
+
+    results = []
+    for students in sizes:
+        base_dir = os.path.join(workdir, f"students-{students}-assignments-{args.assignments}")
+        if not os.path.exists(os.path.join(base_dir, "config.json")):
+            print(f"Generating {students} students...")
+            generate_dataset(base_dir, students=students, assignments=args.assignments,
+                             preamble_lines=args.preamble)
+        for stage in stages:
+            result = run_stage(stage, base_dir)
+            result["students"] = students
+            results.append(result)
+            print(format_results([result])[-1])
+
+    print()
+    for line in format_results(results):
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Grade cell normalization (grade_importer/grade_values.py): each status
+classify() tells apart, the points-possible rescaling and the text the
+updater writes to Canvas.
+"""
+
+import math
+import unittest
+
+from grade_importer.grade_values import (
+    BLANK, EXCUSED, FRACTION, INVALID, MISSING, NUMERIC, PERCENT,
+    classify, format_score, normalize_column, normalize_value, points_possible,
+)
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_numeric(self):
+        self.assertEqual(classify("8"), (NUMERIC, 8.0, None))
+        self.assertEqual(classify("8.5"), (NUMERIC, 8.5, None))
+        self.assertEqual(classify(".5"), (NUMERIC, 0.5, None))
+        self.assertEqual(classify("-1"), (NUMERIC, -1.0, None))
+        self.assertEqual(classify("8 pts"), (NUMERIC, 8.0, None))
+        self.assertEqual(classify("8 Points"), (NUMERIC, 8.0, None))
+
+    def test_fraction(self):
+        self.assertEqual(classify("8/10"), (FRACTION, 8.0, 10.0))
+        self.assertEqual(classify("8 / 20"), (FRACTION, 8.0, 20.0))
+        # Nothing to scale by
+        self.assertEqual(classify("8/0"), (INVALID, None, None))
+
+    def test_percent(self):
+        self.assertEqual(classify("80%"), (PERCENT, 80.0, None))
+        self.assertEqual(classify("92.5 %"), (PERCENT, 92.5, None))
+
+    def test_blank(self):
+        self.assertEqual(classify(""), (BLANK, None, None))
+
+    def test_excused(self):
+        for text in ("EX", "ex", "Excused"):
+            self.assertEqual(classify(text), (EXCUSED, None, None), text)
+
+    def test_missing(self):
+        for text in ("Missing", "MI", "-", "Not Submitted"):
+            self.assertEqual(classify(text), (MISSING, None, None), text)
+
+    def test_invalid(self):
+        for text in ("abc", "8/", "8 out of 10", "%", "1.2.3"):
+            self.assertEqual(classify(text), (INVALID, None, None), text)
+
+
+class NormalizeValueTest(unittest.TestCase):
+
+    def assert_normalized(self, raw, points, value, status, text):
+        actual_value, actual_status, actual_text = normalize_value(raw, points)
+        if math.isnan(value):
+            self.assertTrue(math.isnan(actual_value), (raw, actual_value))
+        else:
+            self.assertAlmostEqual(actual_value, value)
+        self.assertEqual((actual_status, actual_text), (status, text), raw)
+
+    def test_numeric(self):
+        self.assert_normalized(" 8 ", 10, 8.0, NUMERIC, "8")
+        self.assert_normalized("7 pts", None, 7.0, NUMERIC, "7")
+        self.assert_normalized("9.50", None, 9.5, NUMERIC, "9.5")
+        self.assert_normalized(8, None, 8.0, NUMERIC, "8")
+
+    def test_fraction_scaled_to_points_possible(self):
+        self.assert_normalized("8/10", 10, 8.0, FRACTION, "8")
+        self.assert_normalized("8/20", 10, 4.0, FRACTION, "4")
+        self.assert_normalized("1/3", 10, 10 / 3, FRACTION, "3.3333")
+        self.assert_normalized("9/10", 5, 4.5, FRACTION, "4.5")
+        # Points unknown: the numerator
+        self.assert_normalized("8/20", None, 8.0, FRACTION, "8")
+
+    def test_percent_of_points_possible(self):
+        self.assert_normalized("80%", 10, 8.0, PERCENT, "8")
+        self.assert_normalized("75%", 20, 15.0, PERCENT, "15")
+        # A share of unknown points is unreadable and goes to Canvas unchanged
+        self.assert_normalized("80%", None, math.nan, INVALID, "80%")
+
+    def test_no_score(self):
+        self.assert_normalized("", 10, math.nan, BLANK, "")
+        self.assert_normalized(None, 10, math.nan, BLANK, "")
+        self.assert_normalized(" EX ", 10, math.nan, EXCUSED, "EX")
+        self.assert_normalized("Excused", None, math.nan, EXCUSED, "EX")
+        self.assert_normalized("Missing", 10, math.nan, MISSING, "")
+        self.assert_normalized("abc", 10, math.nan, INVALID, "abc")
+        self.assert_normalized("8/0", 10, math.nan, INVALID, "8/0")
+
+    def test_blank_value(self):
+        self.assertEqual(normalize_value("", blank=0.0), (0.0, BLANK, ""))
+
+    def test_format_score(self):
+        self.assertEqual(format_score(8.0), "8")
+        self.assertEqual(format_score(8.25), "8.25")
+        self.assertEqual(format_score(2 / 3), "0.6667")
+        self.assertEqual(format_score(-0.0), "0")
+        self.assertEqual(format_score(-0.00001), "0")
+
+
+class NormalizeColumnTest(unittest.TestCase):
+
+    def test_column(self):
+        column = normalize_column(["8", "", "0", "Missing", "EX", "8/20", "80%", "abc", "8"], 10)
+        self.assertEqual(len(column), 9)
+        self.assertEqual(list(column.status),
+                         [NUMERIC, BLANK, NUMERIC, MISSING, EXCUSED, FRACTION, PERCENT, INVALID, NUMERIC])
+        self.assertEqual(column.texts, ["8", "", "0", "", "EX", "4", "8", "abc", "8"])
+        self.assertEqual([value for value in column.values if value == value], [8.0, 0.0, 4.0, 8.0, 8.0])
+        # Blank, missing and 0 are not submitted; excused and unreadable cells are
+        self.assertEqual(list(column.unsubmitted), [0, 1, 1, 1, 0, 0, 0, 0, 0])
+        self.assertEqual([column.is_unsubmitted(i) for i in range(len(column))],
+                         [bool(flag) for flag in column.unsubmitted])
+        self.assertEqual([column.is_zero(i) for i in range(len(column))],
+                         [False, False, True, False, False, False, False, False, False])
+        self.assertEqual(column.counts(), {"numeric": 3, "blank": 1, "missing": 1, "excused": 1,
+                                           "fraction": 1, "percent": 1, "invalid": 1})
+
+    def test_matches_normalize_value(self):
+        raw_values = ["8/10", "80%", None, "EX", "7"]
+        for points in (None, 20):
+            column = normalize_column(iter(raw_values), points)
+            for i, raw in enumerate(raw_values):
+                value, status, text = normalize_value(raw, points)
+                self.assertEqual((column.status[i], column.texts[i]), (status, text))
+                self.assertTrue(column.values[i] == value or (math.isnan(value) and math.isnan(column.values[i])))
+
+    def test_points_possible(self):
+        rows = [
+            {"Student": "    Points Possible", "Proj-1": "10", "Proj-2": "", "Proj-3": "0", "Proj-4": "read only"},
+            {"Student": "Student 0", "Proj-1": "8", "Proj-2": "9", "Proj-3": "1", "Proj-4": "2"},
+        ]
+        self.assertEqual(points_possible(rows, ["Proj-1", "Proj-2", "Proj-3", "Proj-4"]), {"Proj-1": 10.0})
+        self.assertEqual(points_possible(rows[1:], ["Proj-1"]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Incremental updater runs (grade_importer/incremental.py): unchanged students
+reuse the stored outcome, changed rows are recomputed, and a different mapping,
+points possible or state version sends every student through again.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from grade_importer import updater
+from grade_importer.context import PipelineContext
+from grade_importer.incremental import STATE_VERSION, state_path
+from grade_importer.manifest import open_manifest
+
+CONFIG = {
+    "CanvasCsvPattern": "Canvas-COP4808",
+    "CodepathCsvPattern": "Codepath-COP4808",
+    "HeadersToLookFor": ["Member ID", "Full Name"],
+    "ColumnMapping": {
+        "Email": "Email",
+        "Status": "Status",
+        "SIS Login ID": "SIS Login ID",
+        "Assignments": {"Proj-1 (1)": "ASN - 1 Points", "Proj-2 (2)": "ASN - 2 Points"},
+    },
+}
+CANVAS_HEADER = "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1),Proj-2 (2)\n"
+CANVAS_STUDENTS = ("Student 0,1,x,s0@fau.edu,COP4808-001,,\n"
+                   "Student 1,2,x,s1@fau.edu,COP4808-001,,\n"
+                   "Student 2,3,x,s2@fau.edu,COP4808-001,,\n")
+CODEPATH_HEADER = ",Member ID,Full Name,Email,Status,ASN - 1 Points,ASN - 2 Points\n"
+CODEPATH_STUDENTS = (",0,Student 0,s0@fau.edu,Active,8/10,9\n"
+                     ",1,Student 1,s1@fau.edu,Active,7,6\n"
+                     ",2,Student 2,s2@fau.edu,Active,5/10,0\n")
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        self.data_dir = os.path.join(self.base_dir, "data")
+        os.mkdir(self.data_dir)
+        self.write_config(CONFIG)
+        self.write_export("2025-10-20T2058_Canvas-COP4808.csv",
+                          CANVAS_HEADER + "    Points Possible,,,,,10,10\n" + CANVAS_STUDENTS)
+        self.write_export("2025-10-20T2058_Codepath-COP4808.csv", CODEPATH_HEADER + CODEPATH_STUDENTS)
+        self.state_path = state_path(self.data_dir, CONFIG["CanvasCsvPattern"])
+
+    def write_config(self, config):
+        with open(os.path.join(self.base_dir, "config.json"), "w") as config_file:
+            json.dump(config, config_file)
+
+    def write_export(self, filename, text):
+        with open(os.path.join(self.data_dir, filename), "w") as export_file:
+            export_file.write(text)
+        # The manifest is refreshed once per thread; a pipeline run's steps get fresh threads
+        open_manifest(self.data_dir).refresh()
+
+    def run_incremental(self):
+        """(printed output, -updated.csv rows, -changed.csv rows) of an incremental run"""
+        context = PipelineContext(self.base_dir)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            updater.main(context, incremental=True)
+        updated_path = context.paths["updated_csv"]
+        with open(updated_path) as updated_file:
+            updated = updated_file.read().splitlines()[1:]
+        with open(updated_path.replace("-updated.csv", "-changed.csv")) as changed_file:
+            changed = changed_file.read().splitlines()[1:]
+        return output.getvalue(), updated, changed
+
+    def load_state(self):
+        with open(self.state_path) as state_file:
+            return json.load(state_file)
+
+    def save_state(self, state):
+        with open(self.state_path, "w") as state_file:
+            json.dump(state, state_file)
+
+    def test_unchanged_rerun_keeps_prior_grades(self):
+        output, updated, changed = self.run_incremental()
+        self.assertIn("Incremental: 3 of 3", output)
+        self.assertEqual(updated, [
+            "Student 0,1,x,s0@fau.edu,COP4808-001,8,9",
+            "Student 1,2,x,s1@fau.edu,COP4808-001,7,6",
+            "Student 2,3,x,s2@fau.edu,COP4808-001,5,0",
+        ])
+        self.assertEqual(changed, updated)
+
+        output, rerun, changed = self.run_incremental()
+        self.assertIn("Incremental: 0 of 3", output)
+        self.assertEqual(rerun, updated)
+        self.assertEqual(changed, [])
+
+        # An unchanged student's grades come from the state, not from its Codepath row
+        state = self.load_state()
+        state["students"]["s1@fau.edu"]["grades"]["Proj-1 (1)"] = "6.5"
+        self.save_state(state)
+        _, rerun, changed = self.run_incremental()
+        self.assertEqual(rerun[1], "Student 1,2,x,s1@fau.edu,COP4808-001,6.5,6")
+        self.assertEqual(changed, [])
+
+    def test_changed_row_is_recomputed(self):
+        self.run_incremental()
+        self.write_export("2025-10-21T0900_Codepath-COP4808.csv", CODEPATH_HEADER + CODEPATH_STUDENTS.replace(
+            ",1,Student 1,s1@fau.edu,Active,7,6", ",1,Student 1,s1@fau.edu,Active,7,10"))
+        output, updated, changed = self.run_incremental()
+        self.assertIn("Incremental: 1 of 3", output)
+        self.assertEqual(changed, ["Student 1,2,x,s1@fau.edu,COP4808-001,7,10"])
+        self.assertEqual(updated[1], "Student 1,2,x,s1@fau.edu,COP4808-001,7,10")
+        # The unchanged student's 0 on the last project is still reported
+        self.assertIn("Total students with 0 on the last project: 1", output)
+        self.assertIn("  - Student 2 (s2@fau.edu)", output)
+        self.assertEqual(self.load_state()["students"]["s1@fau.edu"]["grades"],
+                         {"Proj-1 (1)": "7", "Proj-2 (2)": "10"})
+
+    def test_mapping_change_recomputes_everyone(self):
+        self.run_incremental()
+        config = json.loads(json.dumps(CONFIG))
+        # The same Codepath columns, so each row's fingerprint is the same; only the mapping differs
+        config["ColumnMapping"]["Assignments"] = {"Proj-2 (2)": "ASN - 1 Points", "Proj-1 (1)": "ASN - 2 Points"}
+        self.write_config(config)
+        output, updated, changed = self.run_incremental()
+        self.assertIn("Column mapping or points possible changed", output)
+        self.assertIn("Incremental: 3 of 3", output)
+        self.assertEqual(updated[0], "Student 0,1,x,s0@fau.edu,COP4808-001,9,8")
+        self.assertEqual(changed, updated)
+
+    def test_points_change_recomputes_everyone(self):
+        _, updated, _ = self.run_incremental()
+        self.assertEqual(updated[0], "Student 0,1,x,s0@fau.edu,COP4808-001,8,9")
+        # The Codepath rows are the same, but "8/10" and "5/10" now scale to 20 points
+        self.write_export("2025-10-21T0900_Canvas-COP4808.csv",
+                          CANVAS_HEADER + "    Points Possible,,,,,20,20\n" + CANVAS_STUDENTS)
+        output, updated, changed = self.run_incremental()
+        self.assertIn("Column mapping or points possible changed", output)
+        self.assertIn("Incremental: 3 of 3", output)
+        self.assertEqual(updated[0], "Student 0,1,x,s0@fau.edu,COP4808-001,16,9")
+        self.assertEqual(updated[2], "Student 2,3,x,s2@fau.edu,COP4808-001,10,0")
+        self.assertEqual(changed, updated)
+
+    def test_version_mismatch_recomputes_everyone(self):
+        self.run_incremental()
+        state = self.load_state()
+        self.assertEqual(state["version"], STATE_VERSION)
+        state["version"] = STATE_VERSION - 1
+        self.save_state(state)
+        output, updated, changed = self.run_incremental()
+        self.assertIn(f"Incremental state is version {STATE_VERSION - 1}, expected {STATE_VERSION}", output)
+        self.assertNotIn("Column mapping", output)
+        self.assertIn("Incremental: 3 of 3", output)
+        self.assertEqual(changed, updated)
+        self.assertEqual(self.load_state()["version"], STATE_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+grade-importer fetch against the local mock Canvas (grade_importer/mock_canvas.py):
+the canvas and http sources, retries through the server's injected failures,
+the Canvas file redirect, connection reuse and the snapshot naming.
+"""
+
+import asyncio
+import functools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from grade_importer.async_http import AsyncHttpClient
+from grade_importer.ingest import HttpSource, fetch_all, fetch_export
+from grade_importer.manifest import record_snapshots
+from grade_importer.mock_canvas import start_mock_canvas
+
+CANVAS_EXPORT = "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1)\n" \
+                "    Points Possible,,,,,10\n" \
+                "Student 0,1,x,s0@fau.edu,COP4808-001,8\n"
+CODEPATH_EXPORT = ",Member ID,Full Name,Email,Status,ASN - 1 Points\n,0,Student 0,s0@fau.edu,Active,8\n"
+
+
+class FetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.exports_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.exports_dir)
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        with open(os.path.join(self.exports_dir, "gradebook-101.csv"), "w") as export_file:
+            export_file.write(CANVAS_EXPORT)
+        with open(os.path.join(self.exports_dir, "Codepath-CAP-4104.csv"), "w") as export_file:
+            export_file.write(CODEPATH_EXPORT)
+        self.start_server()
+        # Any token will do for the mock; poll the export job quickly instead of every half second
+        for patcher in (mock.patch.dict(os.environ, {"CANVAS_API_TOKEN": "test-token"}),
+                        mock.patch("grade_importer.ingest.POLL_SECONDS", 0.01)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.config = {
+            "Ingest": {
+                "Canvas": {"Source": "canvas", "BaseUrl": self.server.url},
+                "Codepath": {"Source": "http", "Url": self.server.url + "/exports/{pattern}.csv"},
+            },
+            "Courses": [
+                {"Name": "CAP-4104", "CanvasCsvPattern": "Canvas-CAP-4104",
+                 "CodepathCsvPattern": "Codepath-CAP-4104", "CanvasApi": {"CourseId": "101"}},
+                # No gradebook or Codepath export on the server
+                {"Name": "COP-9999", "CanvasCsvPattern": "Canvas-COP-9999",
+                 "CodepathCsvPattern": "Codepath-COP-9999", "CanvasApi": {"CourseId": "999"}},
+            ],
+        }
+
+    def start_server(self, fail_every=0):
+        if hasattr(self, "server"):
+            self.server.shutdown()
+            self.server.server_close()
+        self.server = start_mock_canvas(exports_dir=self.exports_dir, job_seconds=0.01, fail_every=fail_every)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def fetch(self, **options):
+        results, client = asyncio.run(fetch_all(self.config, self.data_dir, **options))
+        by_key = {(result["course"], result["kind"]): result for result in results}
+        return by_key, client
+
+    def test_fetch_then_unchanged(self):
+        results, client = self.fetch()
+        canvas = results[("CAP-4104", "canvas")]
+        codepath = results[("CAP-4104", "codepath")]
+        self.assertEqual(canvas["status"], "fetched", canvas.get("error"))
+        self.assertEqual(codepath["status"], "fetched", codepath.get("error"))
+        self.assertEqual(results[("COP-9999", "canvas")]["status"], "failed")
+        self.assertEqual(results[("COP-9999", "codepath")]["status"], "failed")
+
+        # Renamed to <timestamp>_<Pattern>.csv with the served content, no temporary file left
+        self.assertRegex(os.path.basename(canvas["path"]), r"^\d{4}-\d{2}-\d{2}T\d{4}_Canvas-CAP-4104\.csv$")
+        self.assertRegex(os.path.basename(codepath["path"]), r"^\d{4}-\d{2}-\d{2}T\d{4}_Codepath-CAP-4104\.csv$")
+        with open(canvas["path"]) as fetched:
+            self.assertEqual(fetched.read(), CANVAS_EXPORT)
+        with open(codepath["path"]) as fetched:
+            self.assertEqual(fetched.read(), CODEPATH_EXPORT)
+        self.assertEqual(sorted(os.listdir(self.data_dir)),
+                         sorted([os.path.basename(canvas["path"]), os.path.basename(codepath["path"]),
+                                 ".manifest.sqlite3"]))
+
+        # Requests to the server reuse pooled keep-alive connections
+        self.assertEqual(client.requests, self.server.requests)
+        self.assertEqual(client.connections, self.server.connections)
+        self.assertLess(client.connections, client.requests)
+
+        record_snapshots(self.data_dir, canvas["path"], codepath["path"])
+        results, _ = self.fetch()
+        self.assertEqual(results[("CAP-4104", "canvas")]["status"], "unchanged")
+        self.assertEqual(results[("CAP-4104", "canvas")]["path"], canvas["path"])
+        self.assertEqual(results[("CAP-4104", "codepath")]["status"], "unchanged")
+        self.assertEqual(len(os.listdir(self.data_dir)), 3)
+
+    def test_retries_and_redirect(self):
+        # One course's Canvas export runs its requests one after another, so with every
+        # 4th request failing with a 503 and every 4th + 1 with a 429 each request
+        # fails at most twice and the client's retries carry it through
+        self.start_server(fail_every=4)
+        self.config["Ingest"]["Canvas"]["BaseUrl"] = self.server.url
+        # Retry after the 429's Retry-After, or almost at once after a 503
+        with mock.patch("grade_importer.ingest.AsyncHttpClient", functools.partial(AsyncHttpClient, backoff=0.01)):
+            results, client = self.fetch(courses=["CAP-4104"], kinds=("canvas",))
+        canvas = results[("CAP-4104", "canvas")]
+        self.assertEqual(canvas["status"], "fetched", canvas.get("error"))
+        with open(canvas["path"]) as fetched:
+            self.assertEqual(fetched.read(), CANVAS_EXPORT)
+        # Export, progress, file, redirected download and the export itself, plus the failures
+        self.assertGreaterEqual(self.server.requests, 7)
+        self.assertEqual(client.requests, self.server.requests)
+        self.assertEqual(client.connections, self.server.connections)
+        self.assertLess(client.connections, client.requests)
+
+    def test_same_minute_is_skipped(self):
+        course = self.config["Courses"][0]
+        source = HttpSource(self.config["Ingest"]["Codepath"])
+        timestamp = "2025-11-17T0922"
+
+        async def fetch():
+            client = AsyncHttpClient()
+            try:
+                return await fetch_export(client, source, course, "codepath", self.data_dir, timestamp)
+            finally:
+                client.close()
+
+        first = asyncio.run(fetch())
+        self.assertEqual(first["status"], "fetched", first.get("error"))
+        record_snapshots(self.data_dir, first["path"])
+
+        # A different export within the same minute must not replace the first
+        with open(os.path.join(self.exports_dir, "Codepath-CAP-4104.csv"), "a") as export_file:
+            export_file.write(",1,Student 1,s1@fau.edu,Active,9\n")
+        second = asyncio.run(fetch())
+        self.assertEqual(second["status"], "skipped")
+        self.assertEqual(second["path"], first["path"])
+        with open(first["path"]) as fetched:
+            self.assertEqual(fetched.read(), CODEPATH_EXPORT)
+        self.assertEqual(sorted(os.listdir(self.data_dir)),
+                         sorted([os.path.basename(first["path"]), ".manifest.sqlite3"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
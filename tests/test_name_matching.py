@@ -0,0 +1,128 @@
+"""
+Roster name matching (grade_importer/name_matching.py) and how the completers
+check (grade_importer/completers.py) reports each kind of match.
+"""
+
+import contextlib
+import csv
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from grade_importer import completers
+from grade_importer.context import PipelineContext
+from grade_importer.name_matching import NameIndex, name_similarity, normalize_name, soundex
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_accents_case_punctuation_and_order(self):
+        self.assertEqual(normalize_name("José  García-López"), "garcia jose lopez")
+        self.assertEqual(normalize_name("GARCIA LOPEZ, Jose"), "garcia jose lopez")
+        self.assertEqual(normalize_name("jose garcia lopez"), "garcia jose lopez")
+
+    def test_soundex(self):
+        self.assertEqual(soundex("robert"), "r163")
+        self.assertEqual(soundex("rupert"), "r163")
+        self.assertEqual(soundex("ashcraft"), "a261")
+        self.assertEqual(soundex("lee"), "l000")
+
+    def test_similarity(self):
+        self.assertEqual(name_similarity("garcia jose", "garcia jose"), 1.0)
+        # A missing middle name costs 5%
+        self.assertAlmostEqual(name_similarity("garcia jose", "garcia jose maria"), 0.95)
+        # A lone name against a full one says nothing
+        self.assertEqual(name_similarity("smith", "ana smith"), 0.0)
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def test_exact_after_normalizing(self):
+        index = NameIndex(["José García-López", "Ana Smith"])
+        for name in ("GARCIA LOPEZ, Jose", "jose garcia lopez", "López García José"):
+            match = index.match(name)
+            self.assertEqual((match.key, match.confidence, match.method), ("José García-López", 1.0, "exact"))
+
+    def test_middle_name_is_fuzzy(self):
+        index = NameIndex(["Jose Maria Garcia"])
+        match = index.match("Jose Garcia")
+        self.assertEqual((match.key, match.method), ("Jose Maria Garcia", "fuzzy"))
+        self.assertAlmostEqual(match.confidence, 0.95)
+        match = NameIndex(["Jose Garcia"]).match("José María García")
+        self.assertEqual((match.key, match.method), ("Jose Garcia", "fuzzy"))
+
+    def test_similar_names_are_only_fuzzy(self):
+        # Different people with close spellings score above MIN_CONFIDENCE, so they
+        # come back as fuzzy matches for a person to check, never as exact ones
+        index = NameIndex(["Daniel Lee", "Maria Garcia"])
+        match = index.match("Danielle Lee")
+        self.assertEqual((match.key, match.method), ("Daniel Lee", "fuzzy"))
+        self.assertLess(match.confidence, 1.0)
+        match = index.match("Mario Garcia")
+        self.assertEqual((match.key, match.method), ("Maria Garcia", "fuzzy"))
+        self.assertLess(match.confidence, 1.0)
+
+    def test_no_match(self):
+        index = NameIndex(["Daniel Lee", "Ana Smith"])
+        self.assertIsNone(index.match("Bob Jones"))
+        self.assertIsNone(index.match("Smith"))
+        self.assertIsNone(index.match(""))
+        self.assertIsNone(index.match("Danielle Lee", min_confidence=0.95))
+
+    def test_email_first_then_name(self):
+        index = NameIndex(["Ana Smith", "Daniel Lee"], {"Ana Smith": "ana@fau.edu", "Daniel Lee": ""})
+        # The email wins over a different name, ignoring case and spaces
+        match = index.match("Ana Smith-Jones", " ANA@fau.edu")
+        self.assertEqual((match.key, match.confidence, match.method), ("Ana Smith", 1.0, "email"))
+        # An email the roster doesn't have falls back to the name
+        self.assertEqual(index.match("Ana Smith", "other@fau.edu").method, "exact")
+        self.assertEqual(index.match("Daniel Lee", "dlee@fau.edu").method, "exact")
+        self.assertIsNone(index.match("Bob Jones", "dlee@fau.edu"))
+
+
+class CompletersTest(unittest.TestCase):
+
+    def test_fuzzy_matches_need_review(self):
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+        data_dir = os.path.join(base_dir, "data")
+        os.mkdir(data_dir)
+        config = {"CodepathCsvPattern": "Codepath-COP4808", "HeadersToLookFor": ["Member ID", "Full Name"]}
+        with open(os.path.join(data_dir, "2025-10-20T2058_Codepath-COP4808.csv"), "w") as export_file:
+            export_file.write(",Member ID,Full Name,Email,Status,CodePath Certificate Status\n"
+                              ",0,Ana Smith,ana@fau.edu,Active,\n"
+                              ",1,Daniel Lee,dlee@fau.edu,Active,\n"
+                              ",2,Maria Garcia,mgarcia@fau.edu,Active,\n"
+                              ",3,José López,jlopez@fau.edu,Active,\n"
+                              ",4,Bob Jones,bjones@fau.edu,Active,Dropped\n")
+        with open(os.path.join(data_dir, "CodePath_Completers_with_Selections.csv"), "w") as completers_file:
+            completers_file.write("Name,Email\n"
+                                  "Ana S.,ana@fau.edu\n"
+                                  "Lopez Jose,\n"
+                                  "Danielle Lee,danielle@fau.edu\n"
+                                  "Mario Garcia,\n"
+                                  "Bob Jones,bjones@fau.edu\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            completers.main(PipelineContext(base_dir, config))
+
+        with open(os.path.join(base_dir, "codepath_completers_comparison.csv"), newline="") as output_file:
+            rows = {row["Student Name"]: row for row in csv.DictReader(output_file)}
+        self.assertEqual({name: row["In CodePath Roster"] for name, row in rows.items()}, {
+            "Ana S.": "Yes",
+            "Lopez Jose": "Yes",
+            "Danielle Lee": "Needs review",
+            "Mario Garcia": "Needs review",
+            # Dropped students aren't in the roster
+            "Bob Jones": "No",
+        })
+        self.assertEqual((rows["Ana S."]["Roster Name"], rows["Ana S."]["Matched By"]), ("Ana Smith", "email"))
+        self.assertEqual(rows["Lopez Jose"]["Matched By"], "exact")
+        self.assertEqual((rows["Danielle Lee"]["Roster Name"], rows["Danielle Lee"]["Matched By"]),
+                         ("Daniel Lee", "fuzzy"))
+
+
+if __name__ == "__main__":
+    unittest.main()
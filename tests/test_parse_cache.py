@@ -0,0 +1,102 @@
+"""
+The parse cache (grade_importer/parse_cache.py): least recently used entries
+are evicted past max_bytes, entries larger than the cap are never written and
+the path index forgets files that are gone.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from grade_importer.parse_cache import ParseCache, read_rows
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.cache_dir = os.path.join(self.data_dir, ".cache", "parsed")
+
+    def write_csv(self, name, students):
+        path = os.path.join(self.data_dir, name)
+        with open(path, "w") as csv_file:
+            csv_file.write("Student,Proj-1\n" + "".join(f"{name} {i},{i % 11}\n" for i in range(students)))
+        return path
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".bin"))
+
+    def entry_path(self, cache, path):
+        return cache._entry_path("rows", cache.digest(path), ())
+
+    def test_rows_and_matrix_from_the_cache(self):
+        path = self.write_csv("a.csv", 20)
+        cache = ParseCache(self.cache_dir)
+        self.assertEqual(cache.rows(path), read_rows(path))
+        self.assertEqual(cache.rows(path), read_rows(path))
+        matrix = cache.grade_matrix(path, ["Proj-1"])
+        cached = cache.grade_matrix(path, ["Proj-1"])
+        self.assertEqual((cached.students, cached.columns), (matrix.students, matrix.columns))
+        self.assertEqual([list(values) for values in cached.data], [list(values) for values in matrix.data])
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_least_recently_used_are_evicted(self):
+        paths = [self.write_csv(f"{name}.csv", 40) for name in ("a", "b", "c")]
+        cache = ParseCache(self.cache_dir)
+        cache.rows(paths[0])
+        size = os.path.getsize(self.entry_path(cache, paths[0]))
+        # Room for two entries, not three
+        cache.max_bytes = size * 2 + size // 2
+
+        cache.rows(paths[1])
+        a, b = self.entry_path(cache, paths[0]), self.entry_path(cache, paths[1])
+        os.utime(a, ns=(1_000_000_000, 1_000_000_000))
+        os.utime(b, ns=(2_000_000_000, 2_000_000_000))
+        # Reading a marks it as used now, so b is the least recently used
+        cache.rows(paths[0])
+        cache.rows(paths[2])
+
+        c = self.entry_path(cache, paths[2])
+        self.assertEqual(self.entries(), sorted(os.path.basename(entry) for entry in (a, c)))
+        self.assertFalse(os.path.exists(b))
+
+    def test_oversized_entries_are_not_written(self):
+        small = self.write_csv("small.csv", 3)
+        large = self.write_csv("large.csv", 500)
+        cache = ParseCache(self.cache_dir)
+        cache.rows(small)
+        cache.max_bytes = os.path.getsize(self.entry_path(cache, small)) * 4
+
+        self.assertEqual(cache.rows(large), read_rows(large))
+        self.assertFalse(os.path.exists(self.entry_path(cache, large)))
+        # The small entry wasn't evicted to make room for it
+        self.assertEqual(self.entries(), [os.path.basename(self.entry_path(cache, small))])
+        self.assertEqual(cache.rows(large), read_rows(large))
+
+    def test_index_forgets_deleted_files(self):
+        kept = self.write_csv("kept.csv", 3)
+        gone = self.write_csv("gone.csv", 3)
+        cache = ParseCache(self.cache_dir)
+        cache.rows(kept)
+        cache.rows(gone)
+        self.assertEqual(set(cache.index), {kept, gone})
+
+        os.remove(gone)
+        # The index is saved when a file is hashed
+        cache.rows(self.write_csv("new.csv", 3))
+        self.assertNotIn(gone, cache.index)
+        self.assertEqual(set(ParseCache(self.cache_dir).index), {kept, os.path.join(self.data_dir, "new.csv")})
+
+    def test_changed_file_is_rehashed(self):
+        path = self.write_csv("a.csv", 3)
+        cache = ParseCache(self.cache_dir)
+        cache.rows(path)
+        self.write_csv("a.csv", 4)
+        os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+        self.assertEqual(len(cache.rows(path)[1]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+grade-importer push against the local mock Canvas (grade_importer/mock_canvas.py):
+bulk updates through injected 503/429 answers, Retry-After, connection reuse
+and the grades Canvas ends up with.
+"""
+
+import time
+import unittest
+
+from grade_importer.canvas_api import CanvasClient
+from grade_importer.mapping import compile_mapping
+from grade_importer.mock_canvas import start_mock_canvas
+from grade_importer.push import changed_grades, push_grades
+
+COURSE_ID = "101"
+RETRY_AFTER_SECONDS = 0.05
+
+
+def make_changes(assignments=2, students=25):
+    return {
+        str(1000 + a): {str(u): str((u + a) % 11) for u in range(students)}
+        for a in range(assignments)
+    }
+
+
+class PushTest(unittest.TestCase):
+
+    def start(self, **options):
+        server = start_mock_canvas(job_seconds=0.01, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = CanvasClient(server.url, "test-token", backoff=0.01)
+        self.addCleanup(client.close)
+        return server, client
+
+    def assert_pushed(self, server, changes, results):
+        self.assertTrue(all(state == "completed" for _, _, state, _ in results), results)
+        self.assertEqual(sum(students for _, students, _, _ in results),
+                         sum(len(grades) for grades in changes.values()))
+        self.assertEqual(server.grades, {
+            (COURSE_ID, assignment_id, user_id): grade
+            for assignment_id, grades in changes.items()
+            for user_id, grade in grades.items()
+        })
+
+    def test_retries_through_failures(self):
+        # One worker sends its requests one after another, so with every 5th request
+        # failing with a 503 and every 5th + 1 with a 429 (Retry-After 0.05s) a request
+        # fails at most twice, well within the client's retries
+        server, client = self.start(fail_every=5)
+        changes = make_changes()
+        start = time.perf_counter()
+        results = push_grades(client, COURSE_ID, changes, batch_size=10, workers=1, poll_interval=0.01)
+        seconds = time.perf_counter() - start
+
+        self.assert_pushed(server, changes, results)
+        # 6 batches: each a POST plus at least one progress poll, and the failed attempts
+        self.assertEqual(len(results), 6)
+        self.assertEqual(client.requests, server.requests)
+        failures = server.requests // 5 + (server.requests - 1) // 5
+        self.assertGreaterEqual(server.requests, 12 + failures)
+        rate_limited = (server.requests - 1) // 5
+        self.assertGreater(rate_limited, 0)
+        self.assertGreaterEqual(seconds, rate_limited * RETRY_AFTER_SECONDS)
+        # The 503s and 429s keep the connection alive: one connection carries every request
+        self.assertEqual(server.connections, 1)
+
+    def test_concurrent_batches_share_the_pool(self):
+        server, client = self.start(latency=0.005)
+        changes = make_changes(assignments=3, students=40)
+        results = push_grades(client, COURSE_ID, changes, batch_size=10, workers=4, poll_interval=0.01)
+
+        self.assert_pushed(server, changes, results)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(client.requests, server.requests)
+        self.assertLessEqual(server.connections, 4)
+        self.assertLess(server.connections, server.requests)
+
+    def test_changed_grades(self):
+        mapping = compile_mapping({"Assignments": {"Proj-1 (2001)": "ASN - 1 Points",
+                                                   "Proj-2 (2002)": "ASN - 2 Points"}})
+        canvas = [
+            {"ID": "1", "SIS Login ID": "a@fau.edu", "Proj-1 (2001)": "8", "Proj-2 (2002)": "5"},
+            {"ID": "2", "SIS Login ID": "b@fau.edu", "Proj-1 (2001)": "", "Proj-2 (2002)": "7"},
+        ]
+        updated = [
+            # "8.0" is the same grade; a blank never clears one
+            {"ID": "1", "SIS Login ID": "A@fau.edu", "Proj-1 (2001)": "8.0", "Proj-2 (2002)": "9"},
+            {"ID": "2", "SIS Login ID": "b@fau.edu", "Proj-1 (2001)": "10", "Proj-2 (2002)": ""},
+            # Not in the Canvas export
+            {"ID": "3", "SIS Login ID": "c@fau.edu", "Proj-1 (2001)": "10", "Proj-2 (2002)": "10"},
+        ]
+        self.assertEqual(changed_grades(canvas, updated, mapping), {"2002": {"1": "9"}, "2001": {"2": "10"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Submission bitmaps (grade_importer/submissions.py): every query on the
+SubmissionMatrix int bitsets must agree with the same question answered one
+student row at a time.
+"""
+
+import random
+import unittest
+
+from grade_importer.codepath_csv import codepath_snapshot
+from grade_importer.mapping import compile_mapping
+from grade_importer.submissions import SubmissionMatrix, pack_flags, set_bits
+
+ASSIGNMENTS = {
+    "Project 1: Part A (1)": "ASN - 1 Points",
+    "Project 1: Part B (2)": "ASN - 2 Points",
+    "Project 2: Maps (3)": "ASN - 3 Points",
+    # Not in the export: left out of the matrix
+    "Project 3: Chat (4)": "ASN - 4 Points",
+    "Project 4 (5)": "ASN - 5 Points",
+    "Final Project: Codepath (6)": "ASN - 9 Points",
+}
+EXPORT_COLUMNS = ["ASN - 1 Points", "ASN - 2 Points", "ASN - 3 Points", "ASN - 5 Points", "ASN - 9 Points"]
+# Blank, missing and 0 are not submitted; anything else (excused included) is
+CELLS = ["", "0", "0.0", "Missing", "8", "9/10", "EX", "10"]
+UNSUBMITTED = {"", "0", "0.0", "Missing"}
+SECTIONS = ["COP4808-001", "COP4808-002", ""]
+
+
+class BitsTest(unittest.TestCase):
+
+    def test_pack_flags(self):
+        self.assertEqual(pack_flags(b""), 0)
+        self.assertEqual(pack_flags(b"\x00\x00"), 0)
+        # Bit i is flags[i]
+        self.assertEqual(pack_flags(b"\x01\x00\x01\x01"), 0b1101)
+        self.assertEqual(pack_flags(bytearray([0] * 8 + [1])), 1 << 8)
+
+    def test_set_bits(self):
+        self.assertEqual(set_bits(0), [])
+        self.assertEqual(set_bits(0b1101), [0, 2, 3])
+        self.assertEqual(set_bits(1 << 100), [100])
+
+    def test_round_trip(self):
+        rng = random.Random(7)
+        for size in (1, 7, 8, 9, 63, 64, 65, 1000):
+            flags = bytes(rng.randint(0, 1) for _ in range(size))
+            self.assertEqual(set_bits(pack_flags(flags)), [i for i, flag in enumerate(flags) if flag], size)
+
+
+class SubmissionMatrixTest(unittest.TestCase):
+
+    def roster(self, seed, students=21):
+        """(records, sections, {student: {codepath column: cell}}) for a random roster"""
+        rng = random.Random(seed)
+        snapshot = codepath_snapshot(["", "Member ID", "Full Name", "Email", "Status"] + EXPORT_COLUMNS)
+        cells = {}
+        for i in range(students):
+            name = f"Student {i}"
+            row = {column: rng.choice(CELLS) for column in EXPORT_COLUMNS}
+            cells[name] = row
+            snapshot.append(["", str(i), name, f"s{i}@fau.edu", "Active"] + [row[column] for column in EXPORT_COLUMNS])
+        records = [(record.name, record) for record in snapshot]
+        sections = [rng.choice(SECTIONS) for _ in records]
+        return records, sections, cells
+
+    def check(self, matrix, names, sections, cells):
+        mapping = compile_mapping({"Assignments": ASSIGNMENTS})
+        columns = [(canvas, codepath, label) for canvas, codepath, label
+                   in zip(mapping.canvas_columns, mapping.codepath_columns, mapping.project_labels)
+                   if codepath in EXPORT_COLUMNS]
+        projects = list(dict.fromkeys(label for _, _, label in columns))
+        self.assertEqual(matrix.columns, [canvas for canvas, _, _ in columns])
+        self.assertEqual(matrix.projects, projects)
+        self.assertEqual(len(matrix), len(names))
+
+        # Per row: the columns and projects each student hasn't submitted
+        missed_columns = {
+            name: [canvas for canvas, codepath, _ in columns if cells[name][codepath] in UNSUBMITTED]
+            for name in names
+        }
+        missed_projects = {
+            name: [project for project in projects
+                   if any(cells[name][codepath] in UNSUBMITTED
+                          for _, codepath, label in columns if label == project)]
+            for name in names
+        }
+
+        for canvas, _, _ in columns:
+            self.assertEqual(matrix.missing(canvas), sum(canvas in missed_columns[name] for name in names), canvas)
+        self.assertEqual(matrix.missing_by_student(),
+                         {name: missed for name, missed in missed_columns.items() if missed})
+        self.assertEqual(matrix.project_stats(), {
+            project: {
+                "missing": sum(missed_columns[name].count(canvas)
+                               for name in names for canvas, _, label in columns if label == project),
+                "total": len(names) * sum(label == project for _, _, label in columns),
+            }
+            for project in projects
+        })
+        for project in projects:
+            self.assertEqual(matrix.names(matrix.project_mask(project)),
+                             [name for name in names if project in missed_projects[name]], project)
+        self.assertEqual(matrix.project_mask("No such project"), 0)
+
+        for count in range(len(projects) + 2):
+            self.assertEqual(matrix.names(matrix.missing_at_least(count)),
+                             [name for name in names if len(missed_projects[name]) >= count], count)
+            expected = [name for name in names
+                        if 0 < count <= len(projects)
+                        and all(project in missed_projects[name] for project in projects[-count:])]
+            self.assertEqual(matrix.names(matrix.missing_last(count)), expected, count)
+
+        mask = matrix.missing_at_least(1)
+        self.assertEqual(matrix.describe(mask), [
+            (name, section, missed_projects[name])
+            for name, section in zip(names, sections) if missed_projects[name]
+        ])
+
+        rates = []
+        for section in dict.fromkeys(sections):
+            members = [name for name, member_section in zip(names, sections) if member_section == section]
+            cells_total = len(members) * len(columns)
+            submitted = cells_total - sum(len(missed_columns[name]) for name in members)
+            percentage = submitted / cells_total * 100 if cells_total else 0
+            rates.append((section, len(members), submitted, cells_total, round(percentage, 1)))
+        self.assertEqual(matrix.section_rates(), rates)
+
+    def test_whole_export(self):
+        mapping = compile_mapping({"Assignments": ASSIGNMENTS})
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                records, sections, cells = self.roster(seed)
+                matrix = SubmissionMatrix.from_records(records, mapping, sections)
+                self.check(matrix, [name for name, _ in records], sections, cells)
+
+    def test_some_rows_in_another_order(self):
+        mapping = compile_mapping({"Assignments": ASSIGNMENTS})
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                records, sections, cells = self.roster(seed, students=70)
+                picked = list(zip(records, sections))[::-3]
+                records = [record for record, _ in picked]
+                sections = [section for _, section in picked]
+                matrix = SubmissionMatrix.from_records(records, mapping, sections)
+                self.check(matrix, [name for name, _ in records], sections, cells)
+
+    def test_empty(self):
+        matrix = SubmissionMatrix.from_records([], compile_mapping({"Assignments": ASSIGNMENTS}))
+        self.assertEqual((len(matrix), matrix.columns, matrix.projects), (0, [], []))
+        self.assertEqual(matrix.missing_at_least(1), 0)
+        self.assertEqual(matrix.missing_last(1), 0)
+        self.assertEqual(matrix.missing_by_student(), {})
+        self.assertEqual(matrix.section_rates(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
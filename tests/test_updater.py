@@ -0,0 +1,133 @@
+"""
+The Codepath -> Canvas update (grade_importer/updater.py): the -updated.csv for
+the sample course in tests/fixtures/sample/ must stay what the original
+scripts wrote, and each kind of grade cell must reach Canvas as intended.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from grade_importer import updater
+from grade_importer.codepath_csv import codepath_snapshot
+from grade_importer.context import PipelineContext
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLE = os.path.join(FIXTURES, "sample")
+CONFIG = {
+    "CanvasCsvPattern": "Canvas-COP4808",
+    "CodepathCsvPattern": "Codepath-COP4808",
+    "HeadersToLookFor": ["Member ID", "Full Name"],
+    "ColumnMapping": {
+        "Email": "Email",
+        "Status": "Status",
+        "SIS Login ID": "SIS Login ID",
+        "Assignments": {"Proj-1 (1)": "ASN - 1 Points", "Proj-2 (2)": "ASN - 2 Points"},
+    },
+}
+
+
+def make_course(config, exports):
+    """A course directory with config.json and data/ holding exports ({filename: text})"""
+    base_dir = tempfile.mkdtemp()
+    os.mkdir(os.path.join(base_dir, "data"))
+    with open(os.path.join(base_dir, "config.json"), "w") as config_file:
+        json.dump(config, config_file)
+    for filename, text in exports.items():
+        with open(os.path.join(base_dir, "data", filename), "w") as export_file:
+            export_file.write(text)
+    return base_dir
+
+
+def run_updater(base_dir):
+    """The text of the -updated.csv the updater writes for a course"""
+    context = PipelineContext(base_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        updater.main(context)
+    with open(context.paths["updated_csv"]) as updated_file:
+        return updated_file.read()
+
+
+class UpdaterTest(unittest.TestCase):
+
+    def course(self, config, exports):
+        base_dir = make_course(config, exports)
+        self.addCleanup(shutil.rmtree, base_dir)
+        return base_dir
+
+    def test_sample_matches_baseline(self):
+        with open(os.path.join(SAMPLE, "config.json")) as config_file:
+            config = json.load(config_file)
+        exports = {}
+        for filename in os.listdir(os.path.join(SAMPLE, "exports")):
+            with open(os.path.join(SAMPLE, "exports", filename)) as export_file:
+                exports[filename] = export_file.read()
+        base_dir = self.course(config, exports)
+
+        updated = run_updater(base_dir)
+        expected_dir = os.path.join(SAMPLE, "expected")
+        (expected_name,) = os.listdir(expected_dir)
+        with open(os.path.join(expected_dir, expected_name)) as expected_file:
+            self.assertEqual(updated, expected_file.read())
+        self.assertTrue(os.path.exists(os.path.join(base_dir, "data", expected_name)))
+
+    def test_grade_shapes(self):
+        base_dir = self.course(CONFIG, {
+            "2025-10-20T2058_Canvas-COP4808.csv":
+                "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1),Proj-2 (2)\n"
+                "    Points Possible,,,,,10,20\n"
+                "Student 0,1,x,s0@fau.edu,COP4808-001,,\n"
+                "Student 1,2,x,s1@fau.edu,COP4808-001,,\n"
+                "Student 2,3,x,s2@fau.edu,COP4808-001,5,5\n",
+            "2025-10-20T2058_Codepath-COP4808.csv":
+                "junk\n"
+                ",Member ID,Full Name,Email,Status,ASN - 1 Points,ASN - 2 Points\n"
+                ",0,Student 0,s0@fau.edu,Active,8/20,80%\n"
+                ",1,Student 1,S1@fau.edu,Active,EX,Missing\n"
+                ",2,Student 2,s2@fau.edu,Active,9 pts,abc\n",
+        })
+        # 8/20 of 10 points, 80% of 20; excused as EX, missing as blank, unreadable unchanged
+        self.assertEqual(run_updater(base_dir).splitlines(), [
+            "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1),Proj-2 (2)",
+            "Student 0,1,x,s0@fau.edu,COP4808-001,4,16",
+            "Student 1,2,x,s1@fau.edu,COP4808-001,EX,",
+            "Student 2,3,x,s2@fau.edu,COP4808-001,9,abc",
+        ])
+
+    def test_withdrawn_students_are_skipped(self):
+        base_dir = self.course(CONFIG, {
+            "2025-10-20T2058_Canvas-COP4808.csv":
+                "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1),Proj-2 (2)\n"
+                "Student 0,1,x,s0@fau.edu,COP4808-001,,\n"
+                "Student 1,2,x,s1@fau.edu,COP4808-002,,\n",
+            "2025-10-20T2058_Codepath-COP4808.csv":
+                ",Member ID,Full Name,Email,Status,ASN - 1 Points,ASN - 2 Points\n"
+                ",0,Student 0,s0@fau.edu,Active,8,9\n"
+                ",1,Student 1,s1@fau.edu, Withdrawn ,7,6\n",
+        })
+        # The Codepath Status is the record's status; a Codepath export has no section
+        snapshot = codepath_snapshot(["", "Member ID", "Full Name", "Email", "Status"])
+        record = snapshot.append(["", "1", "Student 1", "s1@fau.edu", "Withdrawn"])
+        self.assertEqual((record.status, record.section), ("Withdrawn", ""))
+
+        self.assertEqual(run_updater(base_dir).splitlines()[1:], ["Student 0,1,x,s0@fau.edu,COP4808-001,8,9"])
+
+    def test_points_unknown(self):
+        base_dir = self.course(CONFIG, {
+            "2025-10-20T2058_Canvas-COP4808.csv":
+                "Student,ID,SIS User ID,SIS Login ID,Section,Proj-1 (1),Proj-2 (2)\n"
+                "Student 0,1,x,s0@fau.edu,COP4808-001,,\n",
+            "2025-10-20T2058_Codepath-COP4808.csv":
+                ",Member ID,Full Name,Email,Status,ASN - 1 Points,ASN - 2 Points\n"
+                ",0,Student 0,s0@fau.edu,Active,8/20,80%\n",
+        })
+        # Without a Points Possible row a fraction keeps its numerator and a percentage can't be read
+        self.assertEqual(run_updater(base_dir).splitlines()[1], "Student 0,1,x,s0@fau.edu,COP4808-001,8,80%")
+
+
+if __name__ == "__main__":
+    unittest.main()